@@ -1,9 +1,15 @@
 import os
+import sys
 import configparser
 import pandas as pd
 from datetime import datetime
 import hopsworks
 
+# Add src directory to system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.components.Connection_Pool import ConnectionPool
+from src.components.Data_Extraction import DataExtractor
+
 class FeatureStorePipeline:
     def __init__(self, config_file):
         # Load configuration
@@ -18,6 +24,10 @@ class FeatureStorePipeline:
         project = hopsworks.login(api_key=api_key, project="default")  # Use "default" or your project name
         self.fs = project.get_feature_store()  # Initialize Hopsworks feature store
 
+        # Source tables are streamed from Postgres through server-side cursors
+        self.connection_pool = ConnectionPool(config)
+        self.extractor = DataExtractor(self.connection_pool)
+
     def create_feature_group(self, df_name, df, primary_key):
         # Set event_time to today's date
         df['event_time'] = pd.Timestamp.now()
@@ -51,10 +61,10 @@ class FeatureStorePipeline:
         self.fs.compute_statistics(feature_group)
 
     def run_pipeline(self):
-        # List of dataframes with SQL queries, primary keys, and descriptions
+        # List of dataframes with source tables, primary keys, and descriptions
         dataframes = {
             'drivers': {
-                'query': 'SELECT * FROM drivers_table;',
+                'table': 'drivers_table',
                 'primary_key': ['driver_id'],
                 'descriptions': [
                     {"name": "driver_id", "description": "Unique identification for each driver"},
@@ -70,7 +80,7 @@ class FeatureStorePipeline:
                 ]
             },
             'trucks': {
-                'query': 'SELECT * FROM trucks_table;',
+                'table': 'trucks_table',
                 'primary_key': ['truck_id'],
                 'descriptions': [
                     {"name": "truck_id", "description": "Unique identification for each truck"},
@@ -81,7 +91,7 @@ class FeatureStorePipeline:
                 ]
             },
             'routes': {
-                'query': 'SELECT * FROM routes_table;',
+                'table': 'routes_table',
                 'primary_key': ['route_id'],
                 'descriptions': [
                     {"name": "route_id", "description": "Unique identification for each route"},
@@ -92,7 +102,7 @@ class FeatureStorePipeline:
                 ]
             },
             'truck_schedule': {
-                'query': 'SELECT * FROM truck_schedule_table;',  # Add the appropriate SQL query here
+                'table': 'truck_schedule_table',
                 'primary_key': ['truck_id', 'route_id'],
                 'descriptions': [
                     {"name": "truck_id", "description": "Unique identification number for each truck"},
@@ -105,7 +115,7 @@ class FeatureStorePipeline:
                 ]
             },
             'city_weather': {
-                'query': 'SELECT * FROM city_weather_table;',  # Replace with actual SQL query
+                'table': 'city_weather',
                 'primary_key': ['city_id', 'date'],
                 'descriptions': [
                     {"name": "city_id", "description": "Unique identification for each city"},
@@ -121,7 +131,7 @@ class FeatureStorePipeline:
                 ]
             },
             'routes_weather': {
-                'query': 'SELECT * FROM routes_weather_table;',  # Replace with actual SQL query
+                'table': 'routes_weather',
                 'primary_key': ['route_id', 'date'],
                 'descriptions': [
                     {"name": "route_id", "description": "Unique identification for each route"},
@@ -134,7 +144,7 @@ class FeatureStorePipeline:
                 ]
             },
             'traffic': {
-                'query': 'SELECT * FROM traffic_table;',  # Replace with actual SQL query
+                'table': 'traffic_table',
                 'primary_key': ['traffic_id', 'timestamp'],
                 'descriptions': [
                     {"name": "traffic_id", "description": "Unique identification for each traffic record"},
@@ -151,7 +161,7 @@ class FeatureStorePipeline:
             print(f">>>>>> Processing feature group for: {df_name} <<<<<<")
             try:
                 # Read data into a DataFrame
-                df = pd.read_sql_query(details['query'], self.fs.engine)  # Adjust the engine reference as needed
+                df = self.extractor.extract(details['table'])
                 print(f"Fetched {df.shape[0]} rows and {df.shape[1]} columns from {df_name}")
                 
                 # Create feature group
@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+import pandas as pd
+
+# Add src directory to system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.components.Data_Cleaning import DataCleaning
+
+# CSV files used for the comparison and the features stage_03 bounds for them
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Data', 'Training_data'))
+BENCHMARK_FILES = {
+    'city_weather.csv': ['hour', 'temp', 'wind_speed', 'humidity', 'pressure'],
+    'traffic_table.csv': ['no_of_vehicles', 'accident'],
+}
+
+STAGE_NAME = "Outlier Removal Benchmark"
+
+class OutlierBenchmark:
+    def time_mode(self, df, df_name, numerical_features, mode):
+        """Run identify_outliers in the given mode and return (seconds, cleaned DataFrame)."""
+        cleaning_obj = DataCleaning(df, df_name, mode)
+        start = time.perf_counter()
+        cleaning_obj.identify_outliers(numerical_features)
+        return time.perf_counter() - start, cleaning_obj.df
+
+    def main(self):
+        for file_name, numerical_features in BENCHMARK_FILES.items():
+            df = pd.read_csv(os.path.join(DATA_DIR, file_name)).dropna()
+            df_name = file_name.split('.')[0]
+
+            sequential_time, sequential_df = self.time_mode(df, df_name, numerical_features, 'sequential')
+            vectorized_time, vectorized_df = self.time_mode(df, df_name, numerical_features, 'vectorized')
+
+            # Rows kept by only one of the engines
+            only_sequential = len(sequential_df.index.difference(vectorized_df.index))
+            only_vectorized = len(vectorized_df.index.difference(sequential_df.index))
+            print(
+                f"{df_name}: {len(df)} rows | sequential {sequential_time:.3f}s kept {len(sequential_df)} | "
+                f"vectorized {vectorized_time:.3f}s kept {len(vectorized_df)} | speedup {sequential_time / vectorized_time:.1f}x | "
+                f"kept only by sequential {only_sequential}, only by vectorized {only_vectorized}"
+            )
+
+if __name__ == '__main__':
+    try:
+        print(">>>>>> Stage started <<<<<< :", STAGE_NAME)
+        obj = OutlierBenchmark()
+        obj.main()
+        print(">>>>>> Stage completed <<<<<<", STAGE_NAME)
+    except Exception as e:
+        print(e)
+        raise e
@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Add src directory to system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.components.Feature_Storage import FeatureStorage
+
+# Synthetic transformed training set: scaled numerical columns plus one-hot columns
+ROWS = 300_000
+NUMERICAL = 31
+ONE_HOT = 40
+SEED = 42
+
+STAGE_NAME = "Feature Storage Benchmark"
+
+class FeatureStorageBenchmark:
+    def __init__(self, rows=ROWS, seed=SEED):
+        rng = np.random.default_rng(seed)
+        one_hot = np.zeros((rows, ONE_HOT))
+        one_hot[np.arange(rows), rng.integers(0, ONE_HOT, rows)] = 1
+        self.features = np.hstack([rng.normal(size=(rows, NUMERICAL)), one_hot])
+        self.columns = [f'numerical_{i}' for i in range(NUMERICAL)] + [f'category_{i}' for i in range(ONE_HOT)]
+        self.target = rng.integers(0, 2, rows)
+
+    def timed(self, fn):
+        start = time.perf_counter()
+        result = fn()
+        return time.perf_counter() - start, result
+
+    def main(self):
+        root = tempfile.mkdtemp()
+        try:
+            csv_path = os.path.join(root, 'train_data.csv')
+            frame = pd.DataFrame(self.features, columns=self.columns).assign(delay=self.target)
+            csv_write, _ = self.timed(lambda: frame.to_csv(csv_path, index=False))
+            storage = FeatureStorage(root)
+            binary_write, _ = self.timed(lambda: storage.write('train_data', self.features, self.target, self.columns, 'delay'))
+
+            csv_load, loaded = self.timed(lambda: pd.read_csv(csv_path))
+            csv_pass, _ = self.timed(lambda: loaded[self.columns].to_numpy().sum())
+            binary_open, (features, target, _) = self.timed(lambda: storage.open('train_data'))
+            # Reading every value once, as a model fit would, pays for the page-ins the open deferred
+            binary_pass, _ = self.timed(lambda: np.asarray(features).sum())
+
+            same = np.allclose(loaded[self.columns].to_numpy(), features) and (loaded['delay'].to_numpy() == target).all()
+            csv_mb = os.path.getsize(csv_path) / 1024 ** 2
+            binary_mb = sum(os.path.getsize(os.path.join(storage.path('train_data'), f)) for f in os.listdir(storage.path('train_data'))) / 1024 ** 2
+            print(f"{len(self.target)}x{len(self.columns)} features | identical {same}")
+            print(f"CSV: {csv_mb:.0f} MB | write {csv_write:.2f}s | load {csv_load:.2f}s | first pass {csv_pass:.2f}s")
+            print(f"Binary: {binary_mb:.0f} MB | write {binary_write:.2f}s | open {binary_open:.4f}s | first pass {binary_pass:.2f}s")
+            print(f"Load speedup {(csv_load + csv_pass) / (binary_open + binary_pass):.0f}x")
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == '__main__':
+    try:
+        print(">>>>>> Stage started <<<<<< :", STAGE_NAME)
+        obj = FeatureStorageBenchmark()
+        obj.main()
+        print(">>>>>> Stage completed <<<<<<", STAGE_NAME)
+    except Exception as e:
+        print(e)
+        raise e
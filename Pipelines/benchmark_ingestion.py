@@ -0,0 +1,65 @@
+import os
+import sys
+import time
+import configparser
+import pandas as pd
+import psycopg2
+
+# Add src directory to system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.components.Data_Ingestion import DataIngestion
+
+# Load configuration
+config = configparser.RawConfigParser()
+config.read('C:/Users/anucv/OneDrive/Desktop/AI and ML training/Machine_Learning/TRUCK_DELAY_CLASSIFICATION_PROJECT/Config/config.ini')
+
+# CSV files used for the comparison (the slowest tables of stage_01)
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Data', 'Training_data'))
+BENCHMARK_FILES = ['city_weather.csv', 'traffic_table.csv']
+
+STAGE_NAME = "Ingestion Load Benchmark"
+
+class IngestionBenchmark:
+    def __init__(self):
+        self.ingestion_obj = DataIngestion(config)
+
+    def time_load(self, df, table_name, mode, cur):
+        """Load the DataFrame into a scratch table and return rows/sec for the given mode."""
+        scratch_table = f"bench_{table_name}_{mode}"
+        cur.execute(f"DROP TABLE IF EXISTS {scratch_table};")
+        self.ingestion_obj.create_table(df, scratch_table, cur)
+
+        self.ingestion_obj.load_mode = mode
+        start = time.perf_counter()
+        num_rows = self.ingestion_obj.load_data(df, scratch_table, cur)
+        elapsed = time.perf_counter() - start
+
+        cur.execute(f"SELECT COUNT(*) FROM {scratch_table};")
+        assert cur.fetchone()[0] == num_rows, f"Row count mismatch for {scratch_table}"
+        return num_rows / elapsed if elapsed > 0 else float('inf')
+
+    def main(self):
+        ingestion = self.ingestion_obj
+        with psycopg2.connect(dbname=ingestion.db_name, user=ingestion.db_user, password=ingestion.db_password, host=ingestion.db_host, port=ingestion.db_port) as conn:
+            with conn.cursor() as cur:
+                for file_name in BENCHMARK_FILES:
+                    df = pd.read_csv(os.path.join(DATA_DIR, file_name))
+                    table_name = file_name.split('.')[0]
+
+                    upsert_rate = self.time_load(df, table_name, 'upsert', cur)
+                    copy_rate = self.time_load(df, table_name, 'copy', cur)
+                    print(f"{table_name}: {len(df)} rows | upsert {upsert_rate:,.0f} rows/sec | copy {copy_rate:,.0f} rows/sec | speedup {copy_rate / upsert_rate:.1f}x")
+
+            # Scratch tables are never kept
+            conn.rollback()
+
+if __name__ == '__main__':
+    try:
+        print(">>>>>> Stage started <<<<<< :", STAGE_NAME)
+        obj = IngestionBenchmark()
+        obj.main()
+        print(">>>>>> Stage completed <<<<<<", STAGE_NAME)
+    except Exception as e:
+        print(e)
+        raise e
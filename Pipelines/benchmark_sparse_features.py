@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from xgboost import XGBClassifier
+
+# Add src directory to system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.components.Data_Transformation import DataTransformation
+from src.components.Preprocessing_Artifact import PreprocessingArtifact
+
+# Synthetic final_merge rows and id cardinalities; the dense matrix is ROWS x (TRUCKS + ROUTES + ...) float64
+ROWS = 20_000
+TRUCKS = 2_000
+ROUTES = 1_500
+DESCRIPTIONS = 30
+SEED = 42
+
+STAGE_NAME = "Sparse Features Benchmark"
+
+class SparseFeatureBenchmark:
+    def __init__(self, rows=ROWS, seed=SEED):
+        rng = np.random.default_rng(seed)
+        # Only the column lists of DataTransformation are used; nothing is written to its output path
+        columns = DataTransformation(tempfile.mkdtemp())
+        self.columns = columns
+
+        df = pd.DataFrame({col: rng.normal(size=rows) for col in columns.numerical_columns})
+        df['truck_id'] = rng.integers(0, TRUCKS, rows)
+        df['route_id'] = [f'R-{i}' for i in rng.integers(0, ROUTES, rows)]
+        for col in ['route_description', 'origin_description', 'destination_description']:
+            df[col] = [f'weather {i}' for i in rng.integers(0, DESCRIPTIONS, rows)]
+        df['fuel_type'] = rng.choice(['diesel', 'gas'], rows)
+        df['driving_style'] = rng.choice(['proactive', 'conservative'], rows)
+        df['gender'] = rng.choice(['male', 'female'], rows)
+        df['departure_date'] = pd.Timestamp('2019-01-01') + pd.to_timedelta(rng.integers(0, 40 * 24, rows), unit='h')
+        # Delay depends on a few trucks and on the first numerical feature, so both models have signal
+        df[columns.target_column] = ((df['truck_id'] % 7 == 0) | (df[columns.numerical_columns[0]] > 1)).astype(int)
+        self.df = df
+
+    def matrix_mb(self, X):
+        if hasattr(X, 'nnz'):
+            return (X.data.nbytes + X.indices.nbytes + X.indptr.nbytes) / 1024 ** 2
+        return X.memory_usage(index=False).sum() / 1024 ** 2
+
+    def timed(self, fn):
+        start = time.perf_counter()
+        result = fn()
+        return time.perf_counter() - start, result
+
+    def main(self):
+        artifact = PreprocessingArtifact(self.columns.categorical_columns, self.columns.numerical_columns, self.columns.date_columns)
+        artifact.fit(self.df)
+        y = self.df[self.columns.target_column].to_numpy()
+
+        models = {
+            'Logistic Regression': lambda: LogisticRegression(solver='liblinear', max_iter=1000),
+            'XGBoost': lambda: XGBClassifier(n_estimators=50, max_depth=5, tree_method='hist', eval_metric='logloss'),
+        }
+        results = {}
+        for path, transform in [('dense', artifact.transform), ('sparse', artifact.transform_sparse)]:
+            transform_time, X = self.timed(lambda: transform(self.df))
+            results[path] = {'transform_s': transform_time, 'matrix_mb': self.matrix_mb(X)}
+            for model_name, make_model in models.items():
+                fit_time, model = self.timed(lambda: make_model().fit(X, y))
+                results[path][f'{model_name} fit_s'] = fit_time
+                results[path][f'{model_name} accuracy'] = (model.predict(X) == y).mean()
+            print(f"{path}: {X.shape[0]}x{X.shape[1]} features | " + ' | '.join(f"{key} {value:.3f}" for key, value in results[path].items()))
+            del X
+
+        print(f"Sparse matrix is {results['dense']['matrix_mb'] / results['sparse']['matrix_mb']:.0f}x smaller; fit speedup "
+              + ', '.join(f"{name} {results['dense'][f'{name} fit_s'] / results['sparse'][f'{name} fit_s']:.1f}x" for name in models))
+
+if __name__ == '__main__':
+    try:
+        print(">>>>>> Stage started <<<<<< :", STAGE_NAME)
+        obj = SparseFeatureBenchmark()
+        obj.main()
+        print(">>>>>> Stage completed <<<<<<", STAGE_NAME)
+    except Exception as e:
+        print(e)
+        raise e
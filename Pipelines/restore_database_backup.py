@@ -0,0 +1,54 @@
+import os
+import sys
+import argparse
+import configparser
+
+# Add src directory to system path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.components.Data_Restore import DatabaseRestore
+from src.components.Ingestion_Manifest import IngestionManifest
+from src.components.Snapshot_Cache import SnapshotCache
+
+# Load configuration
+config = configparser.RawConfigParser()
+config.read('C:/Users/anucv/OneDrive/Desktop/AI and ML training/Machine_Learning/TRUCK_DELAY_CLASSIFICATION_PROJECT/Config/config.ini')
+
+BACKUP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Data', 'Database_backup'))
+
+STAGE_NAME = "Database Backup Restore"
+
+class DatabaseRestorePipeline:
+    def __init__(self, dump_path, target):
+        self.restore_obj = DatabaseRestore(dump_path)
+        self.target = target
+
+    def main(self):
+        if self.target == 'snapshot':
+            # Seed the local snapshots and manifest; later stages then run without a database
+            manifest = IngestionManifest(config.get('ingestion', 'manifest_path', fallback='ingestion_manifest.json'))
+            snapshot_cache = SnapshotCache(config.get('pipeline', 'snapshot_dir', fallback='snapshots'), manifest)
+            self.restore_obj.restore_to_snapshots(snapshot_cache)
+        else:
+            from src.components.Data_Ingestion import DataIngestion
+
+            ingestion = DataIngestion(config)
+            try:
+                self.restore_obj.restore_to_postgres(ingestion)
+            finally:
+                ingestion.connection_pool.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Restore a Data/Database_backup SQL dump into Postgres or local snapshots.")
+    parser.add_argument('--dump', default=os.path.join(BACKUP_DIR, 'truck-eta-postgres.sql'), help="Path to the SQL dump (Postgres or MySQL).")
+    parser.add_argument('--target', choices=['postgres', 'snapshot'], default='postgres', help="Where to load the dumped rows.")
+    args = parser.parse_args()
+
+    try:
+        print(">>>>>> Stage started <<<<<< :", STAGE_NAME)
+        obj = DatabaseRestorePipeline(args.dump, args.target)
+        obj.main()
+        print(">>>>>> Stage completed <<<<<<", STAGE_NAME)
+    except Exception as e:
+        print(e)
+        raise e
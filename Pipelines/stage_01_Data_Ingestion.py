@@ -22,6 +22,8 @@ class DataIngestionPipeline:
             self.ingestion_obj.start_ingestion()  # Use start_ingestion instead of process_csv_files
         except Exception as e:
             raise e
+        finally:
+            self.ingestion_obj.connection_pool.close()
 
 if __name__ == '__main__':
     try:
@@ -1,53 +1,60 @@
 import os
 import sys
 import configparser
-import pandas as pd
-from sqlalchemy import create_engine
 
 # Add src directory to system path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from src.components.Data_Exploration import DataExplorationComponent
+from src.components.Connection_Pool import ConnectionPool
+from src.components.Data_Extraction import DataExtractor
+from src.components.Ingestion_Manifest import IngestionManifest
+from src.components.Snapshot_Cache import SnapshotCache
+from src.components.Dtype_Registry import apply_dtypes
 
 # Load configuration
 config = configparser.RawConfigParser()
 config.read('C:/Users/anucv/OneDrive/Desktop/AI and ML training/Machine_Learning/TRUCK_DELAY_CLASSIFICATION_PROJECT/Config/config.ini')
 
-# Database connection parameters
-db_host = config.get('database', 'host')
-db_port = config.get('database', 'port')
-db_name = config.get('database', 'name')
-db_user = config.get('database', 'user')
-db_password = config.get('database', 'password')
+# Shared database connection pool
+connection_pool = ConnectionPool(config)
 
-# Create database connection
-engine = create_engine(f'postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}')
+# Local snapshots, versioned by the ingestion manifest
+manifest = IngestionManifest(config.get('ingestion', 'manifest_path', fallback='ingestion_manifest.json'))
+snapshot_cache = SnapshotCache(config.get('pipeline', 'snapshot_dir', fallback='snapshots'), manifest, connection_pool)
 
-# List of dataframes to explore
+# List of dataframes to explore: source table and the columns the exploration uses
 dataframes = {
-    'city_weather': 'SELECT * FROM city_weather;',
-    'drivers': 'SELECT * FROM drivers_table;',
-    'routes': 'SELECT * FROM routes_table;',
-    'routes_weather': 'SELECT * FROM routes_weather;',
-    'traffic': 'SELECT * FROM traffic_table;',
-    'trucks': 'SELECT * FROM trucks_table;',
-    'truck_schedule': 'SELECT * FROM truck_schedule_table;'
+    'city_weather': ('city_weather', ['date', 'hour', 'temp', 'wind_speed', 'description', 'humidity', 'pressure']),
+    'drivers': ('drivers_table', ['gender', 'age', 'experience', 'driving_style', 'ratings', 'average_speed_mph']),
+    'routes': ('routes_table', ['distance', 'average_hours']),
+    'routes_weather': ('routes_weather', ['date', 'temp', 'wind_speed', 'description', 'humidity', 'pressure']),
+    'traffic': ('traffic_table', ['date', 'hour', 'no_of_vehicles', 'accident']),
+    'trucks': ('trucks_table', ['truck_age', 'load_capacity_pounds', 'mileage_mpg', 'fuel_type']),
+    'truck_schedule': ('truck_schedule_table', ['departure_date', 'estimated_arrival', 'delay'])
 }
 
 STAGE_NAME = "Data Exploration"
 
 class DataExplorationPipeline:
     def __init__(self):
-        self.engine = engine
+        self.connection_pool = connection_pool
+        self.extractor = DataExtractor(connection_pool)
+        self.snapshot_cache = snapshot_cache
+
+    def fetch_table(self, df_name):
+        # Read the projected columns into a compact DataFrame, from the snapshot when it is current
+        table_name, columns = dataframes[df_name]
+        return apply_dtypes(self.snapshot_cache.extract(self.extractor, table_name, columns), table_name)
 
     def run_exploration_pipeline(self):
-        for df_name, query in dataframes.items():
-            print(f">>>>>> Exploration started for: {df_name} <<<<<<")
+        # Extract all tables concurrently; plotting stays on the main thread
+        extracted = self.connection_pool.run_per_table(dataframes, self.fetch_table)
 
-            # Read data into a DataFrame
-            df = pd.read_sql_query(query, self.engine)
+        for df_name in dataframes:
+            print(f">>>>>> Exploration started for: {df_name} <<<<<<")
 
             # Create the component and explore the DataFrame
-            exploration_component = DataExplorationComponent(df_name, df)
+            exploration_component = DataExplorationComponent(df_name, extracted[df_name])
             exploration_component.run()
 
             print(f">>>>>> Exploration completed for: {df_name} <<<<<<\n")
@@ -61,3 +68,5 @@ if __name__ == '__main__':
     except Exception as e:
         print(e)
         raise e
+    finally:
+        connection_pool.close()
@@ -2,9 +2,14 @@ import os
 import sys
 import configparser
 import pandas as pd
-from sqlalchemy import create_engine
 from datetime import datetime  # Import datetime to handle date
-from src.components.Data_Cleaning import DataCleaning
+from src.components.Data_Cleaning import DataCleaning, ChunkedDataCleaning
+from src.components.Connection_Pool import ConnectionPool
+from src.components.Data_Extraction import DataExtractor
+from src.components.Ingestion_Manifest import IngestionManifest
+from src.components.Snapshot_Cache import SnapshotCache
+from src.components.Dtype_Registry import apply_dtypes
+from src.components.Dedup_Index import DedupIndex, DEDUP_KEYS
 
 # Add src directory to system path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -13,42 +18,40 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 config = configparser.RawConfigParser()
 config.read('C:/Users/anucv/OneDrive/Desktop/AI and ML training/Machine_Learning/TRUCK_DELAY_CLASSIFICATION_PROJECT/Config/config.ini')
 
-# Database connection parameters
-db_host = config.get('database', 'host')
-db_port = config.get('database', 'port')
-db_name = config.get('database', 'name')
-db_user = config.get('database', 'user')
-db_password = config.get('database', 'password')
-
 # Path to store cleaned data (for now, we won’t store it in the feature store)
 cleaned_data_path = config.get('HOPSWORKS', 'cleaned_data_path')
 
 # Test database connection
 try:
-    engine = create_engine(f'postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}')
-    connection = engine.connect()
-    print("Database connection successful")
-    
+    connection_pool = ConnectionPool(config)
+
     # Optional: Fetch and display some data from the database to verify retrieval
-    test_query = 'SELECT * FROM city_weather LIMIT 5;'
-    test_df = pd.read_sql_query(test_query, engine)
-    print("Sample data from city_weather:")
-    print(test_df.head())
-    print(f"Sample data shape: {test_df.shape}")
+    if config.getboolean('pipeline', 'connection_check', fallback=False):
+        test_query = 'SELECT * FROM city_weather LIMIT 5;'
+        with connection_pool.connection() as conn:
+            test_df = pd.read_sql_query(test_query, conn)
+        print("Database connection successful")
+        print("Sample data from city_weather:")
+        print(test_df.head())
+        print(f"Sample data shape: {test_df.shape}")
 
 except Exception as e:
     print(f"Error during data retrieval: {e}")
     sys.exit()  # Exit if the connection or data retrieval fails
 
-# List of dataframes to clean
+# Local snapshots, versioned by the ingestion manifest
+manifest = IngestionManifest(config.get('ingestion', 'manifest_path', fallback='ingestion_manifest.json'))
+snapshot_cache = SnapshotCache(config.get('pipeline', 'snapshot_dir', fallback='snapshots'), manifest, connection_pool)
+
+# List of dataframes to clean and their source tables
 dataframes = {
-    'city_weather': 'SELECT * FROM city_weather;',
-    'drivers': 'SELECT * FROM drivers_table;',
-    'routes': 'SELECT * FROM routes_table;',
-    'routes_weather': 'SELECT * FROM routes_weather;',
-    'traffic': 'SELECT * FROM traffic_table;',
-    'trucks': 'SELECT * FROM trucks_table;',
-    'truck_schedule': 'SELECT * FROM truck_schedule_table;'
+    'city_weather': 'city_weather',
+    'drivers': 'drivers_table',
+    'routes': 'routes_table',
+    'routes_weather': 'routes_weather',
+    'traffic': 'traffic_table',
+    'trucks': 'trucks_table',
+    'truck_schedule': 'truck_schedule_table'
 }
 
 # Numerical features for each dataframe
@@ -61,44 +64,130 @@ numerical_features_dict = {
     'trucks': ['truck_age']
 }
 
+# 'vectorized' filters outliers once on bounds from the same rows, 'sequential' keeps the old per-feature semantics
+outlier_mode = config.get('cleaning', 'outlier_mode', fallback='vectorized')
+# Lazy cleaning narrows a keep-mask and copies the table once at the end instead of after every step
+lazy_cleaning = config.getboolean('cleaning', 'lazy', fallback=True)
+# Tables cleaned out of core in two streamed passes, with sketched quartiles of this rank error
+chunked_tables = [name.strip() for name in config.get('cleaning', 'chunked_tables', fallback='').split(',') if name.strip()]
+sketch_epsilon = config.getfloat('cleaning', 'sketch_epsilon', fallback=0.01)
+# Incremental cleaning only cleans rows appended since the last run and dedups them by key
+# against a persisted hash index; full reloads of a table, or deleting its index files, force a full re-clean
+incremental_cleaning = config.getboolean('cleaning', 'incremental', fallback=False)
+dedup_index_dir = config.get('cleaning', 'dedup_index_dir', fallback='dedup_index')
+
 STAGE_NAME = "Data Cleaning"
 
 class DataCleaningPipeline:
     def __init__(self):
-        self.engine = engine
-
-    def run_cleaning_pipeline(self):
-        for df_name, query in dataframes.items():
-            print(f">>>>>> Cleaning started for: {df_name} <<<<<<")
-
-            # Read data into a DataFrame
-            try:
-                df = pd.read_sql_query(query, self.engine)
-                print(f"Fetched {df.shape[0]} rows and {df.shape[1]} columns from {df_name}")
-            except Exception as e:
-                print(f"Error retrieving data for {df_name}: {e}")
-                continue  # Skip this dataframe if data retrieval fails
-
-            # Create an index column starting from 1
-            df['index'] = range(1, len(df) + 1)
+        self.connection_pool = connection_pool
+        self.extractor = DataExtractor(connection_pool)
+        self.snapshot_cache = snapshot_cache
+
+    def iter_chunks(self, df_name):
+        """Stream the table with the same index and event_date columns the in-memory path adds."""
+        today_date = pd.to_datetime(datetime.now().strftime('%Y-%m-%d'))
+        offset = 0
+        for chunk in self.extractor.extract(dataframes[df_name], as_iterator=True):
+            chunk['index'] = range(offset + 1, offset + len(chunk) + 1)
+            chunk['event_date'] = today_date
+            offset += len(chunk)
+            yield apply_dtypes(chunk, df_name, report=False)
+
+    def clean_table_chunked(self, df_name):
+        print(f">>>>>> Chunked cleaning started for: {df_name} <<<<<<")
+        output_path = os.path.join(cleaned_data_path, f'cleaned_{df_name}.csv')
+        cleaning_obj = ChunkedDataCleaning(df_name, sketch_epsilon)
+        cleaning_obj.full_cleaning_process(lambda: self.iter_chunks(df_name), numerical_features_dict.get(df_name, []), output_path)
+        print(f"Cleaned data saved to: {output_path}")
+        print(f">>>>>> Cleaning completed for: {df_name} <<<<<<\n")
+        return output_path
+
+    def clean_table(self, df_name):
+        if df_name in chunked_tables:
+            return self.clean_table_chunked(df_name)
+
+        print(f">>>>>> Cleaning started for: {df_name} <<<<<<")
+
+        # Define output path for cleaned data
+        output_path = os.path.join(cleaned_data_path, f'cleaned_{df_name}.csv')
+
+        # The index keeps the keys cleaned so far and, in its state, the last source id and outlier bounds
+        dedup_index = DedupIndex(os.path.join(dedup_index_dir, df_name), DEDUP_KEYS.get(df_name)) if incremental_cleaning else None
+        # A full reload or restore renumbers the source ids past the watermark and may correct existing
+        # keys, so the index only carries over while the table holds the same load plus appended deltas
+        source_version = manifest.base_version(dataframes[df_name])
+        incremental = (
+            dedup_index is not None and 'watermark' in dedup_index.state and os.path.exists(output_path)
+            and source_version is not None and dedup_index.state.get('source_version') == source_version
+        )
+        if dedup_index is not None and not incremental:
+            if 'watermark' in dedup_index.state and dedup_index.state.get('source_version') != source_version:
+                print(f"{dataframes[df_name]} was reloaded since its last clean; cleaning {df_name} in full.")
+            dedup_index.hashes = dedup_index.hashes[:0]
+            dedup_index.state = {}
+
+        # Read data into a compact DataFrame
+        try:
+            if incremental:
+                # Only the rows ingested after the last cleaned one
+                df = self.extractor.extract(dataframes[df_name], time_column='id', start=dedup_index.state['watermark'] + 1)
+            else:
+                df = self.snapshot_cache.extract(self.extractor, dataframes[df_name])
+            df = apply_dtypes(df, df_name)
+            print(f"Fetched {df.shape[0]} rows and {df.shape[1]} columns from {df_name}")
+        except Exception as e:
+            print(f"Error retrieving data for {df_name}: {e}")
+            return None  # Skip this dataframe if data retrieval fails
+
+        if incremental and df.empty:
+            print(f"No new rows in {df_name} since id {dedup_index.state['watermark']}.")
+            return output_path
+
+        # Create an index column starting from 1 (continuing after the rows cleaned earlier)
+        first_index = dedup_index.state.get('next_index', 1) if incremental else 1
+        df['index'] = range(first_index, first_index + len(df))
+        watermark = int(df['id'].max()) if 'id' in df.columns and len(df) else None
+
+        # Create event_date column with the current date
+        today_date = datetime.now().strftime('%Y-%m-%d')
+        df['event_date'] = pd.to_datetime(today_date)
+
+        # Define numerical features for the current dataframe
+        numerical_features = numerical_features_dict.get(df_name, [])
+
+        # Create a DataCleaning object and clean the DataFrame
+        cleaning_obj = DataCleaning(df, df_name, outlier_mode, lazy_cleaning)
+        # New rows are held to the outlier bounds of the full clean they are appended to
+        outlier_bounds = dedup_index.state.get('outlier_bounds') if incremental else None
+        cleaned_df = cleaning_obj.full_cleaning_process(numerical_features, dedup_index, outlier_bounds)
+
+        if incremental:
+            cleaned_df.to_csv(output_path, mode='a', header=False, index=False)
+            print(f"Appended {len(cleaned_df)} cleaned rows to: {output_path}")
+        else:
+            cleaned_df.to_csv(output_path, index=False)
+            print(f"Cleaned data saved to: {output_path}")
 
-            # Create event_date column with the current date
-            today_date = datetime.now().strftime('%Y-%m-%d')
-            df['event_date'] = pd.to_datetime(today_date)
+            # Snapshot the cleaned frame against the CSV just written, so stage_04 skips parsing it
+            self.snapshot_cache.save(f'cleaned_{df_name}', cleaned_df, self.snapshot_cache.file_version(output_path))
 
-            # Define numerical features for the current dataframe
-            numerical_features = numerical_features_dict.get(df_name, [])
+        if dedup_index is not None and watermark is not None:
+            dedup_index.state.update({
+                'watermark': watermark,
+                'source_version': source_version,
+                'next_index': first_index + len(df),
+                'outlier_bounds': outlier_bounds or cleaning_obj.outlier_bounds,
+            })
+            dedup_index.save()
+            print(f"Dedup index for {df_name} holds {len(dedup_index)} keys (source rows up to id {watermark}).")
 
-            # Create a DataCleaning object and clean the DataFrame
-            cleaning_obj = DataCleaning(df, df_name)
-            cleaned_df = cleaning_obj.full_cleaning_process(numerical_features)
+        print(f">>>>>> Cleaning completed for: {df_name} <<<<<<\n")
+        return output_path
 
-            # Define output path for cleaned data
-            output_path = os.path.join(cleaned_data_path, f'cleaned_{df_name}.csv')
-            cleaned_df.to_csv(output_path, index=False)
-            print(f"Cleaned data saved to: {output_path}")
-
-            print(f">>>>>> Cleaning completed for: {df_name} <<<<<<\n")
+    def run_cleaning_pipeline(self):
+        # Independent tables are extracted and cleaned concurrently
+        self.connection_pool.run_per_table(dataframes, self.clean_table)
 
 if __name__ == '__main__':
     try:
@@ -109,3 +198,5 @@ if __name__ == '__main__':
     except Exception as e:
         print(f"Pipeline error: {e}")
         raise e
+    finally:
+        connection_pool.close()
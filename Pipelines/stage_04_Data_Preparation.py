@@ -24,14 +24,13 @@ class DataPreparationPipeline:
         try:
             print(">>> Starting data preparation stage <<<")
             
-            # Prepare the data using the DataPreparationComponent
-            final_dataset = self.component.prepare_data()
-
-            if final_dataset is not None:  # Check if final_dataset is not None
-                # Define output path for prepared data
-                output_path = os.path.join(cleaned_data_path, 'final_prepared_data.csv')
-                final_dataset.to_csv(output_path, index=False)
-                print(f"Prepared data saved to: {output_path}")
+            # Prepare the data using the DataPreparationComponent, streamed to disk in windows of
+            # consecutive trips when [preparation] memory_budget_mb is set
+            output_path = os.path.join(cleaned_data_path, 'final_prepared_data.csv')
+            rows_written = self.component.prepare_to_csv(output_path)
+
+            if rows_written is not None:
+                print(f"Prepared data saved to: {output_path} ({rows_written} rows)")
             else:
                 print("Data preparation failed. Final dataset is None.")
 
@@ -1,12 +1,14 @@
 import os
 import sys
 import configparser
+import pandas as pd
 import hopsworks
 
 # Add src directory to system path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.components.Data_Transformation import DataTransformation
+from src.components.Dtype_Registry import apply_dtypes
 
 # Load configuration
 config = configparser.RawConfigParser()
@@ -19,24 +21,54 @@ class DataTransformationPipeline:
         # Get the API key and paths from config
         api_key = config.get('HopsWorks', 'api_key')
         self.output_path = config.get('HopsWorks', 'output_path')
+        # Preprocessing fitted on train, read back by model building and serving
+        self.artifact_path = config.get('transformation', 'artifact_path', fallback=os.path.join(self.output_path, 'preprocessing_artifact.joblib'))
 
         # Connect to Hopsworks feature store using API key from config
         self.project = hopsworks.login(api_key_value=api_key)
         self.fs = self.project.get_feature_store()
-        self.transformation_obj = DataTransformation(self.output_path)
+        self.sparse = config.getboolean('transformation', 'sparse', fallback=False)
+        self.transformation_obj = DataTransformation(self.output_path, self.artifact_path, self.sparse)
+        # With chunk_days set, final_merged is streamed twice in estimated_arrival windows of that many days
+        # instead of read whole; medians are then sketched to within sketch_epsilon in rank
+        self.chunk_days = config.getint('transformation', 'chunk_days', fallback=0)
+        self.sketch_epsilon = config.getfloat('transformation', 'sketch_epsilon', fallback=0.001)
 
     def fetch_feature_store_data(self):
         try:
             final_merged_fg = self.fs.get_feature_group(name="final_merged", version=1)
-            final_merged_df = final_merged_fg.read()
+            final_merged_df = apply_dtypes(final_merged_fg.read(), 'final_merge')
             print("✅ Fetched data from feature store")
             return final_merged_df
         except Exception as e:
             print("❌ Failed to fetch data from feature store:", e)
             raise e
 
+    def iter_chunks(self):
+        """Stream final_merged in estimated_arrival windows of chunk_days days."""
+        final_merged_fg = self.fs.get_feature_group(name="final_merged", version=1)
+        arrival = final_merged_fg.get_feature('estimated_arrival')
+        # Only the window column is read whole; rows without an arrival belong to no subset
+        arrivals = pd.to_datetime(final_merged_fg.select(['estimated_arrival']).read()['estimated_arrival'], errors='coerce').dropna()
+        if arrivals.empty:
+            return
+        window = pd.Timedelta(days=self.chunk_days)
+        start, last = arrivals.min().floor('D'), arrivals.max()
+        while start <= last:
+            end = start + window
+            chunk = final_merged_fg.filter(
+                (arrival >= start.strftime('%Y-%m-%d %H:%M:%S')) & (arrival < end.strftime('%Y-%m-%d %H:%M:%S'))
+            ).read()
+            yield apply_dtypes(chunk, 'final_merge', report=False)
+            start = end
+
     def main(self):
         try:
+            if self.chunk_days > 0:
+                rows = self.transformation_obj.transform_data_chunked(self.iter_chunks, self.sketch_epsilon)
+                print(f"✅ Transformed {sum(rows.values())} rows in {self.chunk_days}-day chunks")
+                return
+
             # Fetch data from Hopsworks feature store
             df_cleaned = self.fetch_feature_store_data()
             
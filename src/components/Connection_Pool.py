@@ -0,0 +1,76 @@
+import time
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from psycopg2 import pool
+
+class ConnectionPool:
+    """Thread-safe pool of Postgres connections shared by the pipeline stages."""
+
+    def __init__(self, config):
+        # Number of tables processed at the same time
+        self.max_workers = config.getint('pipeline', 'max_workers', fallback=4)
+        max_connections = config.getint('database', 'max_connections', fallback=self.max_workers + 1)
+
+        # Connections are opened lazily, so a run served entirely from snapshots never connects
+        self.pool = pool.ThreadedConnectionPool(
+            0,
+            max_connections,
+            dbname=config.get('database', 'name'),
+            user=config.get('database', 'user'),
+            password=config.get('database', 'password'),
+            host=config.get('database', 'host'),
+            port=config.get('database', 'port'),
+        )
+        # ThreadedConnectionPool raises instead of waiting, so borrowing is bounded here
+        self.available = threading.BoundedSemaphore(max_connections)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for one transaction: commit on success, roll back on error."""
+        with self.available:
+            conn = self.pool.getconn()
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                # Also covers generators that stop consuming a server-side cursor early
+                conn.rollback()
+                raise
+            finally:
+                self.pool.putconn(conn)
+
+    def run_per_table(self, table_names, task):
+        """Run task(table_name) for every table on the worker pool and print per-table timings.
+
+        Tasks borrow their own connection, so each table runs in its own transaction.
+        Returns a dict of results keyed by table name; the first error is re-raised once
+        every other table has finished.
+        """
+        results, timings, errors = {}, {}, {}
+
+        def timed_task(table_name):
+            start = time.perf_counter()
+            try:
+                return task(table_name)
+            finally:
+                timings[table_name] = time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(timed_task, table_name): table_name for table_name in table_names}
+            for future in as_completed(futures):
+                table_name = futures[future]
+                try:
+                    results[table_name] = future.result()
+                    print(f"⏱ {table_name} finished in {timings[table_name]:.2f}s")
+                except Exception as e:
+                    errors[table_name] = e
+                    print(f"❌ {table_name} failed after {timings[table_name]:.2f}s: {e}")
+
+        print("Per-table timings (s):", {name: round(seconds, 2) for name, seconds in sorted(timings.items(), key=lambda item: -item[1])})
+        if errors:
+            raise next(iter(errors.values()))
+        return results
+
+    def close(self):
+        self.pool.closeall()
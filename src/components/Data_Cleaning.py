@@ -1,58 +1,219 @@
+import os
+import numpy as np
 import pandas as pd
+from src.components.Quantile_Sketch import QuantileSketch
+from src.components.Dedup_Index import DedupIndex
 
 class DataCleaning:
-    def __init__(self, df: pd.DataFrame, df_name: str):
-        self.df = df.copy()  # Make a copy to preserve the original DataFrame
+    def __init__(self, df: pd.DataFrame, df_name: str, outlier_mode: str = 'vectorized', lazy: bool = False):
+        # In lazy mode the steps only narrow a row keep-mask and queue column transforms,
+        # so the input is never modified and is not copied until materialize()
+        self.lazy = lazy
+        self.df = df if lazy else df.copy()  # Make a copy to preserve the original DataFrame
         self.df_name = df_name
+        # 'vectorized' bounds every feature on the same rows and filters once,
+        # 'sequential' bounds each feature on the rows left by the previous one
+        self.outlier_mode = outlier_mode
+        self.keep = np.ones(len(df), dtype=bool) if lazy else None
+        # (column, input columns, transform(frame)) applied in order at materialization
+        self.transforms = []
+        # IQR bounds used by the last outlier pass, feature -> [lower, upper]
+        self.outlier_bounds = {}
+
+    def row_count(self):
+        return int(self.keep.sum()) if self.lazy else self.df.shape[0]
+
+    def current(self, columns):
+        """The given columns of the rows still kept; lazy mode copies only these columns."""
+        if self.lazy:
+            return self.df.loc[self.keep, columns]
+        return self.df[columns]
+
+    def drop_rows(self, condition):
+        """Drop the current rows where condition is True."""
+        condition = np.asarray(condition, dtype=bool)
+        if self.lazy:
+            self.keep[np.flatnonzero(self.keep)[condition]] = False
+        else:
+            self.df = self.df[~condition]
+
+    def add_transform(self, column, inputs, transform):
+        """Set column to transform(frame), now or at materialization in lazy mode."""
+        if self.lazy:
+            self.transforms.append((column, inputs, transform))
+        else:
+            self.df[column] = transform(self.df)
+
+    def apply_transforms(self, frame):
+        for column, _, transform in self.transforms:
+            frame[column] = transform(frame)
+        return frame
+
+    def output_columns(self):
+        return list(self.df.columns) + [column for column, _, _ in self.transforms if column not in self.df.columns]
+
+    def current_output(self, columns):
+        """The given output columns of the kept rows, transforms applied; lazy mode copies only these."""
+        if not self.lazy:
+            return self.df[columns]
+        transformed = [column for column, _, _ in self.transforms]
+        frame = self.df.loc[self.keep, [col for col in columns if col not in transformed]]
+        if any(col in transformed for col in columns):
+            inputs = list(dict.fromkeys(col for _, names, _ in self.transforms for col in names if col in self.df.columns))
+            transformed_frame = self.apply_transforms(self.df.loc[self.keep, inputs])
+            for col in columns:
+                if col in transformed:
+                    frame[col] = transformed_frame[col]
+        return frame[columns]
+
+    def materialize(self):
+        """Build the cleaned DataFrame from the keep-mask and transforms; the only full copy in lazy mode."""
+        if self.lazy:
+            self.df = self.apply_transforms(self.df.loc[self.keep])
+            self.lazy, self.keep, self.transforms = False, None, []
+        return self.df
 
     def identify_nulls(self):
         """Identify and count null values in the DataFrame."""
-        null_counts = self.df.isnull().sum()
+        if self.lazy:
+            null_counts = pd.Series({col: int(self.df[col].isnull().to_numpy()[self.keep].sum()) for col in self.df.columns})
+        else:
+            null_counts = self.df.isnull().sum()
         print(f"Null values in {self.df_name}:\n{null_counts[null_counts > 0]}\n")
         return null_counts
 
     def treat_nulls(self):
         """Drop rows with null values from the DataFrame."""
-        initial_shape = self.df.shape[0]
-        self.df = self.df.dropna()  # Drop rows with null values
-        removed_nulls = initial_shape - self.df.shape[0]
-        print(f"Removed {removed_nulls} rows with null values in {self.df_name}. Remaining rows: {self.df.shape[0]}")
+        initial_shape = self.row_count()
+        if self.lazy:
+            for col in self.df.columns:
+                self.keep &= self.df[col].notna().to_numpy()
+        else:
+            self.df = self.df.dropna()  # Drop rows with null values
+        removed_nulls = initial_shape - self.row_count()
+        print(f"Removed {removed_nulls} rows with null values in {self.df_name}. Remaining rows: {self.row_count()}")
+
+    def identify_outliers(self, numerical_features, mode=None, bounds=None):
+        """Identify and remove outliers from specified numerical features.
+
+        Given bounds (feature -> [lower, upper], e.g. from an earlier run) are applied as they are.
+        """
+        if bounds:
+            return self.remove_outside_bounds(bounds)
+        mode = mode or self.outlier_mode
+        if mode == 'sequential':
+            return self.identify_outliers_sequential(numerical_features)
+        return self.identify_outliers_vectorized(numerical_features)
+
+    def identify_outliers_vectorized(self, numerical_features):
+        """Remove rows outside 1.5 IQR in any feature, with all bounds taken from the same rows."""
+        features = list(numerical_features)
+        if not features:
+            return {}
+
+        # One quantile call gives Q1 and Q3 of every feature
+        values = self.current(features)
+        quartiles = values.quantile([0.25, 0.75])
+        Q1, Q3 = quartiles.loc[0.25], quartiles.loc[0.75]
+        IQR = Q3 - Q1
+        lower_bound = Q1 - 1.5 * IQR
+        upper_bound = Q3 + 1.5 * IQR
+        self.outlier_bounds = {feature: [float(lower_bound[feature]), float(upper_bound[feature])] for feature in features}
 
-    def identify_outliers(self, numerical_features):
-        """Identify and remove outliers from specified numerical features."""
+        # Condition for outliers, per feature; NaN compares False and is kept as before
+        outlier_condition = values.lt(lower_bound, axis=1) | values.gt(upper_bound, axis=1)
+        outliers = outlier_condition.sum().astype(int).to_dict()
+        for feature in features:
+            print(f"Removed {outliers[feature]} outliers in {feature} from {self.df_name}.")
+
+        # Remove outliers with a single filter
+        initial_shape = self.row_count()
+        self.drop_rows(outlier_condition.any(axis=1))
+        print(f"Removed {initial_shape - self.row_count()} outlier rows from {self.df_name} in one pass.")
+        return outliers
+
+    def identify_outliers_sequential(self, numerical_features):
+        """Remove outliers feature by feature, each bounded on the rows left by the previous one."""
         outliers = {}
         for feature in numerical_features:
-            Q1 = self.df[feature].quantile(0.25)
-            Q3 = self.df[feature].quantile(0.75)
+            values = self.current([feature])[feature]
+            Q1 = values.quantile(0.25)
+            Q3 = values.quantile(0.75)
             IQR = Q3 - Q1
             lower_bound = Q1 - 1.5 * IQR
             upper_bound = Q3 + 1.5 * IQR
-            
+            self.outlier_bounds[feature] = [float(lower_bound), float(upper_bound)]
+
             # Condition for outliers
-            outlier_condition = (self.df[feature] < lower_bound) | (self.df[feature] > upper_bound)
-            outliers[feature] = self.df[outlier_condition].shape[0]  # Count outliers
-            
+            outlier_condition = (values < lower_bound) | (values > upper_bound)
+            outliers[feature] = int(outlier_condition.sum())  # Count outliers
+
             # Remove outliers
-            self.df = self.df[~outlier_condition]
+            self.drop_rows(outlier_condition)
             print(f"Removed {outliers[feature]} outliers in {feature} from {self.df_name}.")
-        
+
+        return outliers
+
+    def remove_outside_bounds(self, bounds):
+        """Remove rows outside fixed per-feature bounds in a single filter."""
+        values = self.current(list(bounds))
+        lower_bound = pd.Series({feature: feature_bounds[0] for feature, feature_bounds in bounds.items()})
+        upper_bound = pd.Series({feature: feature_bounds[1] for feature, feature_bounds in bounds.items()})
+        outlier_condition = values.lt(lower_bound, axis=1) | values.gt(upper_bound, axis=1)
+        outliers = outlier_condition.sum().astype(int).to_dict()
+        self.drop_rows(outlier_condition.any(axis=1))
+        self.outlier_bounds = dict(bounds)
+        print(f"Removed {sum(outliers.values())} outliers from {self.df_name} with the stored bounds {bounds}.")
         return outliers
 
-    def remove_duplicates(self):
-        """Remove duplicate rows from the DataFrame."""
-        initial_shape = self.df.shape[0]
-        self.df = self.df.drop_duplicates()
-        removed_duplicates = initial_shape - self.df.shape[0]
+    def duplicated_rows(self):
+        """Flag repeated kept rows without materializing them, by combining per-column group codes."""
+        transformed = [column for column, _, _ in self.transforms]
+        inputs = list(dict.fromkeys(col for _, columns, _ in self.transforms for col in columns if col in self.df.columns))
+        transformed_frame = self.apply_transforms(self.df.loc[self.keep, inputs]) if self.transforms else None
+
+        row_ids = np.zeros(self.row_count(), dtype=np.int64)
+        columns = [col for col in self.df.columns if col not in transformed]
+        for col in columns + list(dict.fromkeys(transformed)):
+            values = transformed_frame[col] if col in transformed else self.df[col][self.keep]
+            codes, uniques = pd.factorize(values, use_na_sentinel=False)
+            # Rows share an id only while they agree on every column seen so far
+            row_ids, _ = pd.factorize(row_ids * len(uniques) + codes)
+        return pd.Series(row_ids).duplicated().to_numpy()
+
+    def remove_duplicates(self, dedup_index=None):
+        """Remove duplicate rows from the DataFrame.
+
+        With a DedupIndex, rows are compared on its key columns, against each other and against
+        every key recorded in earlier runs; the keys of the rows kept are added to the index.
+        """
+        initial_shape = self.row_count()
+        if dedup_index is not None:
+            mask, hashes = dedup_index.new_rows(self.current_output(dedup_index.key_columns or self.output_columns()))
+            self.drop_rows(~mask)
+            dedup_index.add(hashes[mask])
+        elif self.lazy:
+            self.drop_rows(self.duplicated_rows())
+        else:
+            self.df = self.df.drop_duplicates()
+        removed_duplicates = initial_shape - self.row_count()
         print(f"Removed {removed_duplicates} duplicate rows from {self.df_name}.")
 
+    @staticmethod
+    def date_and_hour_transforms():
+        return [
+            ('date', ['date'], lambda frame: pd.to_datetime(frame['date'])),
+            # Convert 'hour' to int format (removing leading zeros and converting to 24-hour format)
+            ('hour', ['hour'], lambda frame: (frame['hour'] // 100).astype(int)),
+            # Create a new date_time column by combining 'date' and 'hour'
+            ('date_time', ['date', 'hour'], lambda frame: frame['date'] + pd.to_timedelta(frame['hour'], unit='h')),
+        ]
+
     def convert_date_and_hour(self):
         """Convert date and hour to datetime and create date_time column."""
         if 'date' in self.df.columns and 'hour' in self.df.columns:
-            self.df['date'] = pd.to_datetime(self.df['date'])
-            # Convert 'hour' to int format (removing leading zeros and converting to 24-hour format)
-            self.df['hour'] = (self.df['hour'] // 100).astype(int)
-            # Create a new date_time column by combining 'date' and 'hour'
-            self.df['date_time'] = self.df['date'] + pd.to_timedelta(self.df['hour'], unit='h')
+            for column, inputs, transform in self.date_and_hour_transforms():
+                self.add_transform(column, inputs, transform)
             print(f"Combined 'date' and 'hour' into 'date_time' for {self.df_name}.")
 
     def display_cleaned_data(self):
@@ -60,29 +221,137 @@ class DataCleaning:
         print(f"Cleaned DataFrame ({self.df_name}):")
         print(self.df.head())  # Display the first few rows of the cleaned DataFrame
 
-    def full_cleaning_process(self, numerical_features):
+    def full_cleaning_process(self, numerical_features, dedup_index=None, outlier_bounds=None):
         """Run the full data cleaning process."""
         print("Available columns in DataFrame:", self.df.columns)  # Debugging line
-    
+
         # Identify and treat null values
         self.identify_nulls()
         self.treat_nulls()
 
         # Identify and treat outliers
-        outliers = self.identify_outliers(numerical_features)
+        outliers = self.identify_outliers(numerical_features, bounds=outlier_bounds)
 
         # Convert date and hour to datetime
         self.convert_date_and_hour()
 
         # Remove duplicates
-        self.remove_duplicates()
+        self.remove_duplicates(dedup_index)
+
+        # Build the cleaned frame once (a no-op outside lazy mode)
+        self.materialize()
 
         # Print the final shape and datatypes of the DataFrame
         print(f"Final shape of {self.df_name}: {self.df.shape}")
         print("Columns after cleaning:", self.df.columns)  # Debugging line
         print("Data types after cleaning:\n", self.df.dtypes)  # Print data types
-        
+
         # Display the cleaned data
         self.display_cleaned_data()
 
         return self.df
+
+
+class ChunkedDataCleaning:
+    """Clean a table that does not fit in memory in two passes over its chunks.
+
+    Pass one counts nulls and builds a quantile sketch per numerical feature over the
+    null-free rows; pass two filters each chunk against the approximate IQR bounds and
+    appends it to the output CSV. Outliers follow the 'vectorized' semantics of DataCleaning.
+    """
+
+    def __init__(self, df_name: str, epsilon: float = 0.01):
+        self.df_name = df_name
+        # Normalized rank error of the sketched quartiles
+        self.epsilon = epsilon
+
+    def sketch_features(self, chunks, numerical_features):
+        """Pass one: null counts per column and a quartile sketch per feature."""
+        null_counts, sketches = None, {feature: QuantileSketch(self.epsilon) for feature in numerical_features}
+        rows = 0
+        for chunk in chunks:
+            rows += len(chunk)
+            chunk_nulls = chunk.isnull().sum()
+            null_counts = chunk_nulls if null_counts is None else null_counts.add(chunk_nulls, fill_value=0)
+            complete = chunk.dropna()
+            for feature, sketch in sketches.items():
+                sketch.update(complete[feature].to_numpy(dtype='float64'))
+        return rows, null_counts, sketches
+
+    def outlier_bounds(self, sketches):
+        """IQR bounds per feature from the sketched quartiles, with the value range each exact quartile may take."""
+        bounds = {}
+        for feature, sketch in sketches.items():
+            Q1, Q3 = sketch.quantile([0.25, 0.75])
+            IQR = Q3 - Q1
+            bounds[feature] = {
+                'q1': Q1,
+                'q3': Q3,
+                'lower_bound': Q1 - 1.5 * IQR,
+                'upper_bound': Q3 + 1.5 * IQR,
+                'q1_bracket': sketch.quantile_bracket(0.25),
+                'q3_bracket': sketch.quantile_bracket(0.75),
+                'rank_error': sketch.epsilon,
+                'count': sketch.count,
+            }
+            print(
+                f"{feature}: Q1 {Q1:.4g} (exact within {bounds[feature]['q1_bracket'][0]:.4g}..{bounds[feature]['q1_bracket'][1]:.4g}), "
+                f"Q3 {Q3:.4g} (exact within {bounds[feature]['q3_bracket'][0]:.4g}..{bounds[feature]['q3_bracket'][1]:.4g}), "
+                f"rank error ±{sketch.epsilon:g} over {sketch.count} rows, {sketch.size()} retained"
+            )
+        return bounds
+
+    def clean_chunk(self, chunk, bounds, dedup_index):
+        """Drop nulls, outliers and rows already written, and convert date and hour."""
+        chunk = chunk.dropna()
+        keep = np.ones(len(chunk), dtype=bool)
+        outliers = {}
+        for feature, feature_bounds in bounds.items():
+            values = chunk[feature].to_numpy(dtype='float64')
+            outlier_condition = (values < feature_bounds['lower_bound']) | (values > feature_bounds['upper_bound'])
+            outliers[feature] = int(outlier_condition.sum())
+            keep &= ~outlier_condition
+        chunk = chunk[keep]
+
+        if 'date' in chunk.columns and 'hour' in chunk.columns:
+            for column, _, transform in DataCleaning.date_and_hour_transforms():
+                chunk[column] = transform(chunk)
+
+        # Duplicates are found across chunks through the hashes of the rows written so far
+        return dedup_index.drop_duplicates(chunk), outliers
+
+    def full_cleaning_process(self, iter_chunks, numerical_features, output_path):
+        """Clean the chunks yielded by iter_chunks() into output_path and return a report.
+
+        iter_chunks is called once per pass and must yield the same rows both times.
+        """
+        rows, null_counts, sketches = self.sketch_features(iter_chunks(), numerical_features)
+        print(f"Null values in {self.df_name}:\n{null_counts[null_counts > 0] if null_counts is not None else {}}\n")
+        bounds = self.outlier_bounds(sketches)
+
+        outliers = dict.fromkeys(numerical_features, 0)
+        dedup_index = DedupIndex()
+        rows_written = 0
+        header_written = False
+        tmp_path = output_path + '.tmp'
+        with open(tmp_path, 'w', newline='') as f:
+            for chunk in iter_chunks():
+                cleaned, chunk_outliers = self.clean_chunk(chunk, bounds, dedup_index)
+                for feature, count in chunk_outliers.items():
+                    outliers[feature] += count
+                # The first chunk writes the header even when nothing in it survives cleaning
+                cleaned.to_csv(f, index=False, header=not header_written)
+                header_written = True
+                rows_written += len(cleaned)
+        os.replace(tmp_path, output_path)
+
+        for feature, count in outliers.items():
+            print(f"Removed {count} outliers in {feature} from {self.df_name} (approximate bounds).")
+        print(f"Final shape of {self.df_name}: {rows_written} of {rows} rows written to {output_path}")
+        return {
+            'rows': rows,
+            'rows_written': rows_written,
+            'null_counts': {} if null_counts is None else {col: int(count) for col, count in null_counts.items() if count},
+            'outliers': outliers,
+            'bounds': bounds,
+        }
@@ -1,6 +1,7 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+from src.components.Time_Kernels import time_of_day_bucket
 
 class DataExplorationComponent:
     def __init__(self, df_name, df):
@@ -87,19 +88,7 @@ class DataExplorationComponent:
 
     def explore_traffic(self):
         # Categorize hours of the day into time periods
-        def categorize_hour(hour):
-            if 0 <= hour < 6:
-                return 'Early Morning'
-            elif 6 <= hour < 12:
-                return 'Morning'
-            elif 12 <= hour < 18:
-                return 'Afternoon'
-            elif 18 <= hour < 24:
-                return 'Evening'
-            else:
-                return 'Unknown'
-
-        self.df['time_period'] = self.df['hour'].apply(categorize_hour)
+        self.df['time_period'] = time_of_day_bucket(self.df['hour'])
 
         # Plot traffic conditions by time period
         plt.figure(figsize=(10, 5))
@@ -0,0 +1,91 @@
+import uuid
+import pandas as pd
+from psycopg2 import sql
+
+class DataExtractor:
+    """Stream table extracts through a named server-side cursor with column projection."""
+
+    def __init__(self, connection_pool, chunk_rows=50000, float32=False):
+        self.connection_pool = connection_pool
+        self.chunk_rows = chunk_rows
+        # float64 -> float32 halves float memory but is lossy, so it is opt-in
+        self.float32 = float32
+
+    def build_query(self, table_name, columns=None, time_column=None, start=None, end=None, filters=None):
+        """Build the projected SELECT; the time window is [start, end) and filters map a column to a value or list."""
+        if columns:
+            projection = sql.SQL(', ').join(sql.Identifier(col.lower()) for col in columns)
+        else:
+            projection = sql.SQL('*')
+
+        conditions, params = [], []
+        if time_column and start is not None:
+            conditions.append(sql.SQL('{} >= %s').format(sql.Identifier(time_column)))
+            params.append(start)
+        if time_column and end is not None:
+            conditions.append(sql.SQL('{} < %s').format(sql.Identifier(time_column)))
+            params.append(end)
+        for col, value in (filters or {}).items():
+            if isinstance(value, (list, tuple, set)):
+                conditions.append(sql.SQL('{} = ANY(%s)').format(sql.Identifier(col)))
+                params.append(list(value))
+            else:
+                conditions.append(sql.SQL('{} = %s').format(sql.Identifier(col)))
+                params.append(value)
+
+        query = sql.SQL('SELECT {} FROM {}').format(projection, sql.Identifier(table_name))
+        if conditions:
+            query = query + sql.SQL(' WHERE ') + sql.SQL(' AND ').join(conditions)
+        return query, params
+
+    def compact_dtypes(self, df):
+        """Downcast integer columns and store text columns as categoricals."""
+        for col in df.columns:
+            dtype = df[col].dtype
+            if pd.api.types.is_integer_dtype(dtype):
+                df[col] = pd.to_numeric(df[col], downcast='integer')
+            elif pd.api.types.is_float_dtype(dtype) and self.float32:
+                df[col] = df[col].astype('float32')
+            elif pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+                df[col] = df[col].astype('category')
+        return df
+
+    def iter_chunks(self, table_name, columns=None, time_column=None, start=None, end=None, filters=None):
+        """Yield the extract as compact DataFrames of at most chunk_rows rows."""
+        query, params = self.build_query(table_name, columns, time_column, start, end, filters)
+        with self.connection_pool.connection() as conn:
+            # A named cursor keeps the result set on the server and ships it chunk by chunk
+            with conn.cursor(name=f"extract_{table_name}_{uuid.uuid4().hex[:8]}") as cur:
+                cur.itersize = self.chunk_rows
+                cur.execute(query, params)
+                column_names = None
+                while True:
+                    rows = cur.fetchmany(self.chunk_rows)
+                    if not rows and column_names is not None:
+                        break
+                    if column_names is None:
+                        column_names = [desc[0] for desc in cur.description]
+                    # An empty result still yields one empty chunk, so consumers see its columns
+                    yield self.compact_dtypes(pd.DataFrame.from_records(rows, columns=column_names))
+                    if not rows:
+                        break
+
+    def concat_chunks(self, chunks):
+        """Concatenate chunks, unifying categories so categorical columns stay categorical."""
+        if not chunks:
+            return pd.DataFrame()
+        for col in chunks[0].columns:
+            if all(isinstance(chunk[col].dtype, pd.CategoricalDtype) for chunk in chunks):
+                categories = pd.api.types.union_categoricals([chunk[col] for chunk in chunks]).categories
+                for chunk in chunks:
+                    chunk[col] = chunk[col].cat.set_categories(categories)
+        return pd.concat(chunks, ignore_index=True)
+
+    def extract(self, table_name, columns=None, time_column=None, start=None, end=None, filters=None, as_iterator=False):
+        """Extract a table as one compact DataFrame, or as an iterator of chunks when as_iterator is set."""
+        chunks = self.iter_chunks(table_name, columns, time_column, start, end, filters)
+        if as_iterator:
+            return chunks
+        df = self.concat_chunks(list(chunks))
+        print(f"Extracted {df.shape[0]} rows and {df.shape[1]} columns from {table_name} ({df.memory_usage(deep=True).sum() / 1024 ** 2:.1f} MB)")
+        return df
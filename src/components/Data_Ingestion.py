@@ -1,17 +1,71 @@
+import io
+import time
+import hashlib
+import tempfile
+from urllib.parse import urljoin
 import requests
 import pandas as pd
-import psycopg2
 from psycopg2 import extras
 from bs4 import BeautifulSoup
+from src.components.Ingestion_Manifest import IngestionManifest
+from src.components.Connection_Pool import ConnectionPool
+from src.components.Ingestion_Metrics import IngestionMetrics, peak_rss_mb
+from src.components.Table_Schemas import TABLE_SCHEMAS, PANDAS_DTYPES
+
+LOAD_MODES = {'copy', 'upsert'}
+
+# Chunk dtypes from narrowest to widest; a column takes the widest one seen in any chunk
+DTYPE_ORDER = ['Int64', 'float64', 'object']
+
+def chunk_dtype(values):
+    """Dtype a chunk of one column needs, or None if it is all missing."""
+    non_null = values.dropna()
+    if non_null.empty:
+        return None
+    if pd.api.types.is_bool_dtype(non_null):
+        return 'object'
+    if pd.api.types.is_integer_dtype(non_null):
+        return 'Int64'
+    if pd.api.types.is_float_dtype(non_null):
+        # Integers with missing values are read as floats
+        return 'Int64' if (non_null == non_null.round()).all() else 'float64'
+    return 'object'
+
+def widest_dtype(current, new):
+    if current is None or new is None:
+        return current or new
+    return max(current, new, key=DTYPE_ORDER.index)
 
 class DataIngestion:
-    def __init__(self, config):
+    def __init__(self, config, connection_pool=None):
         self.db_host = config.get('database', 'host')
         self.db_port = config.get('database', 'port')
         self.db_name = config.get('database', 'name')
         self.db_user = config.get('database', 'user')
         self.db_password = config.get('database', 'password')
         self.github_dir_url = config.get('github', 'dir_url')
+        # 'copy' streams rows with COPY FROM STDIN, 'upsert' keeps the execute_values path
+        self.load_mode = config.get('ingestion', 'load_mode', fallback='copy')
+        if self.load_mode not in LOAD_MODES:
+            raise ValueError(f"Unknown [ingestion] load_mode {self.load_mode!r}, expected one of {sorted(LOAD_MODES)}")
+        # Downloads larger than this are spooled to a temporary file instead of memory
+        self.spool_max_bytes = config.getint('ingestion', 'spool_max_mb', fallback=64) * 1024 * 1024
+        # Unchanged files are skipped and grown files appended unless incremental is disabled
+        self.incremental = config.getboolean('ingestion', 'incremental', fallback=True)
+        self.manifest = IngestionManifest(config.get('ingestion', 'manifest_path', fallback='ingestion_manifest.json'))
+        # A positive memory ceiling switches full loads to chunked streaming
+        self.max_memory_bytes = config.getint('ingestion', 'max_memory_mb', fallback=0) * 1024 * 1024
+        # Rows per chunk of the dtype scan of undeclared columns, and of the sample that sizes chunks
+        self.sample_rows = config.getint('ingestion', 'sample_rows', fallback=10000)
+        # Typed columns and join-key indexes from Table_Schemas; partitioning is opt-in
+        self.use_declared_schemas = config.getboolean('ingestion', 'declared_schemas', fallback=True)
+        self.partition_time_series = config.getboolean('ingestion', 'partition_time_series', fallback=False)
+        self.connection_pool = connection_pool or ConnectionPool(config)
+        # Per-table download/parse/load timings, written as a JSON run report and optionally to MLflow
+        self.metrics = IngestionMetrics(
+            config.get('ingestion', 'report_dir', fallback='ingestion_reports'),
+            config.getboolean('ingestion', 'mlflow_metrics', fallback=False),
+        )
 
     def fetch_csv_file_urls(self, github_dir_url):
         response = requests.get(github_dir_url)
@@ -21,27 +75,119 @@ class DataIngestion:
 
         soup = BeautifulSoup(response.text, 'html.parser')
 
+        if 'github.com' in github_dir_url:
+            return {
+                'https://raw.githubusercontent.com' + link['href'].replace('/blob', '')
+                for link in soup.find_all('a', href=True)
+                if '/blob/' in link['href'] and link['href'].endswith('.csv')
+            }
+
+        # Plain directory listing, e.g. `python -m http.server` serving Data/Training_data
+        base_url = github_dir_url if github_dir_url.endswith('/') else github_dir_url + '/'
         return {
-            'https://raw.githubusercontent.com' + link['href'].replace('/blob', '')
+            urljoin(base_url, link['href'])
             for link in soup.find_all('a', href=True)
-            if '/blob/' in link['href'] and link['href'].endswith('.csv')
+            if link['href'].endswith('.csv')
         }
 
-    def get_column_types(self, df):
-        """Generate PostgreSQL column types based on DataFrame dtypes."""
+    def table_schema(self, table_name):
+        """Return the declared schema of a table, or None to use dtype-based types."""
+        if not self.use_declared_schemas:
+            return None
+        return TABLE_SCHEMAS.get(table_name)
+
+    def partition_column(self, table_name):
+        schema = self.table_schema(table_name)
+        if schema is None or not self.partition_time_series:
+            return None
+        return schema.get('partition_column')
+
+    def key_columns(self, table_name):
+        """Primary key columns; partitioned tables must include the partition column."""
+        partition_column = self.partition_column(table_name)
+        return ['id', partition_column] if partition_column else ['id']
+
+    def get_column_types(self, df, table_name=None):
+        """Generate PostgreSQL column types from the declared schema, falling back to DataFrame dtypes."""
+        schema = self.table_schema(table_name) or {}
+        declared = schema.get('columns', {})
         type_mapping = {
             'object': 'TEXT',
             'int64': 'INTEGER',
+            'Int64': 'INTEGER',
             'float64': 'FLOAT',
             'bool': 'BOOLEAN',
             'datetime64[ns]': 'TIMESTAMP'
         }
-        return ', '.join(f"{col} {type_mapping.get(str(dtype), 'TEXT')}" for col, dtype in df.dtypes.items())
+        return ', '.join(
+            f"{col} {declared.get(col.lower()) or type_mapping.get(str(dtype), 'TEXT')}" for col, dtype in df.dtypes.items()
+        )
 
     def create_table(self, df, table_name, cur):
-        columns = self.get_column_types(df)
-        create_table_query = f"CREATE TABLE IF NOT EXISTS {table_name} (id SERIAL PRIMARY KEY, {columns});"
+        columns = self.get_column_types(df, table_name)
+        partition_column = self.partition_column(table_name)
+        if partition_column is None:
+            create_table_query = f"CREATE TABLE IF NOT EXISTS {table_name} (id SERIAL PRIMARY KEY, {columns});"
+            cur.execute(create_table_query)
+            return
+
+        # Time-series tables are range-partitioned by month; rows outside known months land in the default partition
+        create_table_query = (
+            f"CREATE TABLE IF NOT EXISTS {table_name} (id SERIAL, {columns}, PRIMARY KEY ({', '.join(self.key_columns(table_name))})) "
+            f"PARTITION BY RANGE ({partition_column});"
+        )
         cur.execute(create_table_query)
+        cur.execute(f"CREATE TABLE IF NOT EXISTS {table_name}_default PARTITION OF {table_name} DEFAULT;")
+
+    def ensure_partitions(self, df, table_name, cur):
+        """Create the monthly partitions covering the rows about to be loaded."""
+        partition_column = self.partition_column(table_name)
+        source_col = next((col for col in df.columns if col.lower() == partition_column), None)
+        if partition_column is None or source_col is None:
+            return
+
+        dates = pd.to_datetime(df[source_col], errors='coerce').dropna()
+        if dates.empty:
+            return
+        first_month = dates.min().to_period('M').to_timestamp()
+        for month_start in pd.date_range(first_month, dates.max(), freq='MS'):
+            month_end = month_start + pd.offsets.MonthBegin(1)
+            cur.execute(
+                f"CREATE TABLE IF NOT EXISTS {table_name}_{month_start:%Y%m} PARTITION OF {table_name} "
+                f"FOR VALUES FROM ('{month_start:%Y-%m-%d}') TO ('{month_end:%Y-%m-%d}');"
+            )
+
+    def index_name(self, table_name, columns):
+        return f"idx_{table_name}_{'_'.join(columns)}"
+
+    def drop_indexes(self, table_name, cur):
+        """Drop the declared indexes so a full reload does not maintain them row by row."""
+        schema = self.table_schema(table_name) or {}
+        for columns in schema.get('indexes', []):
+            cur.execute(f"DROP INDEX IF EXISTS {self.index_name(table_name, columns)};")
+
+    def create_indexes(self, table_name, cur):
+        """Build the declared join-key indexes after the bulk load and refresh planner statistics."""
+        schema = self.table_schema(table_name)
+        if schema is None:
+            return
+        with self.metrics.timer(table_name, 'index_seconds'):
+            for columns in schema.get('indexes', []):
+                cur.execute(f"CREATE INDEX IF NOT EXISTS {self.index_name(table_name, columns)} ON {table_name} ({', '.join(columns)});")
+            cur.execute(f"ANALYZE {table_name};")
+        print(f"Indexed table {table_name} on {schema.get('indexes', [])}.")
+
+    def apply_declared_types(self, df, table_name):
+        """Cast columns declared as integers so they are written without a trailing '.0'."""
+        schema = self.table_schema(table_name)
+        if schema is None:
+            return df
+        casts = {
+            col: 'Int64'
+            for col, dtype in df.dtypes.items()
+            if PANDAS_DTYPES.get(schema['columns'].get(col.lower())) == 'Int64' and str(dtype) != 'Int64'
+        }
+        return df.astype(casts) if casts else df
 
     def empty_table(self, table_name, cur):
         """Empty the specified table in the database."""
@@ -53,9 +199,15 @@ class DataIngestion:
         insert_query = f"""
         INSERT INTO {table_name} ({cols})
         VALUES %s
-        ON CONFLICT (id) DO UPDATE SET
+        ON CONFLICT ({', '.join(self.key_columns(table_name))}) DO UPDATE SET
         {', '.join([f"{col} = EXCLUDED.{col}" for col in df.columns])};
         """
+        # Nullable integer columns from chunked reads carry pd.NA, which psycopg2 cannot adapt
+        nullable_cols = [col for col, dtype in df.dtypes.items() if str(dtype) == 'Int64']
+        if nullable_cols:
+            df = df.astype({col: object for col in nullable_cols})
+            df[nullable_cols] = df[nullable_cols].where(df[nullable_cols].notna(), None)
+
         data = [tuple(row) for row in df.itertuples(index=False, name=None)]
         # Insert data into the database
         extras.execute_values(cur, insert_query, data)
@@ -63,46 +215,288 @@ class DataIngestion:
         # Return the number of rows inserted
         return len(data)
 
-    def start_ingestion(self):
-        # Main logic to fetch, process, and insert data
-        with psycopg2.connect(dbname=self.db_name, user=self.db_user, password=self.db_password, host=self.db_host, port=self.db_port) as conn:
-            with conn.cursor() as cur:
-                file_urls = self.fetch_csv_file_urls(self.github_dir_url)
-                print(f"Found CSV files: {file_urls}")
+    def copy_data(self, df, table_name, cur):
+        """Bulk load the DataFrame into the table with COPY FROM STDIN."""
+        cols = ', '.join(df.columns)
+        buffer = io.StringIO()
+        df.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+
+        # Empty unquoted fields are loaded as NULL, matching the NaN values of the DataFrame
+        copy_query = f"COPY {table_name} ({cols}) FROM STDIN WITH (FORMAT csv)"
+        cur.copy_expert(copy_query, buffer)
+
+        # Return the number of rows loaded
+        return len(df)
 
-                for file_url in file_urls:
-                    print(f"Processing {file_url} ...")
+    def load_data(self, df, table_name, cur):
+        """Load the DataFrame using the configured load mode."""
+        with self.metrics.timer(table_name, 'load_seconds'):
+            df = self.apply_declared_types(df, table_name)
+            self.ensure_partitions(df, table_name, cur)
+            if self.load_mode == 'upsert':
+                num_rows = self.upsert_data(df, table_name, cur)
+            else:
+                num_rows = self.copy_data(df, table_name, cur)
+        self.metrics.add(table_name, 'rows_loaded', num_rows)
+        return num_rows
 
-                    response = requests.get(file_url)
-                    if response.status_code == 200:
-                        df = pd.read_csv(file_url)
-                        table_name = file_url.split('/')[-1].split('.')[0]
+    def table_name_from_url(self, file_url):
+        return file_url.split('/')[-1].split('.')[0]
 
-                        self.create_table(df, table_name, cur)
-                        print(f"Ensured table {table_name} exists.")
+    def download_csv(self, file_url, entry=None):
+        """Download a CSV file once into a spooled buffer, fingerprinting it while streaming.
 
-                        # Empty the table before upserting new data
-                        self.empty_table(table_name, cur)
-                        print(f"Emptied table {table_name}.")
+        Returns (buffer, fingerprint). The buffer is None when the server reports the file
+        unchanged (HTTP 304); both are None when the download fails.
+        """
+        table_name = self.table_name_from_url(file_url)
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+
+        start = time.perf_counter()
+        response = requests.get(file_url, stream=True, headers=headers)
+        if response.status_code == 304:
+            response.close()
+            self.metrics.add(table_name, 'download_seconds', time.perf_counter() - start)
+            self.metrics.set(table_name, 'not_modified', True)
+            return None, {'sha256': entry['sha256'], 'size': entry['size'], 'etag': entry['etag'], 'prefix_sha256': entry['sha256']}
+        if response.status_code != 200:
+            print(f"Failed to download {file_url} with status code {response.status_code}")
+            response.close()
+            return None, None
+
+        # Hash the whole file, and separately the part that was loaded last time
+        full_hash = hashlib.sha256()
+        prefix_hash = hashlib.sha256()
+        prefix_size = entry['size'] if entry else 0
+        size = 0
+
+        # Small files stay in memory, large ones roll over to a temporary file
+        buffer = tempfile.SpooledTemporaryFile(max_size=self.spool_max_bytes)
+        with response:
+            for block in response.iter_content(chunk_size=1024 * 1024):
+                buffer.write(block)
+                full_hash.update(block)
+                if size < prefix_size:
+                    prefix_hash.update(block[:prefix_size - size])
+                size += len(block)
+        buffer.seek(0)
+        self.metrics.add(table_name, 'download_seconds', time.perf_counter() - start)
+        self.metrics.add(table_name, 'download_bytes', size)
+
+        fingerprint = {
+            'sha256': full_hash.hexdigest(),
+            'size': size,
+            'etag': response.headers.get('ETag'),
+            'prefix_sha256': prefix_hash.hexdigest() if entry and size >= prefix_size else None,
+        }
+        return buffer, fingerprint
 
-                        # Get the shape of the DataFrame
-                        df_shape = df.shape
-                        print(f"DataFrame shape before upsert into {table_name}: {df_shape} (Rows: {df_shape[0]}, Columns: {df_shape[1]})")
+    def plan_load(self, table_name, fingerprint, entry, cur):
+        """Decide whether a downloaded file is skipped, appended as a delta or fully reloaded."""
+        if not self.incremental or entry is None:
+            return 'full'
 
-                        # Upsert data into the database and get the number of rows inserted
-                        num_rows_inserted = self.upsert_data(df, table_name, cur)
-                        print(f"Upserted {num_rows_inserted} rows into table {table_name}.")
+        # The manifest is only trusted while the table still holds what it recorded
+        cur.execute("SELECT to_regclass(%s);", (table_name,))
+        if cur.fetchone()[0] is None:
+            return 'full'
+        with self.metrics.timer(table_name, 'count_seconds'):
+            cur.execute(f"SELECT COUNT(*) FROM {table_name};")
+            row_count = cur.fetchone()[0]
+        if row_count != entry['row_count']:
+            return 'full'
 
-                        # Print final data shape in the database
-                        cur.execute(f"SELECT COUNT(*) FROM {table_name};")
-                        final_count = cur.fetchone()[0]
-                        print(f"Final data shape in table {table_name}: {final_count} rows.")
+        if fingerprint['sha256'] == entry['sha256']:
+            return 'skip'
+        if fingerprint['prefix_sha256'] == entry['sha256'] and fingerprint['size'] > entry['size']:
+            return 'delta'
+        return 'full'
 
-                    else:
-                        print(f"Failed to download {file_url}")
+    def read_delta(self, buffer, entry):
+        """Parse only the rows appended after the previously loaded size, or None if not line aligned."""
+        buffer.seek(entry['size'] - 1)
+        if buffer.read(1) != b'\n':
+            return None
+        delta_bytes = buffer.read()
+
+        # Re-attach the header so the delta parses with the same columns
+        buffer.seek(0)
+        header = buffer.readline()
+        return pd.read_csv(io.BytesIO(header + delta_bytes))
+
+    def count_rows(self, table_name, cur):
+        with self.metrics.timer(table_name, 'count_seconds'):
+            cur.execute(f"SELECT COUNT(*) FROM {table_name};")
+            final_count = cur.fetchone()[0]
+        print(f"Final data shape in table {table_name}: {final_count} rows.")
+        return final_count
+
+    def ingest_table(self, df, table_name, cur):
+        """Create, empty and load a single table, then return its verified row count."""
+        self.create_table(df, table_name, cur)
+        print(f"Ensured table {table_name} exists.")
+
+        # Empty the table before loading new data
+        self.empty_table(table_name, cur)
+        self.drop_indexes(table_name, cur)
+        print(f"Emptied table {table_name}.")
+
+        # Get the shape of the DataFrame
+        df_shape = df.shape
+        print(f"DataFrame shape before load into {table_name}: {df_shape} (Rows: {df_shape[0]}, Columns: {df_shape[1]})")
+
+        # Load data into the database and get the number of rows inserted
+        num_rows_inserted = self.load_data(df, table_name, cur)
+        print(f"Loaded {num_rows_inserted} rows into table {table_name} ({self.load_mode}).")
+        self.create_indexes(table_name, cur)
+
+        # Print final data shape in the database
+        return self.count_rows(table_name, cur)
+
+    def infer_dtypes(self, buffer, table_name=None):
+        """Take column dtypes from the declared schema, or from a scan of the whole file for columns
+        it does not declare, so every chunk is parsed the same way."""
+        with self.metrics.timer(table_name, 'parse_seconds'):
+            header = pd.read_csv(buffer, nrows=0)
+            buffer.seek(0)
+            declared = (self.table_schema(table_name) or {}).get('columns', {})
+            dtypes = {col: PANDAS_DTYPES[declared[col.lower()]] for col in header.columns if col.lower() in declared}
+            undeclared = [col for col in header.columns if col not in dtypes]
+            if undeclared:
+                print(f"Scanning {table_name} for the dtypes of undeclared columns {undeclared} ...")
+                dtypes.update(self.scan_dtypes(buffer, undeclared))
+                buffer.seek(0)
+            sample = pd.read_csv(buffer, nrows=self.sample_rows, dtype=dtypes)
+        buffer.seek(0)
+        return sample, dtypes
+
+    def scan_dtypes(self, buffer, columns):
+        """Widest dtype each column takes in any chunk of the file: Int64, then float64, then text."""
+        kinds = dict.fromkeys(columns)
+        for chunk in pd.read_csv(buffer, usecols=columns, chunksize=self.sample_rows):
+            for col in columns:
+                kinds[col] = widest_dtype(kinds[col], chunk_dtype(chunk[col]))
+        # Columns that are empty throughout have nothing to infer from and stay text
+        return {col: kind or 'object' for col, kind in kinds.items()}
+
+    def chunk_rows(self, sample):
+        """Number of rows per chunk that keeps the chunk and its load buffer within the memory ceiling."""
+        bytes_per_row = max(sample.memory_usage(index=False, deep=True).sum() / max(len(sample), 1), 1)
+        # The DataFrame chunk and the CSV/tuple copy built by load_data are alive at the same time
+        return max(int(self.max_memory_bytes / (2 * bytes_per_row)), 1)
+
+    def ingest_table_chunked(self, buffer, table_name, cur):
+        """Create and empty the table, then stream the CSV into it chunk by chunk."""
+        sample, dtypes = self.infer_dtypes(buffer, table_name)
+        self.create_table(sample, table_name, cur)
+        print(f"Ensured table {table_name} exists.")
+
+        self.empty_table(table_name, cur)
+        self.drop_indexes(table_name, cur)
+        print(f"Emptied table {table_name}.")
+
+        chunk_rows = self.chunk_rows(sample)
+        del sample
+        print(f"Streaming {table_name} in chunks of {chunk_rows} rows ({self.max_memory_bytes // (1024 * 1024)} MB ceiling).")
+
+        num_rows_inserted = 0
+        reader = pd.read_csv(buffer, dtype=dtypes, chunksize=chunk_rows)
+        while True:
+            # Parsing happens as the reader advances, so time it apart from the load
+            with self.metrics.timer(table_name, 'parse_seconds'):
+                chunk = next(reader, None)
+            if chunk is None:
+                break
+            num_rows_inserted += self.load_data(chunk, table_name, cur)
+        print(f"Loaded {num_rows_inserted} rows into table {table_name} ({self.load_mode}).")
+        self.create_indexes(table_name, cur)
+
+        return self.count_rows(table_name, cur)
+
+    def append_table(self, df, table_name, cur):
+        """Append the new rows of a grown source file, then return the verified row count."""
+        num_rows_inserted = self.load_data(df, table_name, cur)
+        print(f"Appended {num_rows_inserted} new rows to table {table_name} ({self.load_mode}).")
+        return self.count_rows(table_name, cur)
+
+    def process_file(self, file_url, buffer, fingerprint, cur):
+        """Skip, append or reload one downloaded file; return (fingerprint, row count, plan) if loaded."""
+        table_name = self.table_name_from_url(file_url)
+        entry = self.manifest.get(table_name)
+        plan = self.plan_load(table_name, fingerprint, entry, cur)
+
+        if plan == 'skip':
+            print(f"Skipped {file_url}: unchanged since {entry['loaded_at']}.")
+            self.metrics.set(table_name, 'plan', plan)
+            return None
+
+        if buffer is None:
+            # Not modified on the server but the table no longer matches, so fetch it again
+            buffer, fingerprint = self.download_csv(file_url)
+            if buffer is None:
+                return None
+
+        with buffer:
+            with self.metrics.timer(table_name, 'parse_seconds'):
+                df = self.read_delta(buffer, entry) if plan == 'delta' else None
+            if plan == 'delta' and df is None:
+                # The old end of file is not a line boundary, so the delta cannot be cut out of it
+                plan = 'full'
+            print(f"Processing {file_url} ({plan} load) ...")
+            self.metrics.set(table_name, 'plan', plan)
+            if df is not None:
+                final_count = self.append_table(df, table_name, cur)
+            elif self.max_memory_bytes:
+                buffer.seek(0)
+                final_count = self.ingest_table_chunked(buffer, table_name, cur)
+            else:
+                buffer.seek(0)
+                with self.metrics.timer(table_name, 'parse_seconds'):
+                    df = pd.read_csv(buffer)
+                final_count = self.ingest_table(df, table_name, cur)
+
+        return fingerprint, final_count, plan
+
+    def ingest_file(self, file_url):
+        """Download one file and load it into its table in a transaction of its own."""
+        table_name = self.table_name_from_url(file_url)
+        self.metrics.set(table_name, 'file_url', file_url)
+        with self.metrics.timer(table_name, 'total_seconds'):
+            buffer, fingerprint = self.download_csv(file_url, self.manifest.get(table_name))
+            if fingerprint is None:
+                self.metrics.set(table_name, 'plan', 'failed')
+                return None
+
+            with self.connection_pool.connection() as conn:
+                with conn.cursor() as cur:
+                    loaded = self.process_file(file_url, buffer, fingerprint, cur)
+
+        # Peak RSS is per process, so with parallel tables this is the high-water mark so far
+        self.metrics.set(table_name, 'peak_rss_mb', peak_rss_mb())
+
+        # The transaction is committed at this point, so the manifest may record it
+        if loaded is not None:
+            fingerprint, final_count, plan = loaded
+            self.metrics.set(table_name, 'final_count', final_count)
+            self.manifest.update(table_name, file_url, fingerprint['sha256'], fingerprint['size'], final_count, fingerprint['etag'], plan)
+        return loaded
+
+    def start_ingestion(self):
+        # Main logic to fetch, process, and insert data
+        file_urls = self.fetch_csv_file_urls(self.github_dir_url)
+        print(f"Found CSV files: {file_urls}")
+        urls_by_table = {self.table_name_from_url(file_url): file_url for file_url in file_urls}
 
-                conn.commit()
-                print("✅ Data ingestion completed successfully!")
+        # Each table downloads and loads on its own worker, so loads overlap with downloads still in flight
+        try:
+            self.connection_pool.run_per_table(urls_by_table, lambda table_name: self.ingest_file(urls_by_table[table_name]))
+        finally:
+            self.manifest.save()
+            self.metrics.save(load_mode=self.load_mode, max_workers=self.connection_pool.max_workers)
+        print("✅ Data ingestion completed successfully!")
 
 # Sample usage
 # config = configparser.RawConfigParser()
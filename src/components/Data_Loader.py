@@ -1,12 +1,15 @@
 import pandas as pd
+from src.components.Dtype_Registry import apply_dtypes
 
 class DataLoader:
-    def __init__(self, data_path):
+    def __init__(self, data_path, table_name=None):
         self.data_path = data_path
+        # Registry key for compact dtypes; taken from the file name when not given
+        self.table_name = table_name or data_path
 
     def load_data(self):
         try:
-            data = pd.read_csv(self.data_path)
+            data = apply_dtypes(pd.read_csv(self.data_path), self.table_name)
             print("✅ Data loaded successfully.")
             return data
         except Exception as e:
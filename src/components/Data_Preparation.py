@@ -1,6 +1,15 @@
 import pandas as pd
+import numpy as np
 import configparser
 import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pandas.api.types import union_categoricals
+from src.components.Snapshot_Cache import SnapshotCache
+from src.components.Dtype_Registry import apply_dtypes
+from src.components.Window_Aggregation import TrafficWindowAggregator, RouteWeatherAggregator
+from src.components.Weather_Cube import WeatherCube, WEATHER_FEATURES, observed_hour_range
+from src.components.Time_Kernels import explode_ranges, crosses_midnight, hhmm_to_timestamp, range_counts
 
 # Load configurations
 config = configparser.ConfigParser()
@@ -8,15 +17,29 @@ config.read('C:/Users/anucv/OneDrive/Desktop/AI and ML training/Machine_Learning
 
 # Fetching cleaned data path from config file
 cleaned_data_path = config['PATHS']['cleaned_data_path']
+snapshot_dir = config.get('pipeline', 'snapshot_dir', fallback='snapshots')
+# Weather for trip-hours without an observation: 'nan' (as a left merge), 'ffill' or 'bfill', within an optional hour limit
+weather_fill = config.get('preparation', 'weather_fill', fallback='nan')
+weather_fill_limit = config.getint('preparation', 'weather_fill_limit', fallback=0) or None
+# Processes preparing schedule shards (1 prepares everything in this process) and the key trips are sharded by
+preparation_workers = config.getint('preparation', 'workers', fallback=1)
+shard_by = config.get('preparation', 'shard_by', fallback='route_id')
+# Peak memory a window of trips may take in prepare_to_csv, on top of the loaded tables; 0 prepares all trips at once
+memory_budget_mb = config.getfloat('preparation', 'memory_budget_mb', fallback=0)
+
+# Peak memory of preparing a window over the size of its result: the exploded schedule, the weather
+# lookups and their concatenation, and a copy per merge are alive at once
+PEAK_FACTOR = 3
 
 class DataPreparation:
-    def __init__(self, traffic_df, schedule_df, weather_df, trucks_df, drivers_df, routes_df):
+    def __init__(self, traffic_df, schedule_df, weather_df, trucks_df, drivers_df, routes_df, routes_weather_df=None):
         self.traffic_df = traffic_df
         self.schedule_df = schedule_df
         self.weather_df = weather_df
         self.trucks_df = trucks_df
         self.drivers_df = drivers_df
         self.routes_df = routes_df
+        self.routes_weather_df = routes_weather_df
         
     def prepare_data(self):
         # Drop unnecessary columns and duplicates
@@ -27,61 +50,37 @@ class DataPreparation:
         self.drivers_df.drop_duplicates(subset=['driver_id'], inplace=True)
         self.routes_df.drop_duplicates(subset=['route_id', 'destination_id', 'origin_id'], inplace=True)
         
-        # Convert hour to datetime
-        self.weather_df['hour'] = self.weather_df['hour'].apply(lambda x: f"{int(x):04d}")
-        self.weather_df['custom_date'] = pd.to_datetime(self.weather_df['date'] + ' ' + self.weather_df['hour'])
+        # Convert HHMM hour to datetime
+        self.weather_df['custom_date'] = hhmm_to_timestamp(self.weather_df['date'], self.weather_df['hour'])
         
         # Merging and feature engineering
         self.schedule_df['estimated_arrival'] = pd.to_datetime(self.schedule_df['estimated_arrival']).dt.ceil("6H")
         self.schedule_df['departure_date'] = pd.to_datetime(self.schedule_df['departure_date']).dt.floor("6H")
         
-        # Create date ranges
-        self.schedule_df['date'] = self.schedule_df.apply(lambda row: pd.date_range(start=row['departure_date'], end=row['estimated_arrival'], freq='6H'), axis=1)
-        self.schedule_df = self.schedule_df.explode('date')
-        
-        # Merge with weather data
-        schedule_weather_df = pd.merge(self.schedule_df, self.weather_df, left_on=['route_id', 'date'], how='left')
-        
-        # Custom aggregation for scheduled weather
-        def custom_mode(x):
-            return x.mode().iloc[0] if not x.empty else None
-
-        schedule_weather_grp = schedule_weather_df.groupby(['truck_id', 'route_id'], as_index=False).agg(
-            route_avg_temp=('temp', 'mean'),
-            route_avg_wind_speed=('wind_speed', 'mean'),
-            route_avg_precip=('precip', 'mean'),
-            route_avg_humidity=('humidity', 'mean'),
-            route_avg_visibility=('visibility', 'mean'),
-            route_avg_pressure=('pressure', 'mean'),
-            route_description=('description', custom_mode)
-        )
-        
-        # Merging again
-        schedule_weather_merged = pd.merge(self.schedule_df, schedule_weather_grp, on=['truck_id', 'route_id'], how='left')
-        
-        # Merging with traffic data
-        hourly_exploded_schedule_df = schedule_weather_merged.assign(custom_date=[pd.date_range(start, end, freq='H') for start, end in zip(schedule_weather_merged['departure_date'], schedule_weather_merged['estimated_arrival'])]).explode('custom_date')
+        # Route weather means and mode over each trip's 6H steps, from cumulative sums and per-description
+        # counts instead of exploding trips into 6H dates, merging and a Python-level mode per group
+        if self.routes_weather_df is not None:
+            schedule_weather_grp = RouteWeatherAggregator(self.routes_weather_df).aggregate(self.schedule_df)
+            
+            # Merging again
+            schedule_weather_merged = pd.merge(self.schedule_df, schedule_weather_grp, on=['truck_id', 'route_id'], how='left')
+        else:
+            # City weather has no route_id, so without routes_weather there are no route weather features
+            print("⚠️ routes_weather_df not given; route weather features are left out")
+            schedule_weather_merged = self.schedule_df
         
-        scheduled_traffic = pd.merge(hourly_exploded_schedule_df, self.traffic_df, left_on=['route_id', 'custom_date'], how='left')
-        
-        # Custom aggregation for accidents
-        def custom_agg(values):
-            return 1 if any(values == 1) else 0
-        
-        scheduled_route_traffic = scheduled_traffic.groupby(['truck_id', 'route_id'], as_index=False).agg(
-            avg_no_of_vehicles=('no_of_vehicles', 'mean'),
-            accident=('accident', custom_agg)
-        )
+        # Traffic over each trip's hourly window, from prefix sums instead of an hourly explode and merge.
+        # The hourly explode ran on the schedule already exploded into 6H steps, so each trip's traffic
+        # hours weigh in the group mean once per 6H step of the trip
+        steps, _, _ = range_counts(schedule_weather_merged['departure_date'], schedule_weather_merged['estimated_arrival'], '6h')
+        scheduled_route_traffic = TrafficWindowAggregator(self.traffic_df).aggregate(schedule_weather_merged, weights=np.maximum(steps, 1))
         
         # Final merge
         final_merge = pd.merge(scheduled_route_traffic, self.trucks_df, on='truck_id', how='left')
         final_merge = pd.merge(final_merge, self.drivers_df, left_on='truck_id', right_on='vehicle_no', how='left')
         
         # Check for nighttime involvement
-        def has_midnight(start, end):
-            return int(start.date() != end.date())
-
-        final_merge['is_midnight'] = final_merge.apply(lambda row: has_midnight(row['departure_date'], row['estimated_arrival']), axis=1)
+        final_merge['is_midnight'] = crosses_midnight(final_merge['departure_date'], final_merge['estimated_arrival'])
 
         print("Final merged data shape:", final_merge.shape)
 
@@ -89,16 +88,23 @@ class DataPreparation:
 class DataPreparationComponent:
     def __init__(self):
         self.cleaned_data_path = cleaned_data_path
+        self.snapshot_cache = SnapshotCache(snapshot_dir)
+
+    def read_cleaned(self, file_name):
+        # Served from the snapshot written by stage_03 unless the CSV changed since
+        path = os.path.join(self.cleaned_data_path, file_name)
+        df = self.snapshot_cache.read_csv(path, lambda csv_path: apply_dtypes(pd.read_csv(csv_path), file_name, report=False))
+        return apply_dtypes(df, file_name)
 
     def fetch_data(self):
         # Fetching cleaned data
-        traffic_df = pd.read_csv(os.path.join(self.cleaned_data_path, 'cleaned_traffic.csv'))
-        truck_schedule_df = pd.read_csv(os.path.join(self.cleaned_data_path, 'cleaned_truck_schedule.csv'))
-        city_weather_df = pd.read_csv(os.path.join(self.cleaned_data_path, 'cleaned_city_weather.csv'))
-        trucks_df = pd.read_csv(os.path.join(self.cleaned_data_path, 'cleaned_trucks.csv'))
-        drivers_df = pd.read_csv(os.path.join(self.cleaned_data_path, 'cleaned_drivers.csv'))
-        routes_df = pd.read_csv(os.path.join(self.cleaned_data_path, 'cleaned_routes.csv'))
-        routes_weather_df = pd.read_csv(os.path.join(self.cleaned_data_path, 'cleaned_routes_weather.csv'))
+        traffic_df = self.read_cleaned('cleaned_traffic.csv')
+        truck_schedule_df = self.read_cleaned('cleaned_truck_schedule.csv')
+        city_weather_df = self.read_cleaned('cleaned_city_weather.csv')
+        trucks_df = self.read_cleaned('cleaned_trucks.csv')
+        drivers_df = self.read_cleaned('cleaned_drivers.csv')
+        routes_df = self.read_cleaned('cleaned_routes.csv')
+        routes_weather_df = self.read_cleaned('cleaned_routes_weather.csv')
 
         # Print shapes and datatypes
         print("Data Shapes and Data Types:")
@@ -120,7 +126,8 @@ class DataPreparationComponent:
             'routes_weather': routes_weather_df,
         }
 
-    def prepare_data(self):
+    def load_tables(self):
+        """Cleaned tables checked and converted for preparation, or None when a check fails."""
         data = self.fetch_data()
 
         # Merging and processing logic
@@ -149,13 +156,6 @@ class DataPreparationComponent:
         cleaned_truck_schedule_df['departure_date'] = cleaned_truck_schedule_df['departure_date'].dt.round('h')
         cleaned_truck_schedule_df['estimated_arrival'] = cleaned_truck_schedule_df['estimated_arrival'].dt.round('h')
 
-        # Create nearest hour schedule DataFrame
-        nearest_hour_schedule_df = cleaned_truck_schedule_df.assign(
-            custom_date=[pd.date_range(start, end, freq='h') for start, end in zip(
-                cleaned_truck_schedule_df['departure_date'], cleaned_truck_schedule_df['estimated_arrival']
-            )]
-        ).explode('custom_date', ignore_index=True)
-
         # Prepare weather data
         city_weather_df = cleaned_city_weather_df[['city_id', 'date_time', 'temp', 'wind_speed', 'description', 'precip', 'humidity', 'visibility', 'pressure']]
 
@@ -164,28 +164,184 @@ class DataPreparationComponent:
             print("Error: 'origin_id' or 'destination_id' not found in routes_df")
             return None
 
-        # Merge with origin and destination weather
-        origin_weather_merge = pd.merge(
-            nearest_hour_schedule_df,
-            city_weather_df,
-            left_on=['origin_id', 'custom_date'],
-            right_on=['city_id', 'date_time'],
-            how='left',
-            suffixes=('', '_origin')
-        )
-
-        destination_weather_merge = pd.merge(
-            origin_weather_merge,
-            city_weather_df,
-            left_on=['destination_id', 'custom_date'],
-            right_on=['city_id', 'date_time'],
-            how='left',
-            suffixes=('', '_destination')
-        )
+        # The schedule carries only route_id, so take each trip's origin and destination from routes
+        schedule_df = cleaned_truck_schedule_df
+        if 'origin_id' not in schedule_df.columns or 'destination_id' not in schedule_df.columns:
+            route_ends = cleaned_routes_df[['route_id', 'origin_id', 'destination_id']].drop_duplicates(subset=['route_id'])
+            schedule_df = pd.merge(schedule_df, route_ends, on='route_id', how='left')
+
+        # Every shard's weather cube spans the same hours as one built on all of city weather
+        hour_range = observed_hour_range(city_weather_df['date_time'])
+        return schedule_df, city_weather_df, hour_range
+
+    def prepare_data(self):
+        tables = self.load_tables()
+        if tables is None:
+            return None
+        prepared_data = self.prepare_window(*tables)
+
+        print("Data preparation completed successfully.")
+
+        return prepared_data.reset_index(drop=True)
+
+    def prepare_to_csv(self, output_path):
+        """Prepare the data and write it to output_path; returns the number of rows written, or None.
+
+        With [preparation] memory_budget_mb set, trips are prepared in windows of consecutive schedule
+        rows sized to the budget and each window is appended to the file before the next one is
+        exploded. Every trip's rows depend only on the trip and city weather, so the file is identical
+        to a single pass.
+        """
+        tables = self.load_tables()
+        if tables is None:
+            return None
+        schedule_df, city_weather_df, hour_range = tables
+
+        if not memory_budget_mb:
+            prepared_data = self.prepare_window(*tables).reset_index(drop=True)
+            prepared_data.to_csv(output_path, index=False)
+            print("Data preparation completed successfully.")
+            return len(prepared_data)
+
+        row_bytes = estimate_row_bytes(schedule_df)
+        windows = plan_windows(schedule_df, row_bytes, memory_budget_mb)
+
+        # Written to a temporary file and moved into place, so a failed run never leaves a partial output
+        tmp_path = output_path + '.tmp'
+        rows_written = 0
+        for number, (start, stop, estimated_rows) in enumerate(windows, start=1):
+            trips = schedule_df.iloc[start:stop]
+            print(f"Window {number}/{len(windows)}: trips {start} to {stop - 1}, "
+                  f"~{estimated_rows} rows (~{estimated_rows * row_bytes * PEAK_FACTOR / 1024 ** 2:.0f} MB peak)")
+            window_data = self.prepare_window(trips, city_weather_df, hour_range)
+            window_data.to_csv(tmp_path, index=False, mode='w' if number == 1 else 'a', header=number == 1)
+            rows_written += len(window_data)
+            del window_data
+        os.replace(tmp_path, output_path)
 
         print("Data preparation completed successfully.")
+        return rows_written
+
+    def prepare_window(self, schedule_df, city_weather_df, hour_range):
+        """Prepare a set of trips in this process, or sharded on a process pool when workers > 1."""
+        if preparation_workers > 1:
+            return self.prepare_sharded(schedule_df, city_weather_df, hour_range)
+        return prepare_partition(schedule_df, city_weather_df, hour_range)
+
+    def prepare_sharded(self, schedule_df, city_weather_df, hour_range):
+        """Prepare shards of the schedule on a process pool and restore the single-process row order.
+
+        Trips are sharded by route_id or by truck_id hash, so each shard needs the weather of only
+        the cities its routes run between.
+        """
+        shards = shard_tables(schedule_df, city_weather_df, preparation_workers, shard_by)
+        print(f"Preparing {len(schedule_df)} trips in {len(shards)} shards by {shard_by} on {preparation_workers} workers")
+        with ProcessPoolExecutor(max_workers=preparation_workers) as executor:
+            # map yields in submission order, and each shard is indexed by schedule row, so a stable
+            # sort on the index gives the same order whatever the number of workers
+            parts = list(executor.map(prepare_partition, *zip(*shards), repeat(hour_range)))
+
+        # Shards see different cities and descriptions, so give categorical columns the sorted union of
+        # their categories; otherwise concat falls back to plain strings
+        for col in parts[0].columns:
+            if any(isinstance(part[col].dtype, pd.CategoricalDtype) for part in parts):
+                categories = union_categoricals([part[col].astype('category') for part in parts], sort_categories=True).categories
+                for part in parts:
+                    part[col] = part[col].astype(pd.CategoricalDtype(categories))
+        return pd.concat(parts).sort_index(kind='stable')
+
+def shard_of(values, shards):
+    """Shard of each value from a stable 64-bit hash of its text, the same in every process and run.
+
+    Missing values go to shard 0.
+    """
+    codes, uniques = pd.factorize(pd.Series(values))
+    unique_shards = (pd.util.hash_array(pd.Index(uniques).astype(str).to_numpy(dtype=object)) % shards).astype('int64')
+    return np.where(codes >= 0, unique_shards[codes], 0)
+
+def key_codes(values, keys):
+    """Position of each value in keys, or -1; values are factorized first so only distinct ones are looked up."""
+    codes, uniques = pd.factorize(pd.Series(values))
+    known = keys.get_indexer(pd.Index(uniques).astype(object))
+    return np.where(codes >= 0, known[codes], -1)
+
+def estimate_row_bytes(schedule_df):
+    """Bytes of one prepared (trip, hour) row: its trip's columns and two weather lookups."""
+    schedule_bytes = schedule_df.memory_usage(deep=True, index=False).sum() / max(len(schedule_df), 1)
+    # Features as float64, date_time as datetime64 and city_id/description as (at most int16) category codes
+    lookup_bytes = len(WEATHER_FEATURES) * 8 + 8 + 4
+    # The exploded hour and the index holding each row's trip position
+    return schedule_bytes + 2 * lookup_bytes + 16
+
+def plan_windows(schedule_df, row_bytes, budget_mb):
+    """Windows of consecutive trips whose estimated peak memory fits the budget.
+
+    Returns (start, stop, estimated rows) per window, with start/stop positions in schedule_df. Rows
+    per trip are counted exactly as the hourly explode will produce them; a trip that alone exceeds
+    the budget becomes one window and is reported.
+    """
+    counts, _, _ = range_counts(schedule_df['departure_date'], schedule_df['estimated_arrival'], 'h')
+    trip_rows = np.maximum(counts, 1)
+    budget_rows = max(int(budget_mb * 1024 ** 2 / (row_bytes * PEAK_FACTOR)), 1)
+    print(f"Planning {trip_rows.sum()} prepared rows from {len(schedule_df)} trips at ~{row_bytes:.0f} bytes per row "
+          f"within {budget_mb:.0f} MB (~{budget_rows} rows per window)")
+
+    # A window closes before the trip that would take its cumulative rows past the next multiple of the budget
+    cumulative = np.cumsum(trip_rows)
+    windows, start = [], 0
+    while start < len(schedule_df):
+        done = cumulative[start - 1] if start else 0
+        stop = max(int(np.searchsorted(cumulative, done + budget_rows, side='right')), start + 1)
+        if stop == start + 1 and trip_rows[start] > budget_rows:
+            print(f"Trip {start} needs {trip_rows[start]} rows, over the budget; it is prepared as one window")
+        windows.append((start, stop, int(cumulative[stop - 1] - done)))
+        start = stop
+    return windows
+
+def shard_tables(schedule_df, city_weather_df, shards, shard_by='route_id'):
+    """Split the schedule into shards, each with the city weather of only its origin and destination
+    cities, over all hours so fill policies see the same history."""
+    if shard_by not in ('route_id', 'truck_id'):
+        raise ValueError(f"Unknown shard key: {shard_by}")
+    schedule_shards = shard_of(schedule_df[shard_by], shards)
+
+    # Integer codes of every trip's and weather row's city, so each shard's rows are one boolean gather
+    cities = pd.Index(pd.unique(pd.concat([schedule_df['origin_id'], schedule_df['destination_id']]).astype(object).dropna()))
+    trip_cities = np.concatenate([key_codes(schedule_df['origin_id'], cities), key_codes(schedule_df['destination_id'], cities)])
+    weather_cities = key_codes(city_weather_df['city_id'], cities)
+
+    tables = []
+    for shard in range(shards):
+        in_shard = schedule_shards == shard
+        if not in_shard.any():
+            continue
+        # One slot past the last key, so rows with code -1 (cities no trip uses) always read False
+        needed_cities = np.zeros(len(cities) + 1, dtype=bool)
+        needed_cities[trip_cities[np.concatenate([in_shard, in_shard])]] = True
+        tables.append((schedule_df[in_shard], city_weather_df[needed_cities[weather_cities]]))
+    return tables
+
+def prepare_partition(schedule_df, city_weather_df, hour_range=None):
+    """Hourly trip rows with origin and destination weather for a set of trips.
+
+    Module level so a process pool can pickle it. Rows are indexed by their trip's row in schedule_df.
+    """
+    # Create nearest hour schedule DataFrame
+    nearest_hour_schedule_df = explode_ranges(schedule_df, 'departure_date', 'estimated_arrival', 'custom_date', freq='h')
+    schedule_rows = nearest_hour_schedule_df.index
+    nearest_hour_schedule_df = nearest_hour_schedule_df.reset_index(drop=True)
 
-        return destination_weather_merge
+    # Origin and destination weather by gathering from a dense city x hour cube instead of two merges;
+    # columns keep the names the merges gave them (origin unsuffixed, destination with '_destination')
+    weather_cube = WeatherCube(city_weather_df, fill=weather_fill, fill_limit=weather_fill_limit, hour_range=hour_range)
+    origin_weather = weather_cube.lookup(nearest_hour_schedule_df['origin_id'], nearest_hour_schedule_df['custom_date'])
+    destination_weather = weather_cube.lookup(nearest_hour_schedule_df['destination_id'], nearest_hour_schedule_df['custom_date'])
+    destination_weather_merge = pd.concat(
+        [nearest_hour_schedule_df, origin_weather, destination_weather.add_suffix('_destination')],
+        axis=1
+    )
+    destination_weather_merge.index = schedule_rows
+    return destination_weather_merge
 
 # Usage example
 if __name__ == '__main__':
@@ -0,0 +1,186 @@
+import re
+import hashlib
+import pandas as pd
+
+# INSERT INTO [schema.]table [(col, ...)] VALUES ...
+INSERT_PATTERN = re.compile(r"INSERT\s+INTO\s+([`\"\w.]+)\s*(?:\(([^)]*)\))?\s*VALUES\s*", re.IGNORECASE)
+# COPY [schema.]table (col, ...) FROM stdin;
+COPY_PATTERN = re.compile(r"COPY\s+([`\"\w.]+)\s*\(([^)]*)\)\s+FROM\s+stdin;", re.IGNORECASE)
+CREATE_PATTERN = re.compile(r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?([`\"\w.]+)\s*\(", re.IGNORECASE)
+COLUMN_PATTERN = re.compile(r"^\s*[`\"]?(\w+)[`\"]?\s+\w+")
+
+# Value tokens of a VALUES list; MySQL escapes quotes with backslashes, Postgres doubles them
+MYSQL_TOKENS = re.compile(r"'((?:[^'\\]|\\.|'')*)'|(NULL)\b|([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)|(\()|(\))", re.IGNORECASE)
+POSTGRES_TOKENS = re.compile(r"'((?:[^']|'')*)'|(NULL)\b|([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)|(\()|(\))", re.IGNORECASE)
+MYSQL_ESCAPES = {'0': '\0', 'n': '\n', 'r': '\r', 't': '\t', 'Z': '\x1a'}
+
+class DatabaseRestore:
+    """Parse the Data/Database_backup SQL dumps and bulk-load their rows per table."""
+
+    def __init__(self, dump_path):
+        self.dump_path = dump_path
+        self.dialect = 'mysql' if 'mysql' in dump_path.lower() else 'postgres'
+        self.tokens = MYSQL_TOKENS if self.dialect == 'mysql' else POSTGRES_TOKENS
+
+    def clean_name(self, name):
+        """Strip quoting and any schema prefix from a table or column name."""
+        return name.strip().strip('`"').split('.')[-1].strip('`"').lower()
+
+    def unescape(self, text):
+        text = text.replace("''", "'")
+        if self.dialect == 'mysql':
+            text = re.sub(r"\\(.)", lambda m: MYSQL_ESCAPES.get(m.group(1), m.group(1)), text)
+        return text
+
+    def parse_number(self, text):
+        try:
+            return int(text)
+        except ValueError:
+            return float(text)
+
+    def parse_values(self, values_sql):
+        """Turn the VALUES part of an INSERT into a list of row tuples."""
+        rows, row = [], None
+        for match in self.tokens.finditer(values_sql):
+            string, null, number, open_paren, close_paren = match.groups()
+            if open_paren:
+                row = []
+            elif close_paren:
+                rows.append(tuple(row))
+                row = None
+            elif row is None:
+                continue
+            elif string is not None:
+                row.append(self.unescape(string))
+            elif null:
+                row.append(None)
+            else:
+                row.append(self.parse_number(number))
+        return rows
+
+    def statement_complete(self, statement):
+        """A statement ends with ';' outside of any quoted string."""
+        if not statement.rstrip().endswith(';'):
+            return False
+        if self.dialect == 'mysql':
+            statement = statement.replace('\\\\', '').replace("\\'", '')
+        return statement.count("'") % 2 == 0
+
+    def iter_statements(self, f):
+        """Yield complete SQL statements, plus the data lines of each COPY block."""
+        statement = ''
+        for line in f:
+            if not statement and (not line.strip() or line.startswith('--') or line.startswith('/*')):
+                continue
+            statement += line
+            copy_match = COPY_PATTERN.match(statement.strip())
+            if copy_match:
+                data_lines = []
+                for data_line in f:
+                    if data_line.rstrip('\n') == '\\.':
+                        break
+                    data_lines.append(data_line)
+                yield statement, data_lines
+                statement = ''
+            elif self.statement_complete(statement):
+                yield statement, None
+                statement = ''
+
+    def parse_dump(self):
+        """Collect the columns and rows of every table in the dump."""
+        tables = {}
+        with open(self.dump_path, 'r', encoding='utf-8') as f:
+            for statement, data_lines in self.iter_statements(f):
+                text = statement.strip()
+
+                create_match = CREATE_PATTERN.match(text)
+                if create_match:
+                    columns = [
+                        COLUMN_PATTERN.match(line).group(1).lower()
+                        for line in text[create_match.end():].split('\n')
+                        if COLUMN_PATTERN.match(line) and not re.match(r"\s*(PRIMARY|KEY|UNIQUE|CONSTRAINT|INDEX|FOREIGN)\b", line, re.IGNORECASE)
+                    ]
+                    tables.setdefault(self.clean_name(create_match.group(1)), {'columns': columns, 'rows': []})
+                    continue
+
+                copy_match = COPY_PATTERN.match(text)
+                if copy_match:
+                    table = tables.setdefault(self.clean_name(copy_match.group(1)), {'columns': [], 'rows': []})
+                    table['columns'] = [self.clean_name(col) for col in copy_match.group(2).split(',')]
+                    table['rows'].extend(
+                        tuple(None if value == '\\N' else value for value in line.rstrip('\n').split('\t'))
+                        for line in data_lines
+                    )
+                    continue
+
+                insert_match = INSERT_PATTERN.match(text)
+                if insert_match:
+                    table = tables.setdefault(self.clean_name(insert_match.group(1)), {'columns': [], 'rows': []})
+                    if insert_match.group(2):
+                        table['columns'] = [self.clean_name(col) for col in insert_match.group(2).split(',')]
+                    table['rows'].extend(self.parse_values(text[insert_match.end():]))
+
+        return {name: table for name, table in tables.items() if table['rows']}
+
+    def to_dataframes(self):
+        """Parse the dump into one DataFrame per table."""
+        frames = {}
+        for table_name, table in self.parse_dump().items():
+            df = pd.DataFrame.from_records(table['rows'], columns=table['columns'] or None)
+            # COPY blocks carry text; infer numbers the same way a CSV load does
+            for col in df.columns:
+                if pd.api.types.is_object_dtype(df[col]) or pd.api.types.is_string_dtype(df[col]):
+                    try:
+                        df[col] = pd.to_numeric(df[col])
+                    except (ValueError, TypeError):
+                        pass
+            frames[table_name] = df
+            print(f"Parsed {len(df)} rows for {table_name} from {self.dump_path}")
+        return frames
+
+    def dump_sha256(self):
+        digest = hashlib.sha256()
+        with open(self.dump_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def restore_table_postgres(self, ingestion, table_name, df):
+        """Recreate one table from the dump rows with COPY, keeping the dumped ids."""
+        with ingestion.connection_pool.connection() as conn:
+            with conn.cursor() as cur:
+                ingestion.create_table(df.drop(columns=['id'], errors='ignore'), table_name, cur)
+                ingestion.empty_table(table_name, cur)
+                ingestion.drop_indexes(table_name, cur)
+                ingestion.load_data(df, table_name, cur)
+                ingestion.create_indexes(table_name, cur)
+                if 'id' in df.columns:
+                    # Keep the serial sequence ahead of the restored ids
+                    cur.execute(f"SELECT setval(pg_get_serial_sequence('{table_name}', 'id'), COALESCE(MAX(id), 1)) FROM {table_name};")
+                return ingestion.count_rows(table_name, cur)
+
+    def restore_to_postgres(self, ingestion):
+        """Load every dumped table into Postgres in parallel, one transaction per table, and record
+        each committed table in the ingestion manifest so snapshots of the old rows go stale."""
+        frames = self.to_dataframes()
+        dump_sha256 = self.dump_sha256()
+
+        def restore(table_name):
+            row_count = self.restore_table_postgres(ingestion, table_name, frames[table_name])
+            ingestion.manifest.record_restore(table_name, self.dump_path, dump_sha256, row_count)
+            return row_count
+
+        try:
+            return ingestion.connection_pool.run_per_table(frames, restore)
+        finally:
+            ingestion.manifest.save()
+
+    def restore_to_snapshots(self, snapshot_cache):
+        """Write every dumped table as a local snapshot and record the restore in the manifest,
+        so later stages read the snapshots without a database."""
+        dump_sha256 = self.dump_sha256()
+        for table_name, df in self.to_dataframes().items():
+            snapshot_cache.manifest.record_restore(table_name, self.dump_path, dump_sha256, len(df))
+            snapshot_cache.save(snapshot_cache.snapshot_name(table_name), df, snapshot_cache.manifest_version(table_name))
+            print(f"Restored {table_name} to snapshot ({len(df)} rows)")
+        snapshot_cache.manifest.save()
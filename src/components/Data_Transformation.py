@@ -1,11 +1,20 @@
 import os
 import pandas as pd
-from sklearn.preprocessing import LabelEncoder, OneHotEncoder, StandardScaler
+from src.components.Preprocessing_Artifact import PreprocessingArtifact
+from src.components.Feature_Storage import FeatureStorage
+
+SUBSETS = ['train_data', 'validation_data', 'test_data']
 
 class DataTransformation:
-    def __init__(self, output_path):
-        # The path to save the output CSV
+    def __init__(self, output_path, artifact_path=None, sparse=False):
+        # The path to save the transformed subsets, as memory-mappable arrays
         self.output_path = output_path
+        self.storage = FeatureStorage(output_path)
+        # Write CSR feature matrices instead of dense ones, for one-hot ids with thousands of values
+        self.sparse = sparse
+        # The fitted preprocessing artifact is saved here and shared with training and serving
+        self.artifact_path = artifact_path or os.path.join(output_path, 'preprocessing_artifact.joblib')
+        self.artifact = None
 
         # Create the output directory if it does not exist
         os.makedirs(self.output_path, exist_ok=True)
@@ -27,26 +36,9 @@ class DataTransformation:
             'load_capacity_pounds', 'mileage_mpg', 'age', 'experience', 
             'average_speed_mph'
         ]
+        self.date_columns = ['departure_date']
         self.target_column = 'delay'
 
-    def handle_missing_values(self, df):
-        """Handles missing values in the DataFrame."""
-        print("🧹 Handling missing values...")
-
-        # Fill missing numerical values with the median and categorical with mode
-        for col in self.numerical_columns:
-            if col in df.columns:
-                df[col] = df[col].fillna(df[col].median())
-        
-        for col in self.categorical_columns:
-            if col in df.columns:
-                # Check if mode is not empty before using it
-                if df[col].mode().size > 0:
-                    df[col] = df[col].fillna(df[col].mode()[0])
-
-        print("✅ Missing values handled.")
-        return df
-
     def convert_dates(self, df):
         """Convert 'estimated_arrival' to datetime format."""
         print("🔄 Converting 'estimated_arrival' to datetime...")
@@ -57,15 +49,22 @@ class DataTransformation:
             print("⚠️ 'estimated_arrival' column not found.")
         return df
 
+    def subset_masks(self, df):
+        """Boolean masks of the train, validation and test rows of df, by 'estimated_arrival' date."""
+        arrival = pd.to_datetime(df['estimated_arrival'], errors='coerce')
+        return {
+            'train_data': arrival <= pd.to_datetime('2019-01-30'),
+            'validation_data': (arrival > pd.to_datetime('2019-01-30')) & (arrival <= pd.to_datetime('2019-02-07')),
+            'test_data': arrival > pd.to_datetime('2019-02-07'),
+        }
+
     def split_data_by_date(self, df):
         """Split data into training, validation, and test sets based on date."""
         print("🔄 Splitting data into train, validation, and test sets by date...")
 
         # Split based on 'estimated_arrival' date
-        train_df = df[df['estimated_arrival'] <= pd.to_datetime('2019-01-30')]
-        validation_df = df[(df['estimated_arrival'] > pd.to_datetime('2019-01-30')) & 
-                           (df['estimated_arrival'] <= pd.to_datetime('2019-02-07'))]
-        test_df = df[df['estimated_arrival'] > pd.to_datetime('2019-02-07')]
+        masks = self.subset_masks(df)
+        train_df, validation_df, test_df = df[masks['train_data']], df[masks['validation_data']], df[masks['test_data']]
 
         print(f"✅ Train set shape: {train_df.shape}")
         print(f"✅ Validation set shape: {validation_df.shape}")
@@ -73,32 +72,6 @@ class DataTransformation:
 
         return train_df, validation_df, test_df
 
-    def encode_categorical_variables(self, df):
-        """Perform label encoding for categorical variables."""
-        label_encoder = LabelEncoder()
-        for col in self.categorical_columns:
-            if col in df.columns:
-                df[col] = label_encoder.fit_transform(df[col].astype(str))
-            else:
-                print(f"Column {col} not found in DataFrame for encoding")
-        return df
-
-    def onehot_encode(self, df):
-        """Perform one-hot encoding for specified columns."""
-        onehot_encoder = OneHotEncoder(handle_unknown='ignore', sparse_output=False)
-        encoded_features = onehot_encoder.fit_transform(df[self.categorical_columns])
-        encoded_feature_names = onehot_encoder.get_feature_names_out(self.categorical_columns)
-        df_encoded = pd.DataFrame(encoded_features, columns=encoded_feature_names, index=df.index)
-        df = pd.concat([df, df_encoded], axis=1)
-        df = df.drop(self.categorical_columns, axis=1)  # Drop original categorical columns
-        return df
-
-    def scale_numerical_features(self, df):
-        """Scale numerical features using StandardScaler."""
-        scaler = StandardScaler()
-        df[self.numerical_columns] = scaler.fit_transform(df[self.numerical_columns])
-        return df
-
     def transform_data(self, df):
         """Main transformation function for the data."""
         print("🛠 Starting data transformation process...")
@@ -106,9 +79,6 @@ class DataTransformation:
         # Convert date column
         df = self.convert_dates(df)
 
-        # Handle missing values (if applicable)
-        df = self.handle_missing_values(df)
-
         # Split data into train, validation, and test sets by date
         train_df, validation_df, test_df = self.split_data_by_date(df)
 
@@ -117,34 +87,59 @@ class DataTransformation:
         X_valid, y_valid = validation_df.drop(self.target_column, axis=1), validation_df[self.target_column]
         X_test, y_test = test_df.drop(self.target_column, axis=1), test_df[self.target_column]
 
-        # Process each dataset
-        for subset, name in zip([X_train, X_valid, X_test], ['train_data', 'validation_data', 'test_data']):
-            # Encode categorical variables
-            subset = self.encode_categorical_variables(subset)
-
-            # One-hot encode specific columns
-            subset = self.onehot_encode(subset)
+        # Fit imputation, encoding and scaling once on train; every subset only calls transform
+        self.artifact = PreprocessingArtifact(self.categorical_columns, self.numerical_columns, self.date_columns).fit(X_train)
+        self.artifact.save(self.artifact_path)
 
-            # Scale numerical columns
-            subset = self.scale_numerical_features(subset)
+        for subset, target, name in zip([X_train, X_valid, X_test], [y_train, y_valid, y_test], SUBSETS):
+            features = self.artifact.transform_sparse(subset) if self.sparse else self.artifact.transform(subset)
 
-            # Save the transformed subset to CSV
-            self.save_to_csv(subset, name)
+            # Save the transformed subset for training to open memory-mapped
+            self.storage.write(name, features, target, self.artifact.feature_names, self.target_column,
+                               artifact_layout_hash=self.artifact.layout_hash())
 
         print("✅ Data transformation complete!")
         return (X_train, y_train), (X_valid, y_valid), (X_test, y_test)
 
-    def save_to_csv(self, df, name):
-        """Save the transformed data to CSV."""
-        output_file = os.path.join(self.output_path, f"{name}.csv")
-        
-        # Remove existing file if it exists
-        if os.path.exists(output_file):
-            os.remove(output_file)
-        
-        # Save the DataFrame to CSV
-        df.to_csv(output_file, index=False)
-        print(f"✅ Transformed data saved to {output_file}")
+    def transform_data_chunked(self, iter_chunks, epsilon=0.001):
+        """Transform a frame too large for memory in two passes over its chunks; returns rows per subset.
+
+        iter_chunks is called once per pass and must yield the same rows both times. Pass one fits the
+        artifact on the training rows with partial_fit (medians sketched within epsilon in rank); pass two
+        transforms every chunk and appends it to its subset in the feature storage.
+        """
+        print("🛠 Starting chunked data transformation process...")
+        self.artifact = PreprocessingArtifact(self.categorical_columns, self.numerical_columns, self.date_columns)
+
+        rows = dict.fromkeys(SUBSETS, 0)
+        for chunk in iter_chunks():
+            masks = self.subset_masks(chunk)
+            for name in SUBSETS:
+                rows[name] += int(masks[name].sum())
+            self.artifact.partial_fit(chunk.loc[masks['train_data']].drop(columns=self.target_column), epsilon)
+        print(f"✅ Subset rows: {rows}")
+
+        self.artifact.finish_fit()
+        self.artifact.save(self.artifact_path)
+
+        writers = {
+            name: self.storage.writer(name, rows[name], self.artifact.feature_names, self.sparse, self.target_column,
+                                      artifact_layout_hash=self.artifact.layout_hash())
+            for name in SUBSETS
+        }
+        for chunk in iter_chunks():
+            masks = self.subset_masks(chunk)
+            for name in SUBSETS:
+                subset = chunk.loc[masks[name]]
+                if len(subset) == 0:
+                    continue
+                features = self.artifact.transform_sparse(subset) if self.sparse else self.artifact.transform(subset)
+                writers[name].append(features, subset[self.target_column])
+        for writer in writers.values():
+            writer.close()
+
+        print("✅ Chunked data transformation complete!")
+        return rows
 
 # Example usage:
 # output_path = "C:/Users/anucv/OneDrive/Desktop/AI and ML training/Machine_Learning/TRUCK_DELAY_CLASSIFICATION_PROJECT/Data/Output/transformed_data"
@@ -0,0 +1,90 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+# Business keys that identify a row of each table, as used by DataPreparation.prepare_data
+DEDUP_KEYS = {
+    'city_weather': ['city_id', 'date', 'hour'],
+    'routes_weather': ['route_id', 'date'],
+    'traffic': ['route_id', 'date', 'hour'],
+    'truck_schedule': ['truck_id', 'route_id', 'departure_date'],
+    'trucks': ['truck_id'],
+    'drivers': ['driver_id'],
+    'routes': ['route_id', 'destination_id', 'origin_id'],
+}
+
+def row_hashes(df, columns=None):
+    """64-bit hash per row of the given columns (all columns by default).
+
+    Values that compare equal hash equally: integers are widened, since their downcast width
+    can differ between loads, and -0.0 is folded into 0.0.
+    """
+    df = df[list(columns)] if columns else df
+    df = df.astype({
+        col: 'Int64' if isinstance(dtype, pd.api.extensions.ExtensionDtype) else 'int64'
+        for col, dtype in df.dtypes.items() if pd.api.types.is_integer_dtype(dtype)
+    })
+    for col, dtype in df.dtypes.items():
+        if pd.api.types.is_float_dtype(dtype):
+            df[col] = df[col] + 0.0
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+class DedupIndex:
+    """Sorted uint64 array of the row or key hashes seen so far, optionally persisted as .npy.
+
+    Without an index_path the index lives in memory only. 'state' is a small JSON dict saved
+    with the index, for callers that need a watermark or similar next to the seen keys.
+    """
+
+    def __init__(self, index_path=None, key_columns=None):
+        self.index_path = index_path
+        self.key_columns = list(key_columns) if key_columns else None
+        self.hashes = np.empty(0, dtype='uint64')
+        self.state = {}
+        if index_path and os.path.exists(index_path + '.npy') and os.path.exists(index_path + '.json'):
+            with open(index_path + '.json', 'r') as f:
+                meta = json.load(f)
+            # An index built on other key columns cannot answer for these ones
+            if meta.get('key_columns') == self.key_columns:
+                self.hashes = np.load(index_path + '.npy')
+                self.state = meta.get('state', {})
+            else:
+                print(f"Ignoring dedup index {index_path}: built on {meta.get('key_columns')}, not {self.key_columns}")
+
+    def __len__(self):
+        return self.hashes.size
+
+    def contains(self, hashes):
+        """Boolean mask of the hashes already in the index."""
+        if self.hashes.size == 0:
+            return np.zeros(len(hashes), dtype=bool)
+        positions = np.minimum(np.searchsorted(self.hashes, hashes), self.hashes.size - 1)
+        return self.hashes[positions] == hashes
+
+    def add(self, hashes):
+        self.hashes = np.union1d(self.hashes, hashes).astype('uint64')
+
+    def new_rows(self, df):
+        """Mask of the rows of df seen neither earlier in df nor in the index, with their hashes."""
+        hashes = row_hashes(df, self.key_columns)
+        mask = ~pd.Series(hashes).duplicated().to_numpy() & ~self.contains(hashes)
+        return mask, hashes
+
+    def drop_duplicates(self, df):
+        """Return the new rows of df and record their keys in the index."""
+        mask, hashes = self.new_rows(df)
+        self.add(hashes[mask])
+        return df[mask]
+
+    def save(self):
+        """Write the index, then its metadata, so a crash never pairs new hashes with old state."""
+        if not self.index_path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.index_path)), exist_ok=True)
+        # np.save appends .npy to names without it, so the temporary name keeps the suffix
+        np.save(self.index_path + '.tmp.npy', self.hashes)
+        os.replace(self.index_path + '.tmp.npy', self.index_path + '.npy')
+        with open(self.index_path + '.json.tmp', 'w') as f:
+            json.dump({'key_columns': self.key_columns, 'count': int(self.hashes.size), 'state': self.state}, f, indent=2)
+        os.replace(self.index_path + '.json.tmp', self.index_path + '.json')
@@ -0,0 +1,116 @@
+import os
+import pandas as pd
+
+# Compact in-memory dtypes per table, keyed by the short names the stages use ('cleaned_' prefixes,
+# '_table' suffixes and file extensions are stripped by registry_name). 'category' columns are
+# low-cardinality text, 'int' columns are downcast to the narrowest integer width that holds them,
+# 'float' columns are stored as float32 when float32 is requested, and 'datetime' columns are parsed.
+# Columns that are not listed keep the dtype they were loaded with.
+DTYPE_REGISTRY = {
+    'city_weather': {
+        'category': ['city_id', 'description'],
+        'int': ['hour', 'temp', 'wind_speed', 'humidity', 'visibility', 'pressure',
+                'chanceofrain', 'chanceoffog', 'chanceofsnow', 'chanceofthunder', 'id', 'index'],
+        'float': ['precip'],
+        'datetime': ['date', 'date_time', 'event_date'],
+    },
+    'drivers': {
+        'category': ['driver_id', 'gender', 'driving_style'],
+        'int': ['age', 'experience', 'ratings', 'vehicle_no', 'id', 'index'],
+        'float': ['average_speed_mph'],
+        'datetime': ['event_date'],
+    },
+    'routes': {
+        'category': ['route_id', 'origin_id', 'destination_id'],
+        'int': ['id', 'index'],
+        'float': ['distance', 'average_hours'],
+        'datetime': ['event_date'],
+    },
+    'routes_weather': {
+        'category': ['route_id', 'description'],
+        'int': ['temp', 'wind_speed', 'humidity', 'visibility', 'pressure',
+                'chanceofrain', 'chanceoffog', 'chanceofsnow', 'chanceofthunder', 'id', 'index'],
+        'float': ['precip'],
+        'datetime': ['date', 'event_date'],
+    },
+    'traffic': {
+        'category': ['route_id'],
+        'int': ['hour', 'accident', 'id', 'index'],
+        'float': ['no_of_vehicles'],
+        'datetime': ['date', 'date_time', 'event_date'],
+    },
+    'trucks': {
+        'category': ['fuel_type'],
+        'int': ['truck_id', 'truck_age', 'mileage_mpg', 'id', 'index'],
+        'float': ['load_capacity_pounds'],
+        'datetime': ['event_date'],
+    },
+    'truck_schedule': {
+        'category': ['route_id', 'origin_id', 'destination_id'],
+        'int': ['truck_id', 'delay', 'id', 'index'],
+        'float': [],
+        'datetime': ['departure_date', 'estimated_arrival', 'event_date'],
+    },
+    'final_merge': {
+        'category': ['route_id', 'origin_id', 'destination_id', 'driver_id', 'route_description',
+                     'origin_description', 'destination_description', 'description', 'fuel_type',
+                     'driving_style', 'gender'],
+        'int': ['truck_id', 'delay', 'accident', 'is_midnight', 'truck_age', 'mileage_mpg', 'age',
+                'experience', 'ratings', 'vehicle_no', 'hour', 'id', 'index'],
+        'float': ['route_avg_temp', 'route_avg_wind_speed', 'route_avg_precip', 'route_avg_humidity',
+                  'route_avg_visibility', 'route_avg_pressure', 'distance', 'average_hours',
+                  'origin_temp', 'origin_wind_speed', 'origin_precip', 'origin_humidity',
+                  'origin_visibility', 'origin_pressure', 'destination_temp', 'destination_wind_speed',
+                  'destination_precip', 'destination_humidity', 'destination_visibility',
+                  'destination_pressure', 'avg_no_of_vehicles', 'load_capacity_pounds', 'average_speed_mph'],
+        'datetime': ['departure_date', 'estimated_arrival', 'date', 'date_time', 'custom_date', 'event_date'],
+    },
+}
+
+def registry_name(name):
+    """Map a table, file or DataFrame name to its registry key, e.g. 'cleaned_traffic.csv' -> 'traffic'."""
+    name = os.path.splitext(os.path.basename(name))[0].lower()
+    if name.startswith('cleaned_'):
+        name = name[len('cleaned_'):]
+    if name.endswith('_table'):
+        name = name[:-len('_table')]
+    if name in ('final_merged', 'final_prepared_data'):
+        name = 'final_merge'
+    return name
+
+def downcast_integer(series):
+    """Narrowest integer dtype for the column; nullable when it has missing values."""
+    if series.isna().any():
+        if not pd.api.types.is_integer_dtype(series) and not (series.dropna() % 1 == 0).all():
+            return series
+        series = series.astype('Int64')
+    return pd.to_numeric(series, downcast='integer')
+
+def apply_dtypes(df, name, float32=False, report=True):
+    """Convert the registered columns of df in place to their compact dtypes and return df."""
+    spec = DTYPE_REGISTRY.get(registry_name(name))
+    if spec is None:
+        return df
+    before = df.memory_usage(deep=True).sum()
+
+    for col in spec['category']:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    for col in spec['int']:
+        if col in df.columns and pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = downcast_integer(df[col])
+    for col in spec['float']:
+        if col in df.columns and float32 and pd.api.types.is_float_dtype(df[col]):
+            # float64 -> float32 halves float memory but is lossy, so it is opt-in
+            df[col] = df[col].astype('float32')
+    for col in spec['datetime']:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            try:
+                df[col] = pd.to_datetime(df[col])
+            except (ValueError, TypeError) as e:
+                print(f"Kept {col} of {name} as {df[col].dtype}: {e}")
+
+    if report:
+        after = df.memory_usage(deep=True).sum()
+        print(f"Compact dtypes for {name}: {before / 1024 ** 2:.1f} MB -> {after / 1024 ** 2:.1f} MB ({before / max(after, 1):.1f}x smaller)")
+    return df
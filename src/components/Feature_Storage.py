@@ -0,0 +1,171 @@
+import os
+import json
+import shutil
+import numpy as np
+import scipy.sparse as sp
+
+# Bumped whenever the on-disk layout changes
+STORAGE_VERSION = 1
+MANIFEST = 'manifest.json'
+SPARSE_PARTS = ['data', 'indices', 'indptr']
+
+class FeatureStorage:
+    """Transformed subsets as raw .npy arrays that training opens memory-mapped, without parsing.
+
+    Each subset is a directory under root holding target.npy, either features.npy (dense) or
+    data.npy/indices.npy/indptr.npy (CSR), and a JSON manifest with the shape, dtype, column names and
+    non-zero count. A subset is written to a temporary directory and moved into place, so readers never
+    see a half-written one.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def writer(self, name, rows, feature_names, sparse=False, target_column='target', **metadata):
+        """FeatureWriter for a subset of a known number of rows, filled chunk by chunk."""
+        return FeatureWriter(self, name, rows, feature_names, sparse, target_column, **metadata)
+
+    def write(self, name, features, target, feature_names, target_column='target', **metadata):
+        """Write one subset; features is a dense array/DataFrame or a scipy sparse matrix."""
+        writer = self.writer(name, features.shape[0], feature_names, sp.issparse(features), target_column, **metadata)
+        writer.append(features, target)
+        return writer.close()
+
+    def manifest(self, name):
+        with open(os.path.join(self.path(name), MANIFEST), 'r') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != STORAGE_VERSION:
+            raise ValueError(f"{self.path(name)} is feature storage version {manifest.get('version')}, expected {STORAGE_VERSION}")
+        return manifest
+
+    def open(self, name, mmap_mode='r'):
+        """(features, target, manifest) of a subset; arrays are memory-mapped, sparse parts included."""
+        manifest = self.manifest(name)
+        directory = self.path(name)
+        target = np.load(os.path.join(directory, 'target.npy'), mmap_mode=mmap_mode, allow_pickle=False)
+        if manifest['kind'] == 'sparse':
+            parts = [np.load(os.path.join(directory, f'{part}.npy'), mmap_mode=mmap_mode) for part in SPARSE_PARTS]
+            features = sp.csr_matrix(tuple(parts), shape=tuple(manifest['shape']), copy=False)
+        else:
+            features = np.load(os.path.join(directory, 'features.npy'), mmap_mode=mmap_mode)
+        return features, target, manifest
+
+class FeatureWriter:
+    """Streams the chunks of one subset into its pre-sized arrays.
+
+    Dense features and the CSR row pointers are memmaps sized from the row count up front. CSR values
+    and column indices, whose count is only known at the end, are appended to raw files and turned
+    into .npy by close. Index arrays are int32 when they fit, as scipy would otherwise copy them down
+    to int32 when the matrix is opened.
+    """
+
+    def __init__(self, storage, name, rows, feature_names, sparse=False, target_column='target', **metadata):
+        self.storage = storage
+        self.name = name
+        self.rows = int(rows)
+        self.feature_names = list(feature_names)
+        self.sparse = sparse
+        self.target_column = target_column
+        self.metadata = metadata
+        self.position = 0
+        self.nnz = 0
+        self.target = None
+
+        self.tmp_dir = storage.path(name) + '.tmp'
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        os.makedirs(self.tmp_dir)
+        shape = (self.rows, len(self.feature_names))
+        if sparse:
+            self.indptr = np.lib.format.open_memmap(self.file('indptr.raw.npy'), mode='w+', dtype='int64', shape=(self.rows + 1,))
+            self.indptr[0] = 0
+            self.data_file = open(self.file('data.bin'), 'wb')
+            self.indices_file = open(self.file('indices.bin'), 'wb')
+        else:
+            self.features = np.lib.format.open_memmap(self.file('features.npy'), mode='w+', dtype='float64', shape=shape)
+
+    def file(self, name):
+        return os.path.join(self.tmp_dir, name)
+
+    def append(self, features, target):
+        """Write the next chunk of rows and their targets."""
+        rows = features.shape[0]
+        if self.position + rows > self.rows:
+            raise ValueError(f"{self.name}: {self.position + rows} rows written, {self.rows} expected")
+        stop = self.position + rows
+
+        if self.sparse:
+            features = sp.csr_matrix(features)
+            self.data_file.write(np.ascontiguousarray(features.data, dtype='float64').tobytes())
+            self.indices_file.write(np.ascontiguousarray(features.indices, dtype='int32').tobytes())
+            self.indptr[self.position + 1:stop + 1] = self.nnz + features.indptr[1:]
+            self.nnz += int(features.nnz)
+        else:
+            features = np.asarray(features, dtype='float64')
+            self.features[self.position:stop] = features
+            self.nnz += int(np.count_nonzero(features))
+
+        target = np.asarray(target)
+        if self.target is None:
+            # The target dtype is only known from the first chunk
+            self.target = np.lib.format.open_memmap(self.file('target.npy'), mode='w+', dtype=target.dtype, shape=(self.rows,))
+        self.target[self.position:stop] = target
+        self.position = stop
+
+    def close(self):
+        """Finish the arrays, write the manifest and move the subset into place; returns the manifest."""
+        if self.position != self.rows:
+            raise ValueError(f"{self.name}: {self.position} rows written, {self.rows} expected")
+        if self.target is None:
+            self.target = np.lib.format.open_memmap(self.file('target.npy'), mode='w+', dtype='int64', shape=(0,))
+        self.target.flush()
+        target_dtype = str(self.target.dtype)
+        self.target = None
+
+        if self.sparse:
+            self.data_file.close()
+            self.indices_file.close()
+            self.finish_part('data', 'float64', 'float64')
+            self.finish_part('indices', 'int32', 'int32')
+            index_dtype = 'int32' if self.nnz < 2 ** 31 else 'int64'
+            indptr = np.lib.format.open_memmap(self.file('indptr.npy'), mode='w+', dtype=index_dtype, shape=(self.rows + 1,))
+            indptr[:] = self.indptr
+            indptr.flush()
+            del indptr, self.indptr
+            os.remove(self.file('indptr.raw.npy'))
+        else:
+            self.features.flush()
+            del self.features
+
+        manifest = {
+            'version': STORAGE_VERSION,
+            'kind': 'sparse' if self.sparse else 'dense',
+            'shape': [self.rows, len(self.feature_names)],
+            'dtype': 'float64',
+            'nnz': self.nnz,
+            'columns': self.feature_names,
+            'target_column': self.target_column,
+            'target_dtype': target_dtype,
+            **self.metadata,
+        }
+        with open(self.file(MANIFEST), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        shutil.rmtree(self.storage.path(self.name), ignore_errors=True)
+        os.replace(self.tmp_dir, self.storage.path(self.name))
+        density = self.nnz / max(self.rows * len(self.feature_names), 1)
+        print(f"✅ Transformed data saved to {self.storage.path(self.name)} ({manifest['kind']} {self.rows}x{len(self.feature_names)}, {density:.2%} non-zero)")
+        return manifest
+
+    def finish_part(self, part, raw_dtype, dtype):
+        """Turn an appended raw file into part.npy."""
+        raw = self.file(f'{part}.bin')
+        out = np.lib.format.open_memmap(self.file(f'{part}.npy'), mode='w+', dtype=dtype, shape=(self.nnz,))
+        if self.nnz:
+            out[:] = np.memmap(raw, dtype=raw_dtype, mode='r', shape=(self.nnz,))
+        out.flush()
+        del out
+        os.remove(raw)
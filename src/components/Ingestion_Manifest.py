@@ -0,0 +1,97 @@
+import os
+import json
+import threading
+from datetime import datetime
+
+class IngestionManifest:
+    """JSON record of the content fingerprint last loaded for each source file and table.
+
+    Tables reloaded from a database dump instead are recorded apart, in <manifest>_restores.json:
+    they hold no source file's rows, so their next ingestion is a full load. Whichever of the two
+    happened last is the one kept for a table.
+    """
+
+    def __init__(self, manifest_path):
+        self.manifest_path = manifest_path
+        self.restores_path = os.path.splitext(manifest_path)[0] + '_restores.json'
+        self.entries = {}
+        self.restores = {}
+        # Tables are loaded on parallel workers that update the manifest as they finish
+        self.lock = threading.Lock()
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r') as f:
+                self.entries = json.load(f)
+        if os.path.exists(self.restores_path):
+            with open(self.restores_path, 'r') as f:
+                self.restores = json.load(f)
+
+    def get(self, table_name):
+        """Return the stored entry for a table, or None if it was never loaded."""
+        return self.entries.get(table_name)
+
+    def restored(self, table_name):
+        """Return the restore record of a table, or None if it was not last loaded from a dump."""
+        return self.restores.get(table_name)
+
+    def base_version(self, table_name):
+        """Version of the table's last full load or restore, kept through the delta appends since, or None.
+
+        Full loads and restores renumber the table's ids, so each one gets a version of its own even
+        when it reloads the same content.
+        """
+        restore = self.restored(table_name)
+        if restore is not None:
+            return restore['base_version']
+        entry = self.get(table_name)
+        if entry is None:
+            return None
+        return entry.get('base_version', f"load:{entry['sha256']}:{entry['loaded_at']}")
+
+    def update(self, table_name, file_url, sha256, size, row_count, etag=None, plan='full'):
+        """Record the fingerprint of the file that is now loaded into the table.
+
+        A delta keeps the base_version of the load it was appended to; a full load starts a new one.
+        """
+        with self.lock:
+            now = datetime.now()
+            if plan == 'delta' and self.get(table_name) is not None:
+                base_version = self.base_version(table_name)
+            else:
+                base_version = f"load:{sha256}:{now.isoformat()}"
+            self.entries[table_name] = {
+                'file_url': file_url,
+                'sha256': sha256,
+                'size': size,
+                'row_count': row_count,
+                'etag': etag,
+                'plan': plan,
+                'base_version': base_version,
+                'loaded_at': now.isoformat(timespec='seconds'),
+            }
+            self.restores.pop(table_name, None)
+
+    def record_restore(self, table_name, dump_path, dump_sha256, row_count):
+        """Record that the table now holds the rows of a dump, replacing its file fingerprint."""
+        with self.lock:
+            now = datetime.now()
+            self.restores[table_name] = {
+                'dump_path': dump_path,
+                'dump_sha256': dump_sha256,
+                'row_count': row_count,
+                'base_version': f"restore:{dump_sha256}:{now.isoformat()}",
+                'restored_at': now.isoformat(timespec='seconds'),
+            }
+            self.entries.pop(table_name, None)
+
+    def save(self):
+        """Write the manifest atomically so an interrupted run never leaves it half written."""
+        manifest_dir = os.path.dirname(os.path.abspath(self.manifest_path))
+        os.makedirs(manifest_dir, exist_ok=True)
+        with self.lock:
+            files = [(self.manifest_path, self.entries)]
+            if self.restores or os.path.exists(self.restores_path):
+                files.append((self.restores_path, self.restores))
+            for path, records in files:
+                with open(path + '.tmp', 'w') as f:
+                    json.dump(records, f, indent=2, sort_keys=True)
+                os.replace(path + '.tmp', path)
@@ -0,0 +1,120 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak RSS then comes from psutil when it is installed
+    resource = None
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if it cannot be read."""
+    if resource is not None:
+        # ru_maxrss is in KB on Linux
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().peak_wset / 1024 ** 2, 1)
+    except (ImportError, AttributeError):
+        return None
+
+class IngestionMetrics:
+    """Per-table timings, byte and row counts of one ingestion run, written as a JSON run report."""
+
+    def __init__(self, report_dir, log_to_mlflow=False):
+        self.report_dir = report_dir
+        self.log_to_mlflow = log_to_mlflow
+        self.tables = {}
+        self.started_at = datetime.now()
+        self.start = time.perf_counter()
+        # Tables are ingested on parallel workers that record into the same report
+        self.lock = threading.Lock()
+
+    def add(self, table_name, key, value):
+        """Accumulate a numeric metric of a table."""
+        with self.lock:
+            record = self.tables.setdefault(table_name, {})
+            record[key] = record.get(key, 0) + value
+
+    def set(self, table_name, key, value):
+        with self.lock:
+            self.tables.setdefault(table_name, {})[key] = value
+
+    @contextmanager
+    def timer(self, table_name, key):
+        """Add the seconds spent in the block to a metric of the table."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(table_name, key, time.perf_counter() - start)
+
+    def table_summary(self, record):
+        summary = dict(record)
+        for key, value in summary.items():
+            if key.endswith('_seconds'):
+                summary[key] = round(value, 3)
+        load_seconds = record.get('load_seconds', 0)
+        summary['rows_per_sec'] = round(record.get('rows_loaded', 0) / load_seconds, 1) if load_seconds else None
+        download_seconds = record.get('download_seconds', 0)
+        summary['download_mb_per_sec'] = round(record.get('download_bytes', 0) / 1024 ** 2 / download_seconds, 2) if download_seconds else None
+        return summary
+
+    def report(self, **run_info):
+        """Build the run report; run_info (e.g. the load mode) is stored with it."""
+        with self.lock:
+            tables = {name: self.table_summary(record) for name, record in sorted(self.tables.items())}
+        slowest_table = max(tables, key=lambda name: tables[name].get('total_seconds', 0), default=None)
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'wall_seconds': round(time.perf_counter() - self.start, 3),
+            'peak_rss_mb': peak_rss_mb(),
+            **run_info,
+            'totals': {
+                key: round(sum(table.get(key) or 0 for table in tables.values()), 3)
+                for key in ('download_bytes', 'download_seconds', 'parse_seconds', 'load_seconds', 'index_seconds', 'count_seconds', 'rows_loaded')
+            },
+            'slowest_table': slowest_table,
+            'tables': tables,
+        }
+
+    def save(self, **run_info):
+        """Write the run report to a timestamped JSON file and optionally log it to MLflow."""
+        report = self.report(**run_info)
+        os.makedirs(self.report_dir, exist_ok=True)
+        report_path = os.path.join(self.report_dir, f"ingestion_run_{self.started_at:%Y%m%d_%H%M%S}.json")
+        tmp_path = report_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp_path, report_path)
+        print(f"Ingestion run report written to {report_path} (slowest table: {report['slowest_table']})")
+
+        if self.log_to_mlflow:
+            self.log_mlflow(report)
+        return report
+
+    def log_mlflow(self, report):
+        """Log the numeric report values as MLflow metrics, one '<table>.<metric>' key per table."""
+        import mlflow
+
+        metrics = {f"ingestion.{key}": value for key, value in report['totals'].items()}
+        metrics['ingestion.wall_seconds'] = report['wall_seconds']
+        if report['peak_rss_mb'] is not None:
+            metrics['ingestion.peak_rss_mb'] = report['peak_rss_mb']
+        for table_name, table in report['tables'].items():
+            for key, value in table.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    metrics[f"{table_name}.{key}"] = value
+
+        # Log into the caller's run if there is one, otherwise into a run of our own
+        if mlflow.active_run() is not None:
+            mlflow.log_metrics(metrics)
+            mlflow.log_dict(report, 'ingestion_report.json')
+            return
+        with mlflow.start_run(run_name='data_ingestion'):
+            mlflow.log_metrics(metrics)
+            mlflow.log_dict(report, 'ingestion_report.json')
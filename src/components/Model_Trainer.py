@@ -1,3 +1,4 @@
+import os
 import configparser
 from sklearn.model_selection import GridSearchCV
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
@@ -26,7 +27,7 @@ class ModelTrainer:
 
         return accuracy, precision, recall, f1
 
-    def train_and_evaluate(self, model_name, X_train, X_test, y_train, y_test):
+    def train_and_evaluate(self, model_name, X_train, X_test, y_train, y_test, artifact_path=None):
         try:
             mlflow.start_run()  # Start a new MLflow run
 
@@ -68,8 +69,16 @@ class ModelTrainer:
             log_metric("f1_score", f1)
 
             # Log the trained model to MLflow
-            mlflow.sklearn.log_model(best_model, model_name.lower().replace(" ", "_") + "_model", 
-                                      input_example=X_test.iloc[:1])  # Example input for logging
+            model_path = model_name.lower().replace(" ", "_") + "_model"
+            # Example input for logging; sparse feature matrices are logged without one
+            mlflow.sklearn.log_model(best_model, model_path, 
+                                      input_example=X_test.iloc[:1] if hasattr(X_test, 'iloc') else None)
+
+            # Keep the preprocessing the model was trained on beside it, for serving
+            if artifact_path:
+                mlflow.log_artifact(artifact_path, artifact_path=model_path)
+                if os.path.exists(artifact_path + '.json'):
+                    mlflow.log_artifact(artifact_path + '.json', artifact_path=model_path)
 
         except Exception as e:
             print(f"Error occurred during model training: {e}")
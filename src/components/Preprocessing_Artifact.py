@@ -0,0 +1,224 @@
+import os
+import json
+import hashlib
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+import scipy.sparse as sp
+from collections import Counter
+from datetime import datetime
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from src.components.Quantile_Sketch import QuantileSketch
+
+# Bumped whenever the saved layout or the transform changes in a way old artifacts cannot replay
+ARTIFACT_VERSION = 1
+DATE_PARTS = ['year', 'month', 'day', 'hour']
+
+class PreprocessingArtifact:
+    """Imputation, one-hot encoding, scaling and date features fitted once on the training set.
+
+    Validation, test, training and serving all call transform on the same fitted artifact, so every
+    consumer sees the same feature layout. Numerical columns are filled with their training median and
+    standardized; categorical columns are filled with their training mode and one-hot encoded (unseen
+    values encode as all zeros); date columns become year/month/day/hour. Other columns are dropped.
+
+    transform_sparse gives the same features as a CSR matrix, for high-cardinality ids whose one-hot
+    columns are almost all zeros.
+
+    A training set larger than memory is fitted chunk by chunk with partial_fit and then finish_fit:
+    running means and variances come from StandardScaler.partial_fit, medians from a quantile sketch
+    (within epsilon in rank of the exact ones) and modes and vocabularies from value counts.
+
+    Saved with joblib next to a JSON sidecar holding the version, the fit time and the feature layout:
+        artifact = PreprocessingArtifact.load(path)
+        features = artifact.transform(request_df)
+    """
+
+    def __init__(self, categorical_columns, numerical_columns, date_columns=()):
+        self.categorical_columns = list(categorical_columns)
+        self.numerical_columns = list(numerical_columns)
+        self.date_columns = list(date_columns)
+        self.version = ARTIFACT_VERSION
+        self.fitted_at = None
+
+    def present(self, df, columns, kind):
+        """Columns of df among the given ones, reporting those it lacks."""
+        missing = [col for col in columns if col not in df.columns]
+        if missing:
+            print(f"⚠️ {kind} columns not found and left out of the artifact: {missing}")
+        return [col for col in columns if col in df.columns]
+
+    def fit(self, df):
+        print(f"🛠 Fitting preprocessing artifact on {len(df)} rows...")
+        self.categorical_columns = self.present(df, self.categorical_columns, 'Categorical')
+        self.numerical_columns = self.present(df, self.numerical_columns, 'Numerical')
+        self.date_columns = self.present(df, self.date_columns, 'Date')
+
+        self.medians = df[self.numerical_columns].median()
+        self.modes = {
+            col: str(df[col].mode().iloc[0]) if df[col].mode().size > 0 else 'missing'
+            for col in self.categorical_columns
+        }
+        self.scaler = StandardScaler().fit(self.impute_numerical(df))
+        self.encoder = OneHotEncoder(handle_unknown='ignore', sparse_output=True).fit(self.impute_categorical(df))
+        return self.set_layout()
+
+    def set_layout(self):
+        self.feature_names = (
+            self.numerical_columns
+            + [f'{col}_{part}' for col in self.date_columns for part in DATE_PARTS]
+            + list(self.encoder.get_feature_names_out(self.categorical_columns))
+        )
+        self.fitted_at = datetime.now().isoformat(timespec='seconds')
+        print(f"✅ Preprocessing artifact fitted: {len(self.feature_names)} features")
+        return self
+
+    def partial_fit(self, chunk, epsilon=0.001):
+        """Add a chunk of training rows to the streamed statistics; call finish_fit after the last one."""
+        if getattr(self, 'streamed_rows', None) is None:
+            # The first chunk decides which columns the artifact keeps
+            self.categorical_columns = self.present(chunk, self.categorical_columns, 'Categorical')
+            self.numerical_columns = self.present(chunk, self.numerical_columns, 'Numerical')
+            self.date_columns = self.present(chunk, self.date_columns, 'Date')
+            self.streamed_rows = 0
+            self.sketches = {col: QuantileSketch(epsilon) for col in self.numerical_columns}
+            self.counts = {col: Counter() for col in self.categorical_columns}
+            self.scaler = StandardScaler()
+        if len(chunk) == 0:
+            return self
+
+        self.streamed_rows += len(chunk)
+        numerical = chunk[self.numerical_columns].astype('float64')
+        # NaNs are left out of the running mean and variance; finish_fit accounts for them as medians
+        self.scaler.partial_fit(numerical)
+        for col, sketch in self.sketches.items():
+            sketch.update(numerical[col].to_numpy())
+        for col, counts in self.counts.items():
+            value_counts = chunk[col].value_counts(dropna=True)
+            counts.update(value_counts[value_counts > 0].to_dict())
+        return self
+
+    def finish_fit(self):
+        """Turn the streamed statistics into the fitted medians, modes, scaler and encoder."""
+        rows = self.streamed_rows or 0
+        print(f"🛠 Fitting preprocessing artifact on {rows} streamed rows...")
+        self.medians = pd.Series({col: sketch.quantile(0.5) for col, sketch in self.sketches.items()}, index=self.numerical_columns, dtype='float64')
+        self.modes = {col: self.mode_of(counts) for col, counts in self.counts.items()}
+
+        # Missing values are imputed with the median before scaling, so fold them into the running moments
+        n = np.broadcast_to(self.scaler.n_samples_seen_, len(self.numerical_columns)).astype('float64') if rows else np.zeros(len(self.numerical_columns))
+        missing = rows - n
+        mean = np.nan_to_num(getattr(self.scaler, 'mean_', np.zeros(len(n))))
+        var = np.nan_to_num(getattr(self.scaler, 'var_', np.zeros(len(n))))
+        median = np.nan_to_num(self.medians.to_numpy())
+        total = np.maximum(n + missing, 1)
+        imputed_mean = (n * mean + missing * median) / total
+        imputed_var = np.maximum((n * (var + mean ** 2) + missing * median ** 2) / total - imputed_mean ** 2, 0)
+        self.scaler.mean_, self.scaler.var_ = imputed_mean, imputed_var
+        self.scaler.scale_ = np.where(imputed_var > 0, np.sqrt(imputed_var), 1.0)
+        self.scaler.n_samples_seen_ = rows
+        self.scaler.n_features_in_ = len(self.numerical_columns)
+        self.scaler.feature_names_in_ = np.asarray(self.numerical_columns, dtype=object)
+
+        # Same vocabulary as fitting on the imputed text: every value seen plus the fill value
+        categories = [sorted({str(value) for value in self.counts[col]} | {self.modes[col]}) for col in self.categorical_columns]
+        self.encoder = OneHotEncoder(categories=categories, handle_unknown='ignore', sparse_output=True).fit(
+            pd.DataFrame({col: [self.modes[col]] for col in self.categorical_columns})
+        )
+
+        # The sketches and counts are only needed while fitting; keep them out of the saved artifact
+        self.streamed_rows, self.sketches, self.counts = None, None, None
+        return self.set_layout()
+
+    def mode_of(self, counts):
+        """Most frequent value as text, ties going to the smallest like Series.mode, or 'missing'."""
+        if not counts:
+            return 'missing'
+        top = max(counts.values())
+        tied = [value for value, count in counts.items() if count == top]
+        try:
+            return str(min(tied))
+        except TypeError:
+            return str(min(tied, key=str))
+
+    def impute_numerical(self, df):
+        return df[self.numerical_columns].astype('float64').fillna(self.medians)
+
+    def impute_categorical(self, df):
+        # Encoded as text so the same value read from CSV, the feature store or a request matches
+        return pd.DataFrame({
+            col: df[col].astype(object).where(df[col].notna(), self.modes[col]).astype(str)
+            for col in self.categorical_columns
+        }, index=df.index)
+
+    def date_features(self, df):
+        parts = {}
+        for col in self.date_columns:
+            dates = pd.to_datetime(df[col], errors='coerce')
+            for part in DATE_PARTS:
+                parts[f'{col}_{part}'] = getattr(dates.dt, part).astype('float64')
+        return pd.DataFrame(parts, index=df.index)
+
+    def encode(self, df):
+        """One-hot columns of df as CSR, whichever output the encoder was fitted with."""
+        encoded = self.encoder.transform(self.impute_categorical(df))
+        return sp.csr_matrix(encoded) if not sp.issparse(encoded) else encoded.tocsr()
+
+    def transform(self, df):
+        """Model features of df in the fitted layout, indexed like df."""
+        numerical = pd.DataFrame(self.scaler.transform(self.impute_numerical(df)), columns=self.numerical_columns, index=df.index)
+        encoded = pd.DataFrame(
+            self.encode(df).toarray(),
+            columns=self.encoder.get_feature_names_out(self.categorical_columns), index=df.index
+        )
+        return pd.concat([numerical, self.date_features(df), encoded], axis=1)[self.feature_names]
+
+    def transform_sparse(self, df):
+        """Model features of df in the fitted layout as a float64 CSR matrix; the one-hot block stays sparse."""
+        dense = np.hstack([self.scaler.transform(self.impute_numerical(df)), self.date_features(df).to_numpy()])
+        return sp.hstack([sp.csr_matrix(dense), self.encode(df)], format='csr', dtype='float64')
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+    def layout_hash(self):
+        """Short fingerprint of the feature layout, to tell artifacts with different layouts apart."""
+        return hashlib.sha256('\n'.join(self.feature_names).encode()).hexdigest()[:12]
+
+    def metadata(self):
+        return {
+            'version': self.version,
+            'fitted_at': self.fitted_at,
+            'sklearn_version': sklearn.__version__,
+            'layout_hash': self.layout_hash(),
+            'categorical_columns': self.categorical_columns,
+            'numerical_columns': self.numerical_columns,
+            'date_columns': self.date_columns,
+            'feature_names': self.feature_names,
+        }
+
+    def save(self, path):
+        """Write the artifact and its JSON sidecar atomically; returns path."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        joblib.dump(self, path + '.tmp')
+        os.replace(path + '.tmp', path)
+        with open(path + '.json.tmp', 'w') as f:
+            json.dump(self.metadata(), f, indent=2)
+        os.replace(path + '.json.tmp', path + '.json')
+        print(f"✅ Preprocessing artifact v{self.version} ({self.layout_hash()}) saved to {path}")
+        return path
+
+    @classmethod
+    def load(cls, path):
+        artifact = joblib.load(path)
+        if getattr(artifact, 'version', None) != ARTIFACT_VERSION:
+            raise ValueError(f"Preprocessing artifact {path} is version {getattr(artifact, 'version', None)}, expected {ARTIFACT_VERSION}; refit it")
+        meta_path = path + '.json'
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r') as f:
+                saved_sklearn = json.load(f).get('sklearn_version')
+            if saved_sklearn != sklearn.__version__:
+                print(f"⚠️ Preprocessing artifact was fitted with scikit-learn {saved_sklearn}, running {sklearn.__version__}")
+        print(f"✅ Loaded preprocessing artifact v{artifact.version} ({artifact.layout_hash()}) fitted {artifact.fitted_at}")
+        return artifact
@@ -0,0 +1,86 @@
+import math
+import numpy as np
+
+class QuantileSketch:
+    """Mergeable KLL quantile sketch over a stream of numeric values.
+
+    epsilon is the target normalized rank error: a returned q-quantile has a true rank
+    within about q ± epsilon. Memory stays O(k log(n / k)) however many values are added.
+    """
+
+    def __init__(self, epsilon=0.01, seed=None):
+        self.epsilon = epsilon
+        # Empirical KLL error ~ 2.296 / k^0.9723, solved for k
+        self.k = max(int(math.ceil((2.296 / epsilon) ** (1 / 0.9723))), 8)
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.rng = np.random.default_rng(seed)
+
+    def capacity(self, level):
+        """Higher levels hold more weight per item and get the larger buffers."""
+        depth = len(self.levels) - level - 1
+        return max(int(math.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def update(self, values):
+        """Add an array of values; NaNs are ignored."""
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        self.count += values.size
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.compress()
+        return self
+
+    def compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if items.size > self.capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item stays behind; the rest is halved by keeping every other item
+                keep_one = items.size % 2
+                leftover, items = items[:keep_one], items[keep_one:]
+                promoted = items[self.rng.integers(2)::2]
+                self.levels[level] = leftover
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def merge(self, other):
+        """Fold another sketch into this one."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.compress()
+        return self
+
+    def quantile(self, q):
+        """Approximate q-quantile (q may be a scalar or an array), or NaN for an empty sketch."""
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else math.nan
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(level_items.size, 2.0 ** level) for level, level_items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        ranks = np.clip(np.asarray(q, dtype='float64'), 0, 1) * cumulative[-1]
+        positions = np.minimum(np.searchsorted(cumulative, ranks, side='left'), items.size - 1)
+        result = np.clip(items[positions], self.min, self.max)
+        return result if np.ndim(q) else float(result)
+
+    def quantile_bracket(self, q):
+        """Values between which the exact q-quantile lies, given the rank error bound."""
+        return self.quantile(max(q - self.epsilon, 0)), self.quantile(min(q + self.epsilon, 1))
+
+    def size(self):
+        """Number of items retained by the sketch."""
+        return sum(items.size for items in self.levels)
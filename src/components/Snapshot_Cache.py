@@ -0,0 +1,104 @@
+import os
+import json
+import hashlib
+import pyarrow.feather as feather
+
+class SnapshotCache:
+    """Local Arrow IPC snapshots of tables, keyed by table name and a data version."""
+
+    def __init__(self, snapshot_dir, manifest=None, connection_pool=None):
+        self.snapshot_dir = snapshot_dir
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        # The ingestion manifest gives versions without touching the database
+        self.manifest = manifest
+        self.connection_pool = connection_pool
+
+    def snapshot_name(self, table_name, columns=None):
+        """Projected extracts get their own snapshot next to the full table."""
+        if not columns:
+            return table_name
+        return f"{table_name}__{hashlib.md5(','.join(columns).encode()).hexdigest()[:8]}"
+
+    def snapshot_paths(self, name):
+        base = os.path.join(self.snapshot_dir, name)
+        return base + '.arrow', base + '.json'
+
+    def manifest_version(self, table_name):
+        """Version of an ingested or restored table from the manifest, or None if it is not recorded."""
+        if self.manifest is None:
+            return None
+        restore = self.manifest.restored(table_name)
+        if restore is not None:
+            return f"restore:{restore['dump_sha256']}:{restore['row_count']}"
+        entry = self.manifest.get(table_name)
+        if entry is None:
+            return None
+        return f"manifest:{entry['sha256']}:{entry['row_count']}"
+
+    def database_version(self, table_name):
+        """Version of a table from its row count and max id (one cheap round trip)."""
+        with self.connection_pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"SELECT COUNT(*), MAX(id) FROM {table_name};")
+                row_count, max_id = cur.fetchone()
+        return f"db:{row_count}:{max_id}"
+
+    def table_version(self, table_name):
+        return self.manifest_version(table_name) or self.database_version(table_name)
+
+    def file_version(self, path):
+        """Version of a local file from its size and modification time."""
+        stat = os.stat(path)
+        return f"file:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def load(self, name, version):
+        """Return the snapshot memory-mapped as a DataFrame, or None if it is missing or stale."""
+        data_path, meta_path = self.snapshot_paths(name)
+        if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+            return None
+        with open(meta_path, 'r') as f:
+            if json.load(f).get('version') != version:
+                return None
+        # Uncompressed Arrow IPC maps straight from the page cache
+        table = feather.read_table(data_path, memory_map=True)
+        return table.to_pandas(split_blocks=True)
+
+    def save(self, name, df, version):
+        """Write the snapshot, then its metadata, so a crash never pairs new data with an old version."""
+        data_path, meta_path = self.snapshot_paths(name)
+        feather.write_feather(df.reset_index(drop=True), data_path + '.tmp', compression='uncompressed')
+        os.replace(data_path + '.tmp', data_path)
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump({'version': version, 'rows': len(df), 'columns': list(df.columns)}, f)
+        os.replace(meta_path + '.tmp', meta_path)
+
+    def get_or_build(self, name, version, build):
+        """Return the snapshot for this version, calling build() and saving the result on a miss."""
+        df = self.load(name, version)
+        if df is not None:
+            print(f"Loaded {name} from snapshot ({df.shape[0]} rows, {version})")
+            return df
+        df = build()
+        self.save(name, df, version)
+        print(f"Saved snapshot for {name} ({df.shape[0]} rows, {version})")
+        return df
+
+    def extract(self, extractor, table_name, columns=None):
+        """Extract a table through the DataExtractor unless an up-to-date snapshot exists.
+
+        A projection without its own snapshot is cut from a current full-table snapshot.
+        """
+        version = self.table_version(table_name)
+
+        def build():
+            full_df = self.load(table_name, version) if columns else None
+            if full_df is not None:
+                return full_df[[col.lower() for col in columns]]
+            return extractor.extract(table_name, columns)
+
+        return self.get_or_build(self.snapshot_name(table_name, columns), version, build)
+
+    def read_csv(self, path, read):
+        """Parse a local CSV with read(path) only when the file changed since its snapshot."""
+        name = os.path.splitext(os.path.basename(path))[0]
+        return self.get_or_build(name, self.file_version(path), lambda: read(path))
@@ -0,0 +1,72 @@
+# Declared Postgres schemas for the ingested tables, keyed by table name.
+# 'columns' maps each (lower-case) source column to its Postgres type; columns not listed
+# fall back to DataIngestion.get_column_types. 'indexes' lists the join/lookup keys that are
+# indexed after each bulk load, and 'partition_column' marks the time-series tables that can
+# be range-partitioned by month.
+TABLE_SCHEMAS = {
+    'city_weather': {
+        'columns': {
+            'city_id': 'TEXT', 'date': 'TIMESTAMP', 'hour': 'SMALLINT', 'temp': 'SMALLINT',
+            'wind_speed': 'SMALLINT', 'description': 'TEXT', 'precip': 'REAL', 'humidity': 'SMALLINT',
+            'visibility': 'SMALLINT', 'pressure': 'SMALLINT', 'chanceofrain': 'SMALLINT',
+            'chanceoffog': 'SMALLINT', 'chanceofsnow': 'SMALLINT', 'chanceofthunder': 'SMALLINT',
+        },
+        'indexes': [['city_id', 'date', 'hour']],
+        'partition_column': 'date',
+    },
+    'drivers_table': {
+        'columns': {
+            'driver_id': 'TEXT', 'name': 'TEXT', 'gender': 'TEXT', 'age': 'SMALLINT',
+            'experience': 'SMALLINT', 'driving_style': 'TEXT', 'ratings': 'SMALLINT',
+            'vehicle_no': 'INTEGER', 'average_speed_mph': 'REAL',
+        },
+        'indexes': [['driver_id'], ['vehicle_no']],
+    },
+    'routes_table': {
+        'columns': {
+            'route_id': 'TEXT', 'origin_id': 'TEXT', 'destination_id': 'TEXT',
+            'distance': 'REAL', 'average_hours': 'REAL',
+        },
+        'indexes': [['route_id'], ['origin_id'], ['destination_id']],
+    },
+    'routes_weather': {
+        'columns': {
+            'route_id': 'TEXT', 'date': 'TIMESTAMP', 'temp': 'SMALLINT', 'wind_speed': 'SMALLINT',
+            'description': 'TEXT', 'precip': 'REAL', 'humidity': 'SMALLINT', 'visibility': 'SMALLINT',
+            'pressure': 'SMALLINT', 'chanceofrain': 'SMALLINT', 'chanceoffog': 'SMALLINT',
+            'chanceofsnow': 'SMALLINT', 'chanceofthunder': 'SMALLINT',
+        },
+        'indexes': [['route_id', 'date']],
+    },
+    'traffic_table': {
+        'columns': {
+            'route_id': 'TEXT', 'date': 'TIMESTAMP', 'hour': 'SMALLINT',
+            'no_of_vehicles': 'REAL', 'accident': 'SMALLINT',
+        },
+        'indexes': [['route_id', 'date', 'hour']],
+        'partition_column': 'date',
+    },
+    'truck_schedule_table': {
+        'columns': {
+            'truck_id': 'INTEGER', 'route_id': 'TEXT', 'departure_date': 'TIMESTAMP',
+            'estimated_arrival': 'TIMESTAMP', 'delay': 'SMALLINT',
+        },
+        'indexes': [['truck_id'], ['route_id', 'departure_date']],
+    },
+    'trucks_table': {
+        'columns': {
+            'truck_id': 'INTEGER', 'truck_age': 'SMALLINT', 'load_capacity_pounds': 'REAL',
+            'mileage_mpg': 'SMALLINT', 'fuel_type': 'TEXT',
+        },
+        'indexes': [['truck_id']],
+    },
+}
+
+# pandas dtypes used to parse each declared Postgres type; timestamps stay text and are parsed by Postgres
+PANDAS_DTYPES = {
+    'SMALLINT': 'Int64',
+    'INTEGER': 'Int64',
+    'REAL': 'float64',
+    'TEXT': 'object',
+    'TIMESTAMP': 'object',
+}
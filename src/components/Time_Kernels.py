@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+from src.components.Window_Aggregation import to_ns
+
+DAY_NS = 24 * 3600 * 10 ** 9
+NAT = np.iinfo('int64').min
+
+# Time-of-day buckets of explore_traffic: [lower, upper) hour bounds and their labels
+TIME_PERIODS = [(0, 6, 'Early Morning'), (6, 12, 'Morning'), (12, 18, 'Afternoon'), (18, 24, 'Evening')]
+
+def from_ns(ns, dtype='datetime64[ns]'):
+    """Datetime array of nanoseconds since the epoch, with NAT values as NaT."""
+    return np.asarray(ns, dtype='int64').view('datetime64[ns]').astype(dtype)
+
+def range_counts(starts, ends, freq='h'):
+    """Number of timestamps pd.date_range(start, end, freq) yields for each pair, with their first
+    timestamp and the step, all in nanoseconds."""
+    step = pd.tseries.frequencies.to_offset(freq).nanos
+    start_ns, end_ns = to_ns(starts), to_ns(ends)
+    counts = np.where(end_ns >= start_ns, (end_ns - start_ns) // step + 1, 0)
+    return counts, start_ns, step
+
+def explode_ranges(df, start_column, end_column, column, freq='h', ignore_index=False):
+    """df with one row per timestamp of date_range(start, end, freq) in column, like assigning the
+    ranges row by row and exploding them.
+
+    Rows whose range is empty are kept once with NaT, as explode keeps rows with empty lists.
+    """
+    counts, start_ns, step = range_counts(df[start_column], df[end_column], freq)
+    rows = np.maximum(counts, 1)
+    positions = np.repeat(np.arange(len(df)), rows)
+    # Offset of every output row within its range: 0, 1, 2, ... restarting at each input row
+    offsets = np.arange(rows.sum()) - np.repeat(np.cumsum(rows) - rows, rows)
+    values = np.where(np.repeat(counts, rows) > 0, start_ns[positions] + offsets * step, NAT)
+
+    exploded = df.iloc[positions].copy()
+    exploded[column] = from_ns(values, pd.to_datetime(df[start_column]).dtype if len(df) else 'datetime64[ns]')
+    return exploded.reset_index(drop=True) if ignore_index else exploded
+
+def crosses_midnight(starts, ends):
+    """1 where start and end fall on different calendar days, else 0."""
+    return (to_ns(starts) // DAY_NS != to_ns(ends) // DAY_NS).astype(int)
+
+def hhmm_to_timestamp(dates, hhmm):
+    """Timestamps from date strings or datetimes plus HHMM integers (e.g. 1300 -> 13:00)."""
+    hhmm = pd.Series(hhmm).to_numpy(dtype='int64')
+    dates = pd.to_datetime(pd.Series(dates)).to_numpy()
+    return dates + (hhmm // 100 * 60 + hhmm % 100).astype('timedelta64[m]')
+
+def time_of_day_bucket(hours):
+    """Time-period label of each hour; hours outside [0, 24) and missing ones are 'Unknown'."""
+    hours = pd.Series(hours).to_numpy(dtype='float64')
+    edges = np.array([lower for lower, _, _ in TIME_PERIODS] + [TIME_PERIODS[-1][1]])
+    labels = np.array([label for _, _, label in TIME_PERIODS] + ['Unknown'], dtype=object)
+    # Index of the period each hour falls in, or the trailing 'Unknown' label outside the edges (and for NaN)
+    periods = np.searchsorted(edges, hours, side='right') - 1
+    periods[(periods < 0) | (periods >= len(TIME_PERIODS)) | np.isnan(hours)] = len(TIME_PERIODS)
+    return labels[periods]
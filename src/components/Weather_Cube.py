@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+from src.components.Window_Aggregation import HOUR_NS, to_ns
+
+NAT_NS = np.iinfo('int64').min
+
+WEATHER_FEATURES = ['temp', 'wind_speed', 'precip', 'humidity', 'visibility', 'pressure']
+# Columns returned by lookup, in the order a merge with the weather projection used to add them
+LOOKUP_COLUMNS = ['city_id', 'date_time', 'temp', 'wind_speed', 'description', 'precip', 'humidity', 'visibility', 'pressure']
+
+def observed_hour_range(times):
+    """(first, last) whole hour since the epoch of the non-missing times, or None if all are missing."""
+    ns = to_ns(times)
+    # NaT is the int64 minimum, which would stretch the range over the whole datetime64 span
+    ns = ns[ns != NAT_NS]
+    if ns.size == 0:
+        return None
+    return int(ns.min() // HOUR_NS), int(ns.max() // HOUR_NS)
+
+class WeatherCube:
+    """City weather as dense (city x hour x feature) arrays for vectorized lookups.
+
+    fill decides what a city-hour without an observation returns: 'nan' leaves it missing (the
+    result of a left merge), 'ffill' takes the latest earlier observation and 'bfill' the next
+    later one, at most fill_limit hours away when a limit is given. Hours outside the observed
+    range are always missing. Each filled cell reports the hour it was taken from in date_time.
+    hour_range fixes the (first, last) hour since the epoch the cube spans instead of the observed range.
+    Rows without a date_time are left out, as they never matched in the merge.
+    """
+
+    def __init__(self, weather_df, features=WEATHER_FEATURES, fill='nan', fill_limit=None, hour_range=None):
+        if fill not in ('nan', 'ffill', 'bfill'):
+            raise ValueError(f"Unknown weather fill policy: {fill}")
+        self.features = list(features)
+        self.fill = fill
+        self.fill_limit = fill_limit
+
+        self.cities = pd.Index(pd.unique(weather_df['city_id'].astype(object)))
+        ns = to_ns(weather_df['date_time'])
+        timed = ns != NAT_NS
+        hours = ns // HOUR_NS
+        self.time_dtype = pd.to_datetime(weather_df['date_time']).dtype
+        # Without any timed row the cube is a single empty hour that no lookup finds
+        first_hour, last_hour = hour_range or observed_hour_range(weather_df['date_time']) or (0, 0)
+        self.first_hour = int(first_hour)
+        self.n_hours = int(last_hour) - self.first_hour + 1
+
+        # Source row of every observed cell; the first row wins when a city-hour repeats
+        in_range = timed & (hours >= self.first_hour) & (hours < self.first_hour + self.n_hours)
+        cells = self.cities.get_indexer(weather_df['city_id'].astype(object)) * self.n_hours + (hours - self.first_hour)
+        observed_cells, first_rows = np.unique(np.where(in_range, cells, -1), return_index=True)
+        first_rows = first_rows[observed_cells >= 0]
+        observed_cells = observed_cells[observed_cells >= 0]
+        source = np.full(len(self.cities) * self.n_hours, -1, dtype='int64')
+        source[observed_cells] = first_rows
+        source = self.fill_missing(source.reshape(len(self.cities), self.n_hours))
+
+        found = source >= 0
+        rows = np.where(found, source, 0)
+        row_values = weather_df[self.features].to_numpy(dtype='float64')
+        self.values = np.where(found[..., None], row_values[rows], np.nan)
+
+        descriptions = weather_df['description'].astype('category')
+        self.descriptions = descriptions.cat.categories
+        codes = descriptions.cat.codes.to_numpy()
+        self.description_codes = np.where(found, codes[rows], -1).astype('int16')
+
+        # Hour each cell's values were observed at, which differs from the cell's own hour once filled
+        self.source_hours = np.where(found, hours[rows], -1)
+
+    def fill_missing(self, source):
+        """Apply the fill policy to the (city x hour) grid of source rows."""
+        if self.fill == 'nan':
+            return source
+        hour = np.arange(self.n_hours)
+        observed = source >= 0
+        if self.fill == 'ffill':
+            nearest = np.maximum.accumulate(np.where(observed, hour, -1), axis=1)
+            found = nearest >= 0
+            distance = hour - nearest
+        else:
+            nearest = np.minimum.accumulate(np.where(observed, hour, self.n_hours)[:, ::-1], axis=1)[:, ::-1]
+            found = nearest < self.n_hours
+            distance = nearest - hour
+        if self.fill_limit:
+            found &= distance <= self.fill_limit
+        filled = np.take_along_axis(source, np.clip(nearest, 0, self.n_hours - 1), axis=1)
+        return np.where(found, filled, -1)
+
+    def city_codes(self, city_ids):
+        """Cube row of each city id, or -1; ids are factorized first so only distinct ids are looked up."""
+        codes, uniques = pd.factorize(pd.Series(city_ids))
+        rows = self.cities.get_indexer(pd.Index(uniques).astype(object))
+        return np.where(codes >= 0, rows[codes], -1)
+
+    def lookup(self, city_ids, times):
+        """Weather of each (city, time) pair with one gather; unmatched pairs get NaN/NaT.
+
+        Times must fall exactly on the hour to match, as they had to for the merge on date_time.
+        """
+        city_codes = self.city_codes(city_ids)
+        ns = to_ns(times)
+        offsets = ns // HOUR_NS - self.first_hour
+        valid = (city_codes >= 0) & (offsets >= 0) & (offsets < self.n_hours) & (ns % HOUR_NS == 0)
+        cells = np.where(valid, city_codes * self.n_hours + offsets, 0)
+
+        values = self.values.reshape(-1, len(self.features))[cells]
+        values[~valid] = np.nan
+        description_codes = np.where(valid, self.description_codes.reshape(-1)[cells], -1)
+        source_hours = np.where(valid, self.source_hours.reshape(-1)[cells], -1)
+        found = source_hours >= 0
+
+        result = pd.DataFrame(values, columns=self.features)
+        result['city_id'] = pd.Categorical.from_codes(np.where(found, city_codes, -1), self.cities)
+        result['date_time'] = np.where(found, source_hours * HOUR_NS, np.iinfo('int64').min).view('datetime64[ns]').astype(self.time_dtype)
+        result['description'] = pd.Categorical.from_codes(description_codes, self.descriptions)
+        return result[[col for col in LOOKUP_COLUMNS if col in result.columns]]
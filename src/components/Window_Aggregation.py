@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+
+HOUR_NS = 3600 * 10 ** 9
+
+def to_ns(values):
+    """Nanoseconds since the epoch of datetime-like values."""
+    values = pd.Series(values)
+    if not pd.api.types.is_datetime64_dtype(values.dtype):
+        values = pd.to_datetime(values)
+    return values.to_numpy().astype('datetime64[ns]').view('int64')
+
+def to_hours(values, ceil=False):
+    """Whole hours since the epoch of datetime-like values, floored (or ceiled)."""
+    ns = to_ns(values)
+    return -((-ns) // HOUR_NS) if ceil else ns // HOUR_NS
+
+def prefix_sum(values):
+    """Cumulative sum with a leading 0, so the sum of values[i:j] is prefix[j] - prefix[i]."""
+    return np.concatenate([[0], np.cumsum(values)])
+
+class WindowIndex:
+    """Rows sorted by (key, time step) once, so the rows of any [start, end] window of a key are one
+    contiguous slice found with two binary searches.
+
+    Rows whose time is not on the step grid never match, as they would not in an equality merge.
+    """
+
+    def __init__(self, keys, times, step_ns=HOUR_NS):
+        self.step_ns = step_ns
+        key_codes, uniques = pd.factorize(pd.Series(keys))
+        self.key_values = pd.Index(uniques).astype(object)
+        ns = to_ns(times)
+        on_grid = ns % step_ns == 0
+        codes = np.where(on_grid & (key_codes >= 0), key_codes, -1).astype('int64')
+
+        # One sortable key per row: key code in the high bits, time step in the low 32 bits;
+        # off-grid rows get a negative code and sort before every window
+        sort_keys = codes * 2 ** 32 + np.where(on_grid, ns // step_ns, 0)
+        self.order = np.argsort(sort_keys, kind='stable')
+        self.sort_keys = sort_keys[self.order]
+
+    def codes(self, keys):
+        """Code of each key, or -1 for keys without rows; keys are factorized first."""
+        codes, uniques = pd.factorize(pd.Series(keys))
+        known = self.key_values.get_indexer(pd.Index(uniques).astype(object))
+        return np.where(codes >= 0, known[codes], -1).astype('int64')
+
+    def bounds(self, keys, starts, ends, outward=False):
+        """[start, end) positions in the sorted rows of each window, both ends included.
+
+        By default a window covers the steps from the first at or after start to the last at or
+        before end; outward widens it to the steps at or before start and at or after end.
+        """
+        codes = self.codes(keys)
+        start_ns, end_ns = to_ns(starts), to_ns(ends)
+        start_steps = start_ns // self.step_ns if outward else -((-start_ns) // self.step_ns)
+        end_steps = -((-end_ns) // self.step_ns) if outward else end_ns // self.step_ns
+
+        start = np.searchsorted(self.sort_keys, codes * 2 ** 32 + start_steps, side='left')
+        end = np.maximum(np.searchsorted(self.sort_keys, codes * 2 ** 32 + end_steps, side='right'), start)
+        known = codes >= 0
+        return np.where(known, start, 0), np.where(known, end, 0)
+
+    def prefix_sum(self, values):
+        """Prefix sums of a per-row array in sorted order."""
+        return prefix_sum(np.asarray(values)[self.order])
+
+def group_totals(schedule_df, by, windows):
+    """Sum per-trip window totals over groups of trips (the groupby of the exploded table)."""
+    for col in by:
+        windows[col] = schedule_df[col].to_numpy()
+    value_columns = [col for col in windows.columns if col not in by]
+    return windows.groupby(list(by), as_index=False, observed=True, sort=False)[value_columns].sum()
+
+class TrafficWindowAggregator:
+    """Traffic totals over each trip's [departure, arrival] window, without exploding trips into hours.
+
+    Traffic rows are sorted by (route, hour) once and turned into prefix sums of vehicles, of
+    non-null vehicle counts and of accidents. A trip window is then two binary searches on the
+    sorted (route, hour) keys and three subtractions.
+    """
+
+    def __init__(self, traffic_df, time_column='date_time'):
+        self.index = WindowIndex(traffic_df['route_id'], traffic_df[time_column], HOUR_NS)
+        vehicles = traffic_df['no_of_vehicles'].to_numpy(dtype='float64')
+        self.vehicles = self.index.prefix_sum(np.nan_to_num(vehicles))
+        self.vehicle_counts = self.index.prefix_sum(~np.isnan(vehicles))
+        self.accidents = self.index.prefix_sum(traffic_df['accident'].to_numpy(dtype='float64') == 1)
+
+    def trip_windows(self, schedule_df, start_column='departure_date', end_column='estimated_arrival'):
+        """Vehicle sum, vehicle count and accident count of the traffic rows in each trip's window.
+
+        Windows include both ends; rows are matched on whole hours from the first hour at or after
+        departure to the last hour at or before arrival. Routes without traffic get zeros.
+        """
+        start, end = self.index.bounds(schedule_df['route_id'], schedule_df[start_column], schedule_df[end_column])
+        return pd.DataFrame({
+            'vehicles_sum': self.vehicles[end] - self.vehicles[start],
+            'vehicles_count': self.vehicle_counts[end] - self.vehicle_counts[start],
+            'accident_count': self.accidents[end] - self.accidents[start],
+        }, index=schedule_df.index)
+
+    def aggregate(self, schedule_df, by=('truck_id', 'route_id'), start_column='departure_date', end_column='estimated_arrival', weights=None):
+        """avg_no_of_vehicles and the any-accident flag per group of trips.
+
+        Matches exploding every trip into hours, merging traffic and averaging per group: the mean
+        is over all matched traffic rows of all trips in the group. weights counts each trip's rows
+        that many times, as if the trip appeared that many times in schedule_df.
+        """
+        windows = self.trip_windows(schedule_df, start_column, end_column)
+        if weights is not None:
+            windows = windows.mul(np.asarray(weights), axis=0)
+        totals = group_totals(schedule_df, by, windows)
+        totals['avg_no_of_vehicles'] = totals['vehicles_sum'] / totals['vehicles_count'].replace(0, np.nan)
+        totals['accident'] = (totals['accident_count'] > 0).astype(int)
+        return totals[list(by) + ['avg_no_of_vehicles', 'accident']]
+
+ROUTE_WEATHER_FEATURES = {
+    'route_avg_temp': 'temp',
+    'route_avg_wind_speed': 'wind_speed',
+    'route_avg_precip': 'precip',
+    'route_avg_humidity': 'humidity',
+    'route_avg_visibility': 'visibility',
+    'route_avg_pressure': 'pressure',
+}
+
+class RouteWeatherAggregator:
+    """Route weather means and the most frequent description over each trip's 6-hour windows.
+
+    Replaces flooring/ceiling trips to 6H, exploding them into 6H steps, merging routes_weather and
+    taking means and a mode per group. Means come from prefix sums of each feature and of its
+    non-null counts; the mode from the sorted positions of each description's rows, counted in a
+    window with two binary searches, with ties going to the alphabetically first description as
+    Series.mode does. The positions of all descriptions together hold one entry per row, however
+    many descriptions there are.
+    """
+
+    def __init__(self, routes_weather_df, time_column='date', freq='6h'):
+        step_ns = pd.Timedelta(freq).value
+        self.index = WindowIndex(routes_weather_df['route_id'], routes_weather_df[time_column], step_ns)
+
+        self.sums, self.counts = {}, {}
+        for name, col in ROUTE_WEATHER_FEATURES.items():
+            values = routes_weather_df[col].to_numpy(dtype='float64')
+            self.sums[name] = self.index.prefix_sum(np.nan_to_num(values))
+            self.counts[name] = self.index.prefix_sum(~np.isnan(values))
+
+        # Sorted categories, so the lowest code among tied counts is the first description by value
+        codes, self.descriptions = pd.factorize(routes_weather_df['description'], sort=True)
+        # Positions in the sorted rows grouped by description (and ascending within each), split per description
+        sorted_codes = codes[self.index.order]
+        positions = np.argsort(sorted_codes, kind='stable')
+        splits = np.searchsorted(sorted_codes[positions], np.arange(len(self.descriptions) + 1))
+        self.description_positions = [positions[splits[code]:splits[code + 1]] for code in range(len(self.descriptions))]
+
+    def trip_windows(self, schedule_df, start_column='departure_date', end_column='estimated_arrival'):
+        """Per-trip feature sums and counts plus description counts over the trip's widened 6H steps."""
+        start, end = self.index.bounds(schedule_df['route_id'], schedule_df[start_column], schedule_df[end_column], outward=True)
+        windows = {}
+        for name in ROUTE_WEATHER_FEATURES:
+            windows[f'{name}_sum'] = self.sums[name][end] - self.sums[name][start]
+            windows[f'{name}_count'] = self.counts[name][end] - self.counts[name][start]
+        for code, positions in enumerate(self.description_positions):
+            windows[f'description_{code}'] = np.searchsorted(positions, end) - np.searchsorted(positions, start)
+        return pd.DataFrame(windows, index=schedule_df.index)
+
+    def aggregate(self, schedule_df, by=('truck_id', 'route_id'), start_column='departure_date', end_column='estimated_arrival'):
+        """route_avg_* means and route_description per group of trips."""
+        totals = group_totals(schedule_df, by, self.trip_windows(schedule_df, start_column, end_column))
+        for name in ROUTE_WEATHER_FEATURES:
+            totals[name] = totals[f'{name}_sum'] / totals[f'{name}_count'].replace(0, np.nan)
+
+        description_counts = totals[[f'description_{code}' for code in range(len(self.descriptions))]].to_numpy()
+        mode_codes = np.where(description_counts.sum(axis=1) > 0, description_counts.argmax(axis=1), -1) if len(self.descriptions) else np.full(len(totals), -1)
+        totals['route_description'] = pd.Categorical.from_codes(mode_codes, self.descriptions)
+        return totals[list(by) + list(ROUTE_WEATHER_FEATURES) + ['route_description']]
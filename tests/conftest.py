@@ -0,0 +1,21 @@
+import os
+import sys
+import configparser
+import pytest
+
+# Components are imported as src.components.*, like the stage scripts do
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+@pytest.fixture
+def ingestion_config(tmp_path):
+    """Config for a DataIngestion that never connects; tests add their own [ingestion] options."""
+    config = configparser.RawConfigParser()
+    config.read_dict({
+        'database': {'host': 'localhost', 'port': '5432', 'name': 'test', 'user': 'test', 'password': 'test'},
+        'github': {'dir_url': 'http://localhost/'},
+        'ingestion': {
+            'manifest_path': str(tmp_path / 'ingestion_manifest.json'),
+            'report_dir': str(tmp_path / 'ingestion_reports'),
+        },
+    })
+    return config
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+from src.components.Data_Cleaning import ChunkedDataCleaning
+
+def chunked_clean(tmp_path, chunks):
+    output_path = str(tmp_path / 'cleaned.csv')
+    report = ChunkedDataCleaning('trucks').full_cleaning_process(lambda: iter(chunks), ['truck_age'], output_path)
+    with open(output_path) as f:
+        return f.read().splitlines(), report
+
+def test_header_written_once_when_first_chunk_cleans_to_nothing(tmp_path):
+    chunks = [
+        pd.DataFrame({'truck_id': [1, 2], 'truck_age': [np.nan, np.nan]}),
+        pd.DataFrame({'truck_id': [3, 4], 'truck_age': [np.nan, np.nan]}),
+        pd.DataFrame({'truck_id': [5, 6], 'truck_age': [5.0, 6.0]}),
+    ]
+    lines, report = chunked_clean(tmp_path, chunks)
+    assert lines == ['truck_id,truck_age', '5,5.0', '6,6.0']
+    assert report['rows_written'] == 2
+
+def test_header_written_for_empty_table(tmp_path):
+    lines, report = chunked_clean(tmp_path, [pd.DataFrame({'truck_id': [], 'truck_age': []})])
+    assert lines == ['truck_id,truck_age']
+    assert report['rows_written'] == 0
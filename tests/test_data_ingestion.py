@@ -0,0 +1,150 @@
+import io
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from src.components.Data_Ingestion import DataIngestion
+
+@pytest.mark.parametrize('load_mode', ['copy', 'upsert'])
+def test_known_load_modes(ingestion_config, load_mode):
+    ingestion_config.set('ingestion', 'load_mode', load_mode)
+    assert DataIngestion(ingestion_config, connection_pool=object()).load_mode == load_mode
+
+def test_unknown_load_mode_is_rejected(ingestion_config):
+    ingestion_config.set('ingestion', 'load_mode', 'upsrt')
+    with pytest.raises(ValueError, match='upsrt'):
+        DataIngestion(ingestion_config, connection_pool=object())
+
+CSV = b'id,truck_id,distance\n' + b''.join(f'{i},{i % 7},{i * 1.5}\n'.encode() for i in range(5000))
+ETAG = '"v1"'
+
+class CsvHandler(BaseHTTPRequestHandler):
+    """Serves CSV at /routes_table.csv with an ETag, answering 304 to a matching If-None-Match."""
+
+    def do_GET(self):
+        if self.path != '/routes_table.csv':
+            self.send_response(404)
+            self.end_headers()
+            return
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', ETAG)
+        self.send_header('Content-Length', str(len(CSV)))
+        self.end_headers()
+        self.wfile.write(CSV)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def csv_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), CsvHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    server.server_close()
+
+def test_download_streams_and_fingerprints(ingestion_config, csv_server):
+    # A tiny spool limit makes the download roll over to a temporary file
+    ingestion_config.set('ingestion', 'spool_max_mb', '0')
+    ingestion = DataIngestion(ingestion_config, connection_pool=object())
+    buffer, fingerprint = ingestion.download_csv(f'{csv_server}/routes_table.csv')
+    with buffer:
+        assert buffer.read() == CSV
+    assert fingerprint == {'sha256': hashlib.sha256(CSV).hexdigest(), 'size': len(CSV), 'etag': ETAG, 'prefix_sha256': None}
+    assert ingestion.metrics.tables['routes_table']['download_bytes'] == len(CSV)
+
+def test_download_hashes_previously_loaded_prefix(ingestion_config, csv_server):
+    ingestion = DataIngestion(ingestion_config, connection_pool=object())
+    prefix = CSV[:1000]
+    entry = {'sha256': hashlib.sha256(prefix).hexdigest(), 'size': len(prefix), 'etag': '"v0"'}
+    buffer, fingerprint = ingestion.download_csv(f'{csv_server}/routes_table.csv', entry)
+    buffer.close()
+    assert fingerprint['prefix_sha256'] == entry['sha256']
+    assert fingerprint['sha256'] == hashlib.sha256(CSV).hexdigest()
+
+def test_download_not_modified(ingestion_config, csv_server):
+    ingestion = DataIngestion(ingestion_config, connection_pool=object())
+    entry = {'sha256': hashlib.sha256(CSV).hexdigest(), 'size': len(CSV), 'etag': ETAG}
+    buffer, fingerprint = ingestion.download_csv(f'{csv_server}/routes_table.csv', entry)
+    assert buffer is None
+    assert fingerprint['sha256'] == entry['sha256'] and fingerprint['etag'] == ETAG
+    assert ingestion.metrics.tables['routes_table']['not_modified'] is True
+
+def test_download_failure(ingestion_config, csv_server):
+    ingestion = DataIngestion(ingestion_config, connection_pool=object())
+    assert ingestion.download_csv(f'{csv_server}/missing_table.csv') == (None, None)
+
+def delta_ingestion(ingestion_config, monkeypatch, prefix):
+    """DataIngestion planning a delta load over prefix, with database work replaced by recorders."""
+    ingestion = DataIngestion(ingestion_config, connection_pool=object())
+    ingestion.manifest.update('routes_table', 'http://localhost/routes_table.csv', hashlib.sha256(prefix).hexdigest(), len(prefix), 10, None)
+    calls = []
+    monkeypatch.setattr(ingestion, 'plan_load', lambda *args: 'delta')
+    monkeypatch.setattr(ingestion, 'append_table', lambda df, table_name, cur: calls.append(('append', len(df))) or len(df))
+    monkeypatch.setattr(ingestion, 'ingest_table', lambda df, table_name, cur: calls.append(('full', len(df))) or len(df))
+    return ingestion, calls
+
+def test_delta_load_appends_new_rows(ingestion_config, monkeypatch):
+    prefix = CSV[:CSV.index(b'\n', 1000) + 1]
+    ingestion, calls = delta_ingestion(ingestion_config, monkeypatch, prefix)
+    buffer = io.BytesIO(CSV)
+    loaded = ingestion.process_file('http://localhost/routes_table.csv', buffer, {'sha256': '', 'size': len(CSV), 'etag': None}, cur=None)
+    assert calls == [('append', CSV.count(b'\n') - prefix.count(b'\n'))]
+    assert loaded[2] == 'delta'
+    assert ingestion.metrics.tables['routes_table']['plan'] == 'delta'
+
+def test_unaligned_delta_is_reported_as_full_load(ingestion_config, monkeypatch):
+    # The previous load ended mid-line, so the whole file is reloaded
+    prefix = CSV[:1000]
+    ingestion, calls = delta_ingestion(ingestion_config, monkeypatch, prefix)
+    loaded = ingestion.process_file('http://localhost/routes_table.csv', io.BytesIO(CSV), {'sha256': '', 'size': len(CSV), 'etag': None}, cur=None)
+    assert calls == [('full', 5000)]
+    assert loaded[2] == 'full'
+    assert ingestion.metrics.tables['routes_table']['plan'] == 'full'
+
+class RecordingCursor:
+    """Cursor that records statements and answers COUNT(*) with the rows loaded so far."""
+
+    def __init__(self):
+        self.statements = []
+        self.rows = 0
+
+    def execute(self, query, params=None):
+        self.statements.append(query)
+
+    def fetchone(self):
+        return (self.rows,)
+
+def test_chunked_ingestion_types_late_changes(ingestion_config, monkeypatch):
+    # Types change only after the first chunk and after the sample: ints become text, floats and blanks
+    rows = [f'{i},{i},{i}' for i in range(30)] + ['x,1.5,', 'y,2.5,']
+    buffer = io.BytesIO(('a,b,c\n' + '\n'.join(rows) + '\n').encode())
+    ingestion_config.set('ingestion', 'sample_rows', '10')
+    ingestion_config.set('ingestion', 'max_memory_mb', '1')
+    ingestion = DataIngestion(ingestion_config, connection_pool=object())
+    ingestion.chunk_rows = lambda sample: 10
+    cur = RecordingCursor()
+    chunk_dtypes = []
+
+    def load_data(df, table_name, cur):
+        chunk_dtypes.append({col: str(dtype) for col, dtype in df.dtypes.items()})
+        cur.rows += len(df)
+        return len(df)
+    monkeypatch.setattr(ingestion, 'load_data', load_data)
+
+    assert ingestion.ingest_table_chunked(buffer, 'misc_table', cur) == 32
+    assert len(chunk_dtypes) == 4
+    assert all(dtypes == {'a': 'object', 'b': 'float64', 'c': 'Int64'} for dtypes in chunk_dtypes)
+    assert 'a TEXT, b FLOAT, c INTEGER' in cur.statements[0]
+
+def test_declared_columns_are_not_scanned(ingestion_config, monkeypatch):
+    ingestion = DataIngestion(ingestion_config, connection_pool=object())
+    monkeypatch.setattr(ingestion, 'scan_dtypes', lambda buffer, columns: pytest.fail(f'scanned {columns}'))
+    buffer = io.BytesIO(b'route_id,distance,average_hours\nR-1,10,2\n')
+    _, dtypes = ingestion.infer_dtypes(buffer, 'routes_table')
+    assert dtypes == {'route_id': 'object', 'distance': 'float64', 'average_hours': 'float64'}
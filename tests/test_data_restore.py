@@ -0,0 +1,80 @@
+import pandas as pd
+from src.components.Data_Restore import DatabaseRestore
+from src.components.Ingestion_Manifest import IngestionManifest
+from src.components.Snapshot_Cache import SnapshotCache
+
+DUMP = """
+CREATE TABLE public.routes_table (
+    id integer NOT NULL,
+    route_id text,
+    distance real
+);
+
+COPY public.routes_table (id, route_id, distance) FROM stdin;
+1\tR-1\t10.5
+2\tR-2\t\\N
+\\.
+
+INSERT INTO public.trucks_table (id, truck_id, fuel_type) VALUES (1, 7, 'diesel'), (2, 8, 'gas');
+"""
+
+def write_dump(tmp_path):
+    path = tmp_path / 'truck-eta-postgres.sql'
+    path.write_text(DUMP, encoding='utf-8')
+    return str(path)
+
+def test_restore_to_snapshots_keeps_ingestion_fingerprints_apart(tmp_path):
+    manifest_path = str(tmp_path / 'ingestion_manifest.json')
+    manifest = IngestionManifest(manifest_path)
+    manifest.update('routes_table', 'http://localhost/routes_table.csv', 'abc', 100, 2)
+    cache = SnapshotCache(str(tmp_path / 'snapshots'), manifest)
+    before = cache.manifest_version('routes_table')
+
+    restore = DatabaseRestore(write_dump(tmp_path))
+    restore.restore_to_snapshots(cache)
+
+    reloaded = IngestionManifest(manifest_path)
+    # No made-up fingerprint for plan_load to compare against; the next ingestion is a full load
+    assert reloaded.get('routes_table') is None and reloaded.get('trucks_table') is None
+    assert reloaded.restored('routes_table')['dump_sha256'] == restore.dump_sha256()
+    assert reloaded.restored('trucks_table')['row_count'] == 2
+
+    cache = SnapshotCache(str(tmp_path / 'snapshots'), reloaded)
+    version = cache.manifest_version('routes_table')
+    assert version != before
+    assert cache.load('routes_table', version)['route_id'].tolist() == ['R-1', 'R-2']
+
+def test_ingestion_after_restore_replaces_the_restore_record(tmp_path):
+    manifest = IngestionManifest(str(tmp_path / 'ingestion_manifest.json'))
+    manifest.record_restore('routes_table', 'dump.sql', 'dumphash', 2)
+    restored_version = SnapshotCache(str(tmp_path / 'snapshots'), manifest).manifest_version('routes_table')
+    manifest.update('routes_table', 'http://localhost/routes_table.csv', 'abc', 100, 3)
+    assert manifest.restored('routes_table') is None
+    assert SnapshotCache(str(tmp_path / 'snapshots'), manifest).manifest_version('routes_table') not in (None, restored_version)
+
+class FakePool:
+    def run_per_table(self, table_names, task):
+        return {table_name: task(table_name) for table_name in table_names}
+
+class FakeIngestion:
+    def __init__(self, manifest):
+        self.manifest = manifest
+        self.connection_pool = FakePool()
+
+def test_restore_to_postgres_records_each_restored_table(tmp_path, monkeypatch):
+    manifest_path = str(tmp_path / 'ingestion_manifest.json')
+    manifest = IngestionManifest(manifest_path)
+    manifest.update('trucks_table', 'http://localhost/trucks_table.csv', 'abc', 100, 5)
+    cache = SnapshotCache(str(tmp_path / 'snapshots'), manifest)
+    cache.save('trucks_table', pd.DataFrame({'truck_id': [1, 2, 3, 4, 5]}), cache.manifest_version('trucks_table'))
+
+    restore = DatabaseRestore(write_dump(tmp_path))
+    monkeypatch.setattr(restore, 'restore_table_postgres', lambda ingestion, table_name, df: len(df))
+    assert restore.restore_to_postgres(FakeIngestion(manifest)) == {'routes_table': 2, 'trucks_table': 2}
+
+    reloaded = IngestionManifest(manifest_path)
+    assert reloaded.get('trucks_table') is None
+    assert reloaded.restored('trucks_table')['row_count'] == 2
+    # The snapshot of the pre-restore rows is no longer current
+    cache = SnapshotCache(str(tmp_path / 'snapshots'), reloaded)
+    assert cache.load('trucks_table', cache.manifest_version('trucks_table')) is None
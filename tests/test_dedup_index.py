@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+from src.components.Dedup_Index import DedupIndex, row_hashes
+
+def test_drop_duplicates_within_and_across_chunks():
+    index = DedupIndex(key_columns=['truck_id', 'route_id'])
+    first = pd.DataFrame({'truck_id': [1, 1, 2], 'route_id': ['R-1', 'R-1', 'R-2'], 'delay': [0, 1, 0]})
+    second = pd.DataFrame({'truck_id': [2, 3], 'route_id': ['R-2', 'R-3'], 'delay': [1, 1]})
+    assert index.drop_duplicates(first)['delay'].tolist() == [0, 0]
+    assert index.drop_duplicates(second)['truck_id'].tolist() == [3]
+    assert len(index) == 3
+
+def test_hashes_ignore_integer_width_and_negative_zero():
+    wide = pd.DataFrame({'truck_id': np.array([1, 2], dtype='int64'), 'distance': [0.0, 1.5]})
+    narrow = pd.DataFrame({'truck_id': np.array([1, 2], dtype='int8'), 'distance': [-0.0, 1.5]})
+    assert (row_hashes(wide) == row_hashes(narrow)).all()
+
+def test_persisted_index_and_state(tmp_path):
+    path = str(tmp_path / 'dedup' / 'trucks')
+    index = DedupIndex(path, ['truck_id'])
+    index.drop_duplicates(pd.DataFrame({'truck_id': [1, 2, 3]}))
+    index.state = {'watermark': 3}
+    index.save()
+
+    reloaded = DedupIndex(path, ['truck_id'])
+    assert len(reloaded) == 3 and reloaded.state == {'watermark': 3}
+    assert reloaded.drop_duplicates(pd.DataFrame({'truck_id': [3, 4]}))['truck_id'].tolist() == [4]
+
+def test_index_on_other_keys_is_ignored(tmp_path):
+    path = str(tmp_path / 'trucks')
+    index = DedupIndex(path, ['truck_id'])
+    index.drop_duplicates(pd.DataFrame({'truck_id': [1], 'route_id': ['R-1']}))
+    index.save()
+    assert len(DedupIndex(path, ['truck_id', 'route_id'])) == 0
@@ -0,0 +1,33 @@
+from src.components.Ingestion_Manifest import IngestionManifest
+
+URL = 'http://localhost/traffic_table.csv'
+
+def test_base_version_survives_deltas_only(tmp_path):
+    manifest = IngestionManifest(str(tmp_path / 'ingestion_manifest.json'))
+    assert manifest.base_version('traffic_table') is None
+
+    manifest.update('traffic_table', URL, 'a', 100, 10)
+    base = manifest.base_version('traffic_table')
+    manifest.update('traffic_table', URL, 'b', 150, 15, plan='delta')
+    assert manifest.base_version('traffic_table') == base
+
+    # A full reload renumbers the ids even when the content is unchanged
+    manifest.update('traffic_table', URL, 'b', 150, 15)
+    reloaded = manifest.base_version('traffic_table')
+    assert reloaded != base
+
+    manifest.record_restore('traffic_table', 'dump.sql', 'dumphash', 15)
+    restored = manifest.base_version('traffic_table')
+    assert restored not in (base, reloaded)
+    manifest.record_restore('traffic_table', 'dump.sql', 'dumphash', 15)
+    assert manifest.base_version('traffic_table') != restored
+
+def test_base_version_is_saved(tmp_path):
+    path = str(tmp_path / 'ingestion_manifest.json')
+    manifest = IngestionManifest(path)
+    manifest.update('traffic_table', URL, 'a', 100, 10)
+    manifest.update('traffic_table', URL, 'b', 150, 15, plan='delta')
+    manifest.save()
+    reloaded = IngestionManifest(path)
+    assert reloaded.base_version('traffic_table') == manifest.base_version('traffic_table')
+    assert reloaded.get('traffic_table')['plan'] == 'delta'
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+from src.components.Preprocessing_Artifact import PreprocessingArtifact
+
+CATEGORICAL = ['route_id', 'truck_id']
+NUMERICAL = ['distance', 'temp']
+DATES = ['departure_date']
+
+def training_rows(rng, n=3000):
+    df = pd.DataFrame({
+        'route_id': rng.choice(['R0', 'R1', 'R2', None], n, p=[0.4, 0.3, 0.2, 0.1]),
+        'truck_id': rng.integers(0, 6, n),
+        'distance': rng.normal(500, 120, n),
+        'temp': np.where(rng.random(n) < 0.15, np.nan, rng.normal(20, 5, n)),
+        'departure_date': pd.Timestamp('2019-01-01') + pd.to_timedelta(rng.integers(0, 24 * 90, n), unit='h'),
+        'delay': rng.integers(0, 2, n),
+    })
+    return df
+
+def streamed(df, chunk_rows=700):
+    artifact = PreprocessingArtifact(CATEGORICAL, NUMERICAL, DATES)
+    for start in range(0, len(df), chunk_rows):
+        artifact.partial_fit(df.iloc[start:start + chunk_rows])
+    return artifact.finish_fit()
+
+def test_partial_fit_matches_fit():
+    df = training_rows(np.random.default_rng(0))
+    fitted = PreprocessingArtifact(CATEGORICAL, NUMERICAL, DATES).fit(df)
+    artifact = streamed(df)
+
+    assert artifact.feature_names == fitted.feature_names
+    assert artifact.layout_hash() == fitted.layout_hash()
+    assert artifact.modes == fitted.modes
+    # Sketched medians are within a small rank error of the exact ones
+    for col in NUMERICAL:
+        assert abs((df[col] <= artifact.medians[col]).mean() - (df[col] <= fitted.medians[col]).mean()) < 0.01
+    np.testing.assert_allclose(artifact.transform(df).to_numpy(), fitted.transform(df).to_numpy(), atol=0.02)
+
+def test_unseen_values_encode_as_zeros():
+    df = training_rows(np.random.default_rng(1), n=200)
+    artifact = streamed(df, chunk_rows=64)
+    request = df.head(1).assign(route_id='R7')
+    features = artifact.transform(request)
+    assert features.filter(like='route_id_').to_numpy().sum() == 0
+    assert (artifact.transform_sparse(request).toarray() == features.to_numpy()).all()
+
+def test_saved_artifact_replays_transform(tmp_path):
+    df = training_rows(np.random.default_rng(2), n=300)
+    artifact = streamed(df)
+    path = artifact.save(str(tmp_path / 'preprocessing.joblib'))
+    loaded = PreprocessingArtifact.load(path)
+    assert loaded.sketches is None and loaded.counts is None
+    pd.testing.assert_frame_equal(loaded.transform(df), artifact.transform(df))
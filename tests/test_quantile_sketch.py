@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from src.components.Quantile_Sketch import QuantileSketch
+
+def rank_error(values, estimate, q):
+    return abs(np.searchsorted(np.sort(values), estimate) / values.size - q)
+
+@pytest.mark.parametrize('q', [0.01, 0.25, 0.5, 0.75, 0.99])
+def test_quantiles_within_rank_error(q):
+    values = np.random.default_rng(0).lognormal(size=200_000)
+    sketch = QuantileSketch(epsilon=0.01, seed=0)
+    for chunk in np.array_split(values, 37):
+        sketch.update(chunk)
+    assert sketch.count == values.size
+    assert rank_error(values, sketch.quantile(q), q) <= 0.01
+    assert sketch.size() < values.size / 20
+
+def test_merge_matches_single_stream():
+    rng = np.random.default_rng(1)
+    left, right = rng.normal(size=50_000), rng.normal(loc=3, size=50_000)
+    merged = QuantileSketch(0.01, seed=0).update(left).merge(QuantileSketch(0.01, seed=1).update(right))
+    values = np.concatenate([left, right])
+    assert merged.count == values.size
+    assert merged.min == values.min() and merged.max == values.max()
+    assert rank_error(values, merged.quantile(0.5), 0.5) <= 0.01
+
+def test_nans_ignored_and_empty_sketch():
+    sketch = QuantileSketch(0.01)
+    assert np.isnan(sketch.quantile(0.5))
+    assert np.isnan(sketch.quantile([0.25, 0.75])).all()
+    sketch.update([np.nan, 1.0, 2.0, 3.0, np.nan])
+    assert sketch.count == 3
+    assert sketch.quantile(0.5) == 2.0
+    assert sketch.quantile([0.0, 1.0]).tolist() == [1.0, 3.0]
+
+def test_quantile_bracket_contains_exact_quantile():
+    values = np.random.default_rng(2).exponential(size=100_000)
+    sketch = QuantileSketch(0.01, seed=0).update(values)
+    low, high = sketch.quantile_bracket(0.75)
+    assert low <= np.quantile(values, 0.75) <= high
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.components.Weather_Cube import WeatherCube, observed_hour_range, LOOKUP_COLUMNS, WEATHER_FEATURES
+
+def city_weather(rng, cities=3, hours=48, keep=0.7):
+    times = pd.date_range('2019-01-01', periods=hours, freq='h')
+    df = pd.DataFrame({'city_id': np.repeat([f'C{i}' for i in range(cities)], hours), 'date_time': np.tile(times, cities)})
+    df = df[rng.random(len(df)) < keep].reset_index(drop=True)
+    for col in WEATHER_FEATURES:
+        df[col] = rng.random(len(df))
+    df['description'] = rng.choice(['clear', 'rain', 'fog'], len(df))
+    return df[LOOKUP_COLUMNS]
+
+def trip_hours(rng, n=500):
+    return pd.DataFrame({
+        'city': rng.choice(['C0', 'C1', 'C2', 'C9'], n),
+        'time': pd.Timestamp('2018-12-31 20:00') + pd.to_timedelta(rng.integers(0, 60, n), unit='h'),
+    })
+
+def merged(weather_df, trips):
+    result = pd.merge(trips, weather_df, left_on=['city', 'time'], right_on=['city_id', 'date_time'], how='left')
+    return result[LOOKUP_COLUMNS]
+
+def as_objects(df):
+    return df.astype({col: object for col in ['city_id', 'description']}).replace({np.nan: None}).reset_index(drop=True)
+
+def test_lookup_matches_left_merge():
+    rng = np.random.default_rng(0)
+    weather_df, trips = city_weather(rng), trip_hours(rng)
+    result = WeatherCube(weather_df).lookup(trips['city'], trips['time'])
+    pd.testing.assert_frame_equal(as_objects(result), as_objects(merged(weather_df, trips)), check_dtype=False)
+
+def test_ffill_within_limit():
+    weather_df = pd.DataFrame({
+        'city_id': ['C0', 'C0'], 'date_time': pd.to_datetime(['2019-01-01 00:00', '2019-01-01 05:00']),
+        'temp': [1.0, 2.0], 'wind_speed': 0.0, 'precip': 0.0, 'humidity': 0.0, 'visibility': 0.0, 'pressure': 0.0,
+        'description': ['clear', 'rain'],
+    })
+    times = pd.date_range('2019-01-01', periods=6, freq='h')
+    result = WeatherCube(weather_df, fill='ffill', fill_limit=2).lookup(['C0'] * 6, times)
+    assert result['temp'].tolist()[:3] == [1.0, 1.0, 1.0] and np.isnan(result['temp'].iloc[3])
+    assert result['temp'].iloc[5] == 2.0
+    # Filled cells report the hour they were taken from
+    assert result['date_time'].iloc[2] == pd.Timestamp('2019-01-01 00:00')
+
+def test_missing_timestamps_are_left_out():
+    rng = np.random.default_rng(1)
+    weather_df, trips = city_weather(rng), trip_hours(rng)
+    weather_df.loc[[3, 10], 'date_time'] = pd.NaT
+    assert observed_hour_range(weather_df['date_time']) == observed_hour_range(weather_df['date_time'].dropna())
+
+    # A NaT hour must not stretch the cube over the whole datetime range
+    cube = WeatherCube(weather_df, hour_range=observed_hour_range(weather_df['date_time']))
+    assert cube.n_hours <= 48
+    result = cube.lookup(trips['city'], trips['time'])
+    pd.testing.assert_frame_equal(as_objects(result), as_objects(merged(weather_df, trips)), check_dtype=False)
+
+def test_all_timestamps_missing():
+    weather_df = city_weather(np.random.default_rng(2))
+    weather_df['date_time'] = pd.NaT
+    assert observed_hour_range(weather_df['date_time']) is None
+    result = WeatherCube(weather_df).lookup(['C0', 'C1'], pd.to_datetime(['2019-01-01', '2019-01-02']))
+    assert result[WEATHER_FEATURES].isna().all().all() and result['date_time'].isna().all()
+
+def test_unknown_fill_policy():
+    with pytest.raises(ValueError):
+        WeatherCube(city_weather(np.random.default_rng(3)), fill='interpolate')
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+from src.components.Window_Aggregation import WindowIndex, TrafficWindowAggregator, RouteWeatherAggregator, ROUTE_WEATHER_FEATURES
+from src.components.Time_Kernels import range_counts
+
+ROUTES = ['R0', 'R1', 'R2']
+
+def schedule(rng, n=200):
+    departure = pd.Timestamp('2019-01-01') + pd.to_timedelta(rng.integers(0, 72 * 60, n), unit='min')
+    return pd.DataFrame({
+        'truck_id': rng.integers(0, 15, n),
+        'route_id': rng.choice(ROUTES + ['R9'], n),
+        'departure_date': departure,
+        'estimated_arrival': departure + pd.to_timedelta(rng.integers(0, 30 * 60, n), unit='min'),
+    })
+
+def traffic(rng, hours=110):
+    times = pd.date_range('2019-01-01', periods=hours, freq='h')
+    df = pd.DataFrame({'route_id': np.repeat(ROUTES, hours), 'date_time': np.tile(times, len(ROUTES))})
+    df = df[rng.random(len(df)) < 0.8].reset_index(drop=True)
+    df['no_of_vehicles'] = np.where(rng.random(len(df)) < 0.1, np.nan, rng.integers(0, 500, len(df)))
+    df['accident'] = (rng.random(len(df)) < 0.05).astype(int)
+    return df
+
+def routes_weather(rng, steps=20):
+    times = pd.date_range('2018-12-31 18:00', periods=steps, freq='6h')
+    df = pd.DataFrame({'route_id': np.repeat(ROUTES, steps), 'date': np.tile(times, len(ROUTES))})
+    df = df[rng.random(len(df)) < 0.8].reset_index(drop=True)
+    for col in ROUTE_WEATHER_FEATURES.values():
+        df[col] = np.where(rng.random(len(df)) < 0.1, np.nan, rng.random(len(df)))
+    df['description'] = rng.choice(['clear', 'fog', 'rain', None], len(df))
+    return df
+
+def hourly_reference(schedule_df, traffic_df):
+    trips = schedule_df.copy()
+    trips['hour'] = [pd.date_range(start, end, freq='h') for start, end in zip(trips['departure_date'].dt.ceil('h'), trips['estimated_arrival'].dt.floor('h'))]
+    trips = trips.explode('hour')
+    trips['hour'] = pd.to_datetime(trips['hour'])
+    merged = pd.merge(trips, traffic_df, left_on=['route_id', 'hour'], right_on=['route_id', 'date_time'], how='left')
+    grouped = merged.groupby(['truck_id', 'route_id'], as_index=False).agg(avg_no_of_vehicles=('no_of_vehicles', 'mean'), accident=('accident', lambda x: int((x == 1).any())))
+    return grouped
+
+def six_hourly_reference(schedule_df, routes_weather_df):
+    trips = schedule_df.copy()
+    trips['date'] = [pd.date_range(start, end, freq='6h') for start, end in zip(trips['departure_date'].dt.floor('6h'), trips['estimated_arrival'].dt.ceil('6h'))]
+    trips = trips.explode('date')
+    trips['date'] = pd.to_datetime(trips['date'])
+    merged = pd.merge(trips, routes_weather_df, on=['route_id', 'date'], how='left')
+    named = {col: (source, 'mean') for col, source in ROUTE_WEATHER_FEATURES.items()}
+    named['route_description'] = ('description', lambda x: x.mode().iloc[0] if x.mode().size else np.nan)
+    return merged.groupby(['truck_id', 'route_id'], as_index=False).agg(**named)
+
+def sort_groups(df):
+    return df.sort_values(['truck_id', 'route_id']).reset_index(drop=True)
+
+def test_window_index_bounds_cover_grid_rows():
+    times = pd.to_datetime(['2019-01-01 00:00', '2019-01-01 01:00', '2019-01-01 01:30', '2019-01-01 03:00', '2019-01-01 02:00'])
+    index = WindowIndex(['A', 'A', 'A', 'A', 'B'], times)
+    start, end = index.bounds(['A', 'B', 'Z'], pd.to_datetime(['2019-01-01 00:10'] * 3), pd.to_datetime(['2019-01-01 02:50'] * 3))
+    # The off-grid 01:30 row never matches; the unknown key gets an empty window
+    assert (end - start).tolist() == [1, 1, 0]
+    start, end = index.bounds(['A'], pd.to_datetime(['2019-01-01 00:10']), pd.to_datetime(['2019-01-01 02:50']), outward=True)
+    assert (end - start).tolist() == [3]
+
+def test_traffic_matches_hourly_explode():
+    rng = np.random.default_rng(0)
+    schedule_df, traffic_df = schedule(rng), traffic(rng)
+    result = TrafficWindowAggregator(traffic_df).aggregate(schedule_df)
+    pd.testing.assert_frame_equal(sort_groups(result), sort_groups(hourly_reference(schedule_df, traffic_df)), check_dtype=False)
+
+def test_traffic_weights_match_six_hourly_then_hourly_explode():
+    # DataPreparation's schedule was exploded into 6H steps before the hourly explode, so trips weigh
+    # in by their number of steps; trucks repeat routes and two trips share a window after flooring
+    rng = np.random.default_rng(2)
+    schedule_df, traffic_df = schedule(rng, n=120), traffic(rng)
+    schedule_df = pd.concat([schedule_df, schedule_df.head(5).assign(departure_date=lambda df: df['departure_date'] + pd.Timedelta('1min'))], ignore_index=True)
+    schedule_df['departure_date'] = schedule_df['departure_date'].dt.floor('6h')
+    schedule_df['estimated_arrival'] = schedule_df['estimated_arrival'].dt.ceil('6h')
+    assert schedule_df.duplicated(['truck_id', 'route_id']).any()
+
+    six_hourly = schedule_df.assign(date=[pd.date_range(start, end, freq='6h') for start, end in zip(schedule_df['departure_date'], schedule_df['estimated_arrival'])]).explode('date')
+    steps, _, _ = range_counts(schedule_df['departure_date'], schedule_df['estimated_arrival'], '6h')
+    assert len(six_hourly) == np.maximum(steps, 1).sum()
+
+    result = TrafficWindowAggregator(traffic_df).aggregate(schedule_df, weights=np.maximum(steps, 1))
+    expected = hourly_reference(six_hourly.drop(columns='date'), traffic_df)
+    pd.testing.assert_frame_equal(sort_groups(result), sort_groups(expected), check_dtype=False)
+
+def test_route_weather_matches_six_hourly_explode():
+    rng = np.random.default_rng(1)
+    schedule_df, routes_weather_df = schedule(rng), routes_weather(rng)
+    aggregator = RouteWeatherAggregator(routes_weather_df)
+    # One position per described row, not one count per row and description
+    assert sum(len(positions) for positions in aggregator.description_positions) == routes_weather_df['description'].notna().sum()
+    result = aggregator.aggregate(schedule_df)
+    expected = six_hourly_reference(schedule_df, routes_weather_df)
+    result, expected = sort_groups(result), sort_groups(expected)
+    pd.testing.assert_frame_equal(result[list(ROUTE_WEATHER_FEATURES)], expected[list(ROUTE_WEATHER_FEATURES)], check_dtype=False)
+    assert result['route_description'].astype(object).where(result['route_description'].notna(), None).tolist() == \
+        expected['route_description'].astype(object).where(expected['route_description'].notna(), None).tolist()
+
+def test_route_description_ties_go_to_first_description():
+    routes_weather_df = pd.DataFrame({
+        'route_id': ['R0'] * 4, 'date': pd.to_datetime(['2019-01-01 00:00', '2019-01-01 06:00', '2019-01-01 12:00', '2019-01-01 18:00']),
+        'temp': 1.0, 'wind_speed': 1.0, 'precip': 1.0, 'humidity': 1.0, 'visibility': 1.0, 'pressure': 1.0,
+        'description': ['rain', 'fog', 'rain', 'fog'],
+    })
+    schedule_df = pd.DataFrame({
+        'truck_id': [1, 2], 'route_id': ['R0', 'R9'],
+        'departure_date': pd.to_datetime(['2019-01-01 01:00'] * 2), 'estimated_arrival': pd.to_datetime(['2019-01-01 17:00'] * 2),
+    })
+    result = RouteWeatherAggregator(routes_weather_df).aggregate(schedule_df)
+    assert result['route_description'].iloc[0] == 'fog'
+    assert pd.isna(result['route_description'].iloc[1]) and np.isnan(result['route_avg_temp'].iloc[1])